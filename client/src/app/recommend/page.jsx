@@ -18,6 +18,18 @@ export default function Page() {
   const router = useRouter();
   const projectId = searchParams.get("projectId");
 
+  // Interactions with the recommendations, used to learn the ensemble weights
+  // (recommendation/train_weights.py); failures never affect the page
+  const logInteraction = (project, event, userIds) => {
+    axios
+      .post("http://localhost:5000/interactions", {
+        project,
+        event,
+        user_ids: userIds,
+      })
+      .catch((error) => console.error("Error logging interaction:", error));
+  };
+
   useEffect(() => {
     const fetchProjectAndRecommendations = async () => {
       try {
@@ -77,10 +89,11 @@ export default function Page() {
               domain: "AI",
             };
 
-        // Get recommendations from API using axios
+        // Get the top recommendations from API using axios
         const response = await axios.post(
           "http://localhost:5000/recommend",
-          dataToSend
+          dataToSend,
+          { params: { limit: 50 } }
         );
 
         if (!Array.isArray(response.data)) {
@@ -120,6 +133,11 @@ export default function Page() {
 
         setProjectData(dataToSend);
         setUsers(transformedRecommendations);
+        logInteraction(
+          dataToSend,
+          "shown",
+          transformedRecommendations.map((user) => user.id)
+        );
       } catch (error) {
         console.error("Error fetching recommendations:", error);
         setError(error.message);
@@ -133,6 +151,9 @@ export default function Page() {
   }, [projectId]);
 
   const handleViewProfile = (user) => {
+    if (projectData) {
+      logInteraction(projectData, "viewed", [user.id]);
+    }
     // Store the project data in localStorage
     localStorage.setItem(
       "currentProject",
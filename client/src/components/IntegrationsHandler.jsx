@@ -25,7 +25,7 @@ export default function IntegrationsHandler({ onClose }) {
       }
 
       const platform = selectedPlatform.toLowerCase();
-      const url = `http://localhost:5000/integrate/${platform}`;
+      const url = `http://localhost:5001/integrate/${platform}`;
 
       const payload = { username, user_id: userId };
 
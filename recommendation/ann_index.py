@@ -0,0 +1,169 @@
+import numpy as np
+from scipy.sparse import diags, vstack
+from scipy.sparse.linalg import svds
+
+
+class SkillEmbeddingIndex:
+    """
+    Approximate nearest-neighbour index over user skill embeddings.
+
+    Every user's skills are embedded once (TF-IDF, optionally SVD-reduced to
+    `n_components` dimensions) and hashed with random-projection LSH into
+    `n_tables` tables of `n_bits`-bit buckets. A query only re-ranks the users
+    found in its own bucket and the buckets one bit away, so the work grows
+    with bucket size rather than with the whole pool.
+
+    Parameters:
+    - store: UserStore whose skill matrix is embedded.
+    - n_components: SVD dimensions, or None to hash the sparse TF-IDF vectors.
+    - n_tables / n_bits: LSH tables and hyperplanes per table. By default n_bits
+      is chosen so buckets hold about `bucket_size` users.
+
+    Users appended to the store later are added with `extend`: they get
+    embeddings with the existing idf/projection but are not hashed, and every
+    query scores them exactly until the index is rebuilt.
+    """
+
+    def __init__(self, store, n_components=None, n_tables=8, n_bits=None, bucket_size=64, seed=0):
+        self.params = {"n_components": n_components, "n_tables": n_tables, "n_bits": n_bits,
+                       "bucket_size": bucket_size, "seed": seed}
+        self.store = store
+        skills = store.skills
+        n_users = skills.shape[0]
+        self.n_indexed = n_users
+
+        # Smoothed idf, as in sklearn's TfidfVectorizer
+        document_frequency = np.bincount(skills.indices, minlength=skills.shape[1])
+        self.idf = np.log((1 + n_users) / (1 + document_frequency)) + 1
+        tfidf = _normalize_rows(skills @ diags(self.idf))
+
+        self.components = None
+        if n_components is not None and n_components < min(tfidf.shape):
+            _, _, vt = svds(tfidf, k=n_components, v0=np.ones(min(tfidf.shape)))
+            self.components = vt.T
+        self.vectors = self._project(tfidf)
+
+        rng = np.random.default_rng(seed)
+        dimension = self.vectors.shape[1]
+        if n_bits is None:
+            n_bits = int(np.clip(np.ceil(np.log2(max(n_users / bucket_size, 2))), 1, 24))
+        self.n_bits = n_bits
+        self.planes = rng.standard_normal((n_tables, dimension, n_bits)).astype(np.float32)
+        self.weights = (1 << np.arange(n_bits)).astype(np.int64)
+
+        # Per table: rows sorted by bucket code, plus the distinct codes and their offsets
+        self.tables = []
+        for planes in self.planes:
+            codes = self._codes(self.vectors, planes)
+            order = np.argsort(codes, kind='stable')
+            keys, starts = np.unique(codes[order], return_index=True)
+            self.tables.append((order, keys, np.append(starts, len(order))))
+
+    def _project(self, tfidf):
+        if self.components is not None:
+            return _normalize_dense(np.asarray(tfidf @ self.components, dtype=np.float32))
+        return tfidf.tocsr().astype(np.float32)
+
+    def extend(self, store):
+        # Index over `store`, whose first rows are this index's rows (unchanged)
+        # followed by appended ones; shares everything but the vectors
+        index = object.__new__(SkillEmbeddingIndex)
+        index.__dict__.update(self.__dict__)
+        index.store = store
+        n_old = self.vectors.shape[0]
+        if store.n_users > n_old:
+            # Skills first seen after the build have no idf and are left out
+            skills = store.skills[n_old:, :len(self.idf)]
+            new_vectors = self._project(_normalize_rows(skills @ diags(self.idf)))
+            if self.components is not None:
+                index.vectors = np.concatenate([self.vectors, new_vectors])
+            else:
+                index.vectors = vstack([self.vectors, new_vectors], format="csr")
+        return index
+
+    def rebuild(self, store):
+        return SkillEmbeddingIndex(store, **self.params)
+
+    def _codes(self, vectors, planes):
+        projected = np.asarray(vectors @ planes)
+        return (projected > 0).astype(np.int64) @ self.weights
+
+    def embed(self, skills):
+        vector = self.store.skill_vector(skills)[:len(self.idf)] * self.idf
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        vector = vector / norm
+        if self.components is not None:
+            vector = vector @ self.components
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+        return vector.astype(np.float32)
+
+    def similarities(self, rows, query):
+        return np.asarray(self.vectors[rows] @ query).ravel()
+
+    def candidates(self, query):
+        found = []
+        for planes, (order, keys, bounds) in zip(self.planes, self.tables):
+            code = int(self._codes(query[None, :], planes)[0])
+            # Multi-probe: the query's bucket plus every bucket one bit flip away
+            probes = np.array([code] + [code ^ (1 << bit) for bit in range(self.n_bits)])
+            positions = np.searchsorted(keys, probes)
+            for position, probe in zip(positions, probes):
+                if position < len(keys) and keys[position] == probe:
+                    found.append(order[bounds[position]:bounds[position + 1]])
+        if self.vectors.shape[0] > self.n_indexed:
+            found.append(np.arange(self.n_indexed, self.vectors.shape[0]))  # Not hashed yet
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def query(self, skills, n):
+        # Top-n users by approximate cosine similarity to `skills`, best first
+        query = self.embed(skills) if n > 0 else None
+        if query is None:
+            return np.empty(0, dtype=np.int64)
+        rows = self.store.live(self.candidates(query))
+        if len(rows) == 0:
+            return rows
+        scores = self.similarities(rows, query)
+        best = np.argsort(-scores, kind='stable')[:n]
+        return rows[best]
+
+    def brute_force(self, skills, n):
+        # Exact top-n over the whole pool, for recall measurements
+        query = self.embed(skills)
+        if query is None:
+            return np.empty(0, dtype=np.int64)
+        rows = self.store.live(np.arange(self.vectors.shape[0]))
+        scores = self.similarities(rows, query)
+        return rows[np.argsort(-scores, kind='stable')[:n]]
+
+
+def recall_at_k(index, skill_lists, k):
+    # Mean fraction of the exact top-k that the LSH query matches. Many users share
+    # identical skill sets, so any result scoring at least the exact k-th best
+    # similarity counts as a hit.
+    recalls = []
+    for skills in skill_lists:
+        query = index.embed(skills)
+        exact = index.brute_force(skills, k)
+        if query is None or len(exact) == 0:
+            continue
+        threshold = index.similarities(exact[-1:], query)[0]
+        approximate = index.query(skills, k)
+        hits = np.count_nonzero(index.similarities(approximate, query) >= threshold - 1e-6)
+        recalls.append(hits / len(exact))
+    return float(np.mean(recalls)) if recalls else 0.0
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return diags(1 / norms) @ matrix
+
+
+def _normalize_dense(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
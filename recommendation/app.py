@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import numpy as np
 import pandas as pd
 from sklearn.metrics.pairwise import cosine_similarity
@@ -9,15 +9,71 @@ from scipy.stats import pearsonr
 from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
 from flask_cors import CORS, cross_origin
-
-
-import json
-
-with open("data.json", "r") as file:
-    users = json.load(file) 
+from user_store import UserStore
+from snapshot import load_columns
+from records import to_records
+from user_pool import UserPool
+from scoring import (DEFAULT_FIELDS, RECORD_FIELDS, candidate_rows, ensemble_scores, iter_records, rank,
+                     score_batch, score_rows)
+from responses import encode_page, recommendation_page, recommendation_rows
+from json_provider import install as install_json_provider
+from result_cache import ResultCache, project_key
+from sharded import SHARD_MIN_USERS, SHARDS, ShardedScorer
+from metrics import COUNT_BUCKETS, Registry, instrument, profiled
+from ranker import EnsembleWeights
+from interaction_log import EVENT_GRADES, InteractionLog
+
+
+import os
+import time
+
+# Memory-maps data.snapshot/ when it is up to date (python snapshot.py data.json),
+# otherwise parses data.json. The pool (store + ANN index, built on first use
+# unless USER_POOL_ANN says otherwise) is then updated in place through
+# /users/upsert and /users/delete, or by watching data.json when
+# USER_POOL_WATCH is set.
+pool = UserPool(UserStore(load_columns("data.json")))
+if os.environ.get("USER_POOL_WATCH"):
+    pool.watch("data.json", float(os.environ.get("USER_POOL_WATCH_INTERVAL", "2")))
+# Seed skill/domain IDs for the record-based helpers: the seed lists plus every
+# name in the pool. ensemble_scoring interns each call's users into its own copy,
+# so names the seeds do not know still match and the shared IDs never change.
+skill_vocab = pool.current.store.skill_vocab.copy()
+domain_vocab = pool.current.store.domain_vocab.copy()
+# Serialized /recommend results keyed on the normalized project requirements
+results = ResultCache()
+# With SCORING_SHARDS > 1, large pools are scored in parallel shards (sharded.py)
+sharded = ShardedScorer() if SHARDS > 1 else None
+# Ensemble weights learned offline from the interaction log (train_weights.py);
+# the fixed 0.3/0.2/0.3/0.2 weights until a weights file has been exported
+ensemble_weights = EnsembleWeights()
+interactions = InteractionLog()
 app = Flask(__name__)
 cors = CORS(app) # allow CORS for all domains on all routes.
 app.config['CORS_HEADERS'] = 'Content-Type'
+install_json_provider(app)  # orjson/msgspec when installed (json_provider.py)
+# Logging every request body is expensive on large projects; opt in for debugging
+LOG_REQUESTS = os.environ.get("RECOMMEND_LOG_REQUESTS") == "1"
+
+# Prometheus-style metrics at /metrics (metrics.py): per-stage timings and
+# candidate counts of both pipelines, result cache and pool statistics
+registry = Registry()
+stage_seconds = registry.histogram(
+    "recommend_stage_seconds", "Time spent in each stage of a recommendation", ["pipeline", "stage"])
+stage_candidates = registry.histogram(
+    "recommend_candidates", "Users left after each stage", ["pipeline", "stage"], COUNT_BUCKETS)
+registry.gauge("recommend_result_cache_hit_ratio", "Result cache hits / lookups", lambda: results.stats()["hit_rate"])
+registry.gauge(
+    "recommend_result_cache", "Result cache counters (hits, misses, size, evictions)",
+    lambda: {(name,): value for name, value in results.stats().items() if name != "hit_rate"}, ["stat"])
+registry.gauge(
+    "recommend_user_pool", "User pool statistics (users, rows, tombstones, ...)",
+    lambda: {(name,): value for name, value in pool.stats().items()}, ["stat"])
+instrument(app, registry, "recommend")
+
+
+def stage(name, pipeline="recommend"):
+    return stage_seconds.time(pipeline=pipeline, stage=name)
 
 # project = {
 #     "project_id": 101,
@@ -32,139 +88,111 @@ app.config['CORS_HEADERS'] = 'Content-Type'
 # }
 
 
-def fixed_jaccard_similarity(user_skills, preferred_skills):
-    user_skills_set = set(user_skills)  # Convert list to set
-    project_skills_set = set(preferred_skills)  # Convert list to set
-    intersection = len(user_skills_set & project_skills_set)  # Find common skills
-    union = len(user_skills_set | project_skills_set)
-    denominator = len(project_skills_set)  # Fix denominator to preferred skills only
+def fixed_jaccard_similarity(user_skills, preferred_skills, denominator=None):
+    # Both skill sets are bitmasks over skill_vocab (see vocab.Vocabulary.bits)
+    intersection = (user_skills & preferred_skills).bit_count()  # Find common skills
+    if denominator is None:
+        denominator = preferred_skills.bit_count()  # Fix denominator to preferred skills only
     return intersection / denominator if denominator != 0 else 0
-    # return intersection / union if union != 0 else 0
 
-def content_based(users, project):
+# The scoring helpers below work on integer-coded UserRecords (records.py) and
+# return one score per user, in order
+def content_based(users, project, skill_vocab=skill_vocab):
     try:
-        for user in users:
-            # Calculate Jaccard similarity for skills
-            score = fixed_jaccard_similarity(user["skills"], project["preferred_skills"])
-            # Ensure the score is assigned with the correct key
-            user["content_based"] = float(score)  # Convert to float to ensure numeric value
+        preferred = skill_vocab.bits(project["preferred_skills"])
+        # Unknown preferred skills still count towards the denominator
+        denominator = len(set(project["preferred_skills"]))
+        return [float(fixed_jaccard_similarity(user.skills, preferred, denominator)) for user in users]
     except Exception as e:
         print(f"Error in content-based filtering: {str(e)}")
         # Assign default score if there's an error
-        for user in users:
-            user["content_based"] = 0.0
-    return users
+        return [0.0] * len(users)
 
 
 
-def collaborative_based(users, project):
-    if len(users) == 0:
-        return []
-        
-    # Add default collaborative score to each user
-    for user in users:
-        user['collaborative_score'] = 0.5  # Default middle score
-        
-    # If we have enough users, try to calculate actual scores
-    if len(users) > 1:
-        try:
-            # Create a basic DataFrame with required structure
-            df = pd.DataFrame({
-                'user_id': [user['user_id'] for user in users],
-                'project_id': [project['project_id']] * len(users),
-                'interaction': [1] * len(users)  # Default interaction value
-            })
-            
-            # Create pivot table with the guaranteed structure
-            user_project_matrix = df.pivot_table(
-                index='user_id', 
-                columns='project_id', 
-                values='interaction',
-                aggfunc='size', 
-                fill_value=0
-            )
-            
-            # Calculate simple similarity score based on project domain
-            for user in users:
-                matching_domain = any(p.get('domain') == project['domain'] 
-                                    for p in user.get('completed_projects', []))
-                user['collaborative_score'] = 0.8 if matching_domain else 0.3
-                
-        except Exception as e:
-            print(f"Error in collaborative filtering: {str(e)}")
-            # Keep default scores if something goes wrong
-    
-    return users
+def collaborative_based(users, project, domain_vocab=domain_vocab):
+    # Simple similarity score based on project domain. Like the original
+    # pivot-table version, a single user (or a project without a project_id)
+    # keeps the default middle score.
+    if len(users) < 2 or "project_id" not in project:
+        return [0.5] * len(users)
+    domain = domain_vocab.get(project['domain'])
+    if domain is None:
+        return [0.3] * len(users)
+    mask = 1 << domain
+    return [0.8 if user.domains & mask else 0.3 for user in users]
 
 # Popularity-Based Filtering
 def popularity_based(users):
+    scores = []
     for user in users:
-        result = user["feedback"] * 0.1
-        if user["projects_completed"]>10:
+        result = user.feedback * 0.1
+        if user.projects_completed > 10:
             result += 0.5
         else:
-            result = result + ((user["projects_completed"]/2)*0.1)
-
-        user["popularity_score"] = result
-        # print("p",user["popularity_score"])
-    return users
+            result = result + ((user.projects_completed/2)*0.1)
+        scores.append(result)
+    return scores
 
 # Pre-Requisite-Based Filtering
-def pre_requisite_based(users, project):
-    filtered_users = []
-    for user in users:
-        meets_requirements = (
-            set(project["required_skills"]).issubset(set(user["skills"]))
-
-        )
-        if meets_requirements:
-            user["pre_requisite_score"] = 1
-            filtered_users.append(user)
-    return filtered_users
+def pre_requisite_based(users, project, skill_vocab=skill_vocab):
+    required_skills = set(project["required_skills"])
+    if any(skill not in skill_vocab for skill in required_skills):
+        return []  # Nobody has a skill none of the users have
+    required = skill_vocab.bits(required_skills)
+    return [user for user in users if user.skills & required == required]
 
 
 # Ensemble Scoring
 def ensemble_scoring(users, project):
     try:
-        # First apply all scoring methods
-        filtered_users = pre_requisite_based(users, project)
+        # Intern user dicts once, into per-call copies of the vocabularies so
+        # every skill and domain of these users gets an ID; the helpers then
+        # only do integer work
+        with stage("intern", "ensemble"):
+            skills, domains = skill_vocab.copy(), domain_vocab.copy()
+            users = to_records(users, skills, domains, add=True)
+        with stage("filter", "ensemble"):
+            filtered_users = pre_requisite_based(users, project, skills)
+        stage_candidates.observe(len(filtered_users), pipeline="ensemble", stage="filter")
         if not filtered_users:  # If no users meet prerequisites
             return pd.DataFrame()  # Return empty DataFrame
-            
-        filtered_users = content_based(filtered_users, project)
-        filtered_users = popularity_based(filtered_users)
-        filtered_users = collaborative_based(filtered_users, project)
-
-        # Create DataFrame from users with all required scores
-        data = []
-        for user in filtered_users:
-            user_data = {
-                'user_id': user.get('user_id'),
-                'name': user.get('name'),
-                'skills': user.get('skills', []),
-                'content_based': float(user.get('content_based', 0.0)),
-                'popularity_score': float(user.get('popularity_score', 0.0)),
-                'pre_requisite_score': float(user.get('pre_requisite_score', 0.0)),
-                'collaborative_score': float(user.get('collaborative_score', 0.0))
-            }
-            # Add any additional fields
-            for k, v in user.items():
-                if k not in user_data:
-                    user_data[k] = v
-            data.append(user_data)
-
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
-        # Calculate ensemble score
-        df['ensemble_score'] = (
-            df['content_based'] * 0.3 +
-            df['popularity_score'] * 0.2 +
-            df['pre_requisite_score'] * 0.3 +
-            df['collaborative_score'] * 0.2
-        )
-
-        return df.sort_values(by="ensemble_score", ascending=False)
+
+        with stage("score", "ensemble"):
+            scores = zip(
+                content_based(filtered_users, project, skills),
+                popularity_based(filtered_users),
+                collaborative_based(filtered_users, project, domains),
+            )
+            # Rows are the users as they were passed in (original skill lists
+            # and every other field), plus their scores
+            data = []
+            for user, (content, popularity, collaborative) in zip(filtered_users, scores):
+                source = user.source
+                user_data = {
+                    'user_id': user.user_id,
+                    'name': user.name,
+                    'skills': source.get('skills', []) if source is not None else skills.decode_bits(user.skills),
+                    'content_based': float(content),
+                    'popularity_score': float(popularity),
+                    'pre_requisite_score': 1.0,
+                    'collaborative_score': float(collaborative),
+                }
+                for k, v in (source or {}).items():
+                    if k not in user_data:
+                        user_data[k] = v
+                data.append(user_data)
+            df = pd.DataFrame(data)
+
+            # Calculate ensemble score
+            _, weights = ensemble_weights.get()
+            df['ensemble_score'] = ensemble_scores(
+                df['content_based'], df['popularity_score'], df['pre_requisite_score'], df['collaborative_score'],
+                weights,
+            )
+
+        with stage("sort", "ensemble"):
+            return df.sort_values(by="ensemble_score", ascending=False)
     except Exception as e:
         print(f"Error in ensemble scoring: {str(e)}")
         return pd.DataFrame()  # Return empty DataFrame in case of error
@@ -181,63 +209,93 @@ def train_xgboost(data):
 
 
 
-def get_recommendations(project):
+def get_recommendations(project, limit=None, offset=0, retrieve=None):
     try:
-        # Step 1: Filter users based on required skills
-        filtered_users = []
-        for user in users:
-            if set(project["required_skills"]).issubset(set(user["skills"])):
-                user_data = {
-                    'user_id': user.get('user_id'),
-                    'name': user.get('name'),
-                    'skills': user.get('skills', []),
-                    'feedback': user.get('feedback', 0),
-                    'projects_completed': user.get('projects_completed', 0),
-                    'completed_projects': user.get('completed_projects', [])
-                }
-                filtered_users.append(user_data)
-
-        if not filtered_users:
-            return "[]"  # Return empty JSON array if no users match
-
-        # Step 2: Create DataFrame with initial user data
-        df = pd.DataFrame(filtered_users)
-
-        # Step 3: Calculate scores
-        # Content-based score using skill matching
-        df['content_based'] = df['skills'].apply(
-            lambda x: fixed_jaccard_similarity(x, project['preferred_skills'])
-        )
-
-        # Popularity score
-        df['popularity_score'] = df['feedback'] * 0.1 + \
-            df.apply(lambda x: 0.5 if x['projects_completed'] > 10 
-                    else (x['projects_completed']/2) * 0.1, axis=1)
-
-        # Pre-requisite score (all filtered users meet requirements)
-        df['pre_requisite_score'] = 1.0
-
-        # Collaborative score based on domain matching
-        df['collaborative_score'] = df['completed_projects'].apply(
-            lambda x: 0.8 if any(p.get('domain') == project['domain'] for p in x) else 0.3
-        )
-
-        # Step 4: Calculate ensemble score
-        df['ensemble_score'] = (
-            df['content_based'] * 0.3 +
-            df['popularity_score'] * 0.2 +
-            df['pre_requisite_score'] * 0.3 +
-            df['collaborative_score'] * 0.2
-        )
-
-        # Step 5: Sort and convert to JSON
-        result = df.sort_values(by='ensemble_score', ascending=False)
-        return result.to_json(orient='records')
+        # Repeat requests for the same requirements are served from the result
+        # cache until the user pool or the ensemble weights change
+        current = pool.state(ann=bool(retrieve))  # One consistent (store, ann) for the whole request
+        store = current.store
+        weights_version, weights = ensemble_weights.get()
+        version = (store.version, weights_version)  # Part of the key: never served for another pool
+        key = project_key(project, *version, limit, offset, retrieve)
+        with stage("cache"):
+            cached = results.get(key)
+        if cached is not None:
+            return cached
+
+        recommendations = "[]"  # "[]" if no users match
+        rows, scores, order = ranked_candidates(current, project, limit, offset, retrieve, weights)
+        if len(order) > 0:
+            with stage("frame"):
+                page = recommendation_page(app.json, store, rows, scores, order)
+            with stage("serialize"):
+                recommendations = encode_page(app.json, page)
+        results.set(key, recommendations)
+        return recommendations
 
     except Exception as e:
         print(f"Error in get_recommendations: {str(e)}")
         return "[]"  # Return empty JSON array in case of error
 
+def ranked_candidates(current, project, limit=None, offset=0, retrieve=None, weights=None):
+    # Steps 1-5: Filter on required skills, score the candidates column-wise
+    # and keep only the requested page of the ranking. With `retrieve`, only
+    # the nearest users to the preferred skills from the ANN index are scored.
+    # Returns the candidate rows, their scores and the ranked positions into them.
+    store = current.store
+    if sharded is not None and not retrieve and store.n_users >= SHARD_MIN_USERS:
+        with stage("sharded_score"):  # Filter + score + per-shard top-k
+            rows, scores = sharded.score(store, project, None if limit is None else offset + limit, weights)
+    else:
+        with stage("filter"):
+            rows = candidate_rows(store, project, current.ann, retrieve)
+        with stage("score"):
+            scores = score_rows(store, rows, project, weights)
+    stage_candidates.observe(len(rows), pipeline="recommend", stage="filter")
+    if len(rows) == 0:
+        return rows, scores, np.empty(0, dtype=np.int64)
+    with stage("rank"):
+        order = rank(rows, scores, limit, offset)
+    stage_candidates.observe(len(order), pipeline="recommend", stage="rank")
+    return rows, scores, order
+
+def stream_recommendations(project, fields=DEFAULT_FIELDS, limit=None, offset=0, retrieve=None, chunk_size=1000):
+    # NDJSON alternative to get_recommendations for large exports: the ranking
+    # is computed up front (so errors still surface before the response
+    # starts), then records are decoded and serialized chunk_size at a time
+    # with only `fields`, bypassing the result cache
+    current = pool.state(ann=bool(retrieve))
+    _, weights = ensemble_weights.get()
+    rows, scores, order = ranked_candidates(current, project, limit, offset, retrieve, weights)
+
+    def lines():
+        start = time.perf_counter()
+        try:
+            batch = []
+            for record in iter_records(current.store, rows, scores, order, fields, chunk_size):
+                batch.append(app.json.dumps(record, sort_keys=False))
+                if len(batch) == chunk_size:
+                    yield "\n".join(batch) + "\n"
+                    batch = []
+            if batch:
+                yield "\n".join(batch) + "\n"
+        finally:
+            stage_seconds.observe(time.perf_counter() - start, pipeline="recommend", stage="stream")
+
+    return lines()
+
+def get_batch_recommendations(projects, limit=None, offset=0):
+    # Score every project against the shared candidate pool in one pass and
+    # return a JSON array of {"project_id", "recommendations"} entries
+    store = pool.current.store
+    _, weights = ensemble_weights.get()
+    batch = []
+    for project, (rows, scores) in zip(projects, score_batch(store, projects, weights)):
+        order = rank(rows, scores, limit, offset) if len(rows) > 0 else []
+        recommendations = recommendation_rows(store, rows, scores, order) if len(order) > 0 else []
+        batch.append({"project_id": project.get("project_id"), "recommendations": recommendations})
+    return app.json.dumps(batch, sort_keys=False)
+
 @app.route('/recommend', methods=['POST'])
 @cross_origin()
 def recommend():
@@ -245,12 +303,117 @@ def recommend():
         project = request.get_json()
         if not project:
             return jsonify({"error": "Invalid JSON"}), 400
-        print("Received JSON:", project)
-        recommendations = get_recommendations(project)
+        if LOG_REQUESTS:
+            print("Received JSON:", project)
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        retrieve = request.args.get('retrieve', type=int)
+        if (limit is not None and limit < 0) or offset < 0:
+            return jsonify({"error": "limit and offset must be non-negative"}), 400
+        if 'retrieve' in request.args and (retrieve is None or retrieve <= 0):
+            return jsonify({"error": "retrieve must be a positive integer"}), 400
+
+        # ?format=ndjson (or Accept: application/x-ndjson) streams one record per
+        # line; ?fields=user_id,name,skills,score picks the fields of each record
+        streaming = (request.args.get('format') == 'ndjson'
+                     or request.accept_mimetypes.best == 'application/x-ndjson')
+        fields = request.args.get('fields')
+        if fields is not None and not streaming:
+            return jsonify({"error": "fields is only supported with format=ndjson"}), 400
+        if streaming:
+            fields = [field.strip() for field in fields.split(',') if field.strip()] if fields is not None else DEFAULT_FIELDS
+            if not fields:
+                return jsonify({"error": f"fields must name at least one of {', '.join(RECORD_FIELDS)}"}), 400
+            unknown = [field for field in fields if field not in RECORD_FIELDS]
+            if unknown:
+                return jsonify({"error": f"Unknown fields: {', '.join(unknown)}; expected some of {', '.join(RECORD_FIELDS)}"}), 400
+            lines = stream_recommendations(project, fields, limit, offset, retrieve)
+            return Response(lines, mimetype='application/x-ndjson')
+
+        with profiled("recommend"):  # cProfile dump for PROFILE_SAMPLE_RATE of requests
+            recommendations = get_recommendations(project, limit, offset, retrieve)
         return recommendations, 200
     except Exception as e:
         print(f"Error in recommend endpoint: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/recommend/cache', methods=['GET'])
+def recommend_cache_stats():
+    # Result cache hit/miss counters
+    return jsonify(results.stats())
+
+@app.route('/recommend/batch', methods=['POST'])
+@cross_origin()
+def recommend_batch():
+    try:
+        data = request.get_json()
+        projects = data.get("projects") if isinstance(data, dict) else data
+        if not isinstance(projects, list) or not all(isinstance(p, dict) for p in projects):
+            return jsonify({"error": "Expected a list of projects"}), 400
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        if (limit is not None and limit < 0) or offset < 0:
+            return jsonify({"error": "limit and offset must be non-negative"}), 400
+        return get_batch_recommendations(projects, limit, offset), 200
+    except Exception as e:
+        print(f"Error in recommend batch endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/interactions', methods=['POST'])
+@cross_origin()
+def log_interactions():
+    # What happened to recommended users, for train_weights.py:
+    # {"project": {...}, "event": "shown" | "viewed" | "invited" | "accepted", "user_ids": [...]}
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({"error": "Invalid JSON"}), 400
+        project, event, user_ids = data.get("project"), data.get("event"), data.get("user_ids")
+        if (not isinstance(project, dict) or not isinstance(project.get("required_skills"), list)
+                or not isinstance(project.get("preferred_skills"), list) or not isinstance(project.get("domain"), str)):
+            return jsonify({"error": "Expected a project with required_skills, preferred_skills and domain"}), 400
+        if event not in EVENT_GRADES:
+            return jsonify({"error": f"Unknown event, expected one of {', '.join(EVENT_GRADES)}"}), 400
+        if not isinstance(user_ids, list) or not all(isinstance(u, int) and not isinstance(u, bool) for u in user_ids):
+            return jsonify({"error": "Expected a list of integer user_ids"}), 400
+        return jsonify({"logged": interactions.append(project, event, user_ids)}), 200
+    except Exception as e:
+        print(f"Error in interactions endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/users/upsert', methods=['POST'])
+@cross_origin()
+def users_upsert():
+    # Insert or replace users (same shape as data.json entries, matched on user_id)
+    try:
+        data = request.get_json()
+        users = data.get("users") if isinstance(data, dict) else data
+        if not isinstance(users, list):
+            return jsonify({"error": "Expected a list of users"}), 400
+        return jsonify({"upserted": pool.upsert(users), "users": len(pool)}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error in users upsert endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/users/delete', methods=['POST'])
+@cross_origin()
+def users_delete():
+    try:
+        data = request.get_json()
+        user_ids = data.get("user_ids") if isinstance(data, dict) else data
+        if not isinstance(user_ids, list):
+            return jsonify({"error": "Expected a list of user_ids"}), 400
+        return jsonify({"deleted": pool.delete(user_ids), "users": len(pool)}), 200
+    except Exception as e:
+        print(f"Error in users delete endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/users/stats', methods=['GET'])
+def users_stats():
+    return jsonify(pool.stats())
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Development server only; in production run it under gunicorn (gunicorn.conf.py)
+    app.run(debug=True, port=int(os.environ.get("RECOMMENDER_PORT", "5000")))
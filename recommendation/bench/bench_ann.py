@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_index import SkillEmbeddingIndex, recall_at_k
+from scoring import score_candidates, top_k
+from synthetic import generate_users
+from user_store import UserStore
+
+PROJECTS = [
+    {"project_id": 101, "required_skills": ["Python"], "preferred_skills": ["Machine Learning", "AWS"], "domain": "AI"},
+    {"project_id": 102, "required_skills": [], "preferred_skills": ["Node.js", "GraphQL", "MongoDB"], "domain": "Web"},
+    {"project_id": 103, "required_skills": ["Java"], "preferred_skills": ["Spring Boot", "SQL"], "domain": "Backend"},
+    {"project_id": 104, "required_skills": [], "preferred_skills": ["Docker", "Kubernetes", "AWS"], "domain": "Cloud"},
+]
+
+
+def recommendation_recall(store, index, project, k, retrieve):
+    # Share of the exact top-k ensemble ranking that survives the retrieval stage,
+    # counting ties with the exact k-th score as hits
+    _, exact = score_candidates(store, project)
+    _, approximate = score_candidates(store, project, index, retrieve)
+    if not exact or not approximate:
+        return 0.0
+    exact_top = exact['ensemble_score'][top_k(exact['ensemble_score'], k)]
+    approximate_top = approximate['ensemble_score'][top_k(approximate['ensemble_score'], k)]
+    return np.count_nonzero(approximate_top >= exact_top[-1] - 1e-12) / len(exact_top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall and latency of ANN retrieval against brute force")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--retrieve", type=int, default=2000)
+    parser.add_argument("--components", type=int, default=None)
+    args = parser.parse_args()
+
+    store = UserStore.from_users(generate_users(args.users))
+    start = time.perf_counter()
+    index = SkillEmbeddingIndex(store, n_components=args.components)
+    print(f"index build {time.perf_counter() - start:.2f}s, {index.n_bits} bits x {len(index.tables)} tables")
+
+    skill_lists = [project["preferred_skills"] for project in PROJECTS]
+    print(f"retrieval recall@{args.k}: {recall_at_k(index, skill_lists, args.k):.3f}")
+
+    for project in PROJECTS:
+        start = time.perf_counter()
+        index.query(project["preferred_skills"], args.retrieve)
+        ann_time = time.perf_counter() - start
+        start = time.perf_counter()
+        index.brute_force(project["preferred_skills"], args.retrieve)
+        brute_time = time.perf_counter() - start
+        recall = recommendation_recall(store, index, project, args.k, args.retrieve)
+        print(f"project {project['project_id']}: ann {ann_time * 1000:.1f}ms, brute force {brute_time * 1000:.1f}ms, "
+              f"recommendation recall@{args.k} {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitset import has_all, overlap, pack_ids
+from synthetic import generate_users
+from user_store import UserStore
+
+# Required/preferred skill pairs: one rare-ish, one empty requirement, one multi-skill
+QUERIES = [
+    (["Python"], ["Machine Learning", "AWS"]),
+    ([], ["Node.js", "GraphQL", "MongoDB"]),
+    (["JavaScript", "Node.js"], ["TypeScript", "GraphQL", "AWS"]),
+]
+
+
+def set_kernel(skill_sets, required, preferred):
+    # What the per-row pipeline did: issubset filter + set intersection count
+    required = set(required)
+    preferred = set(preferred)
+    matches = []
+    overlaps = []
+    for row, skills in enumerate(skill_sets):
+        if required.issubset(skills):
+            matches.append(row)
+            overlaps.append(len(skills & preferred))
+    return np.array(matches, dtype=np.int64), np.array(overlaps, dtype=np.int64)
+
+
+def bitset_kernel(store, required, preferred):
+    # Full-pool scan over the packed bitsets (no posting lists)
+    n_skills = len(store.skill_vocab)
+    required_bits = pack_ids(store.skill_vocab.encode(required), n_skills)
+    preferred_bits = pack_ids(store.skill_vocab.encode(preferred), n_skills)
+    rows = np.flatnonzero(has_all(store.skill_bits, required_bits))
+    return rows, overlap(store.skill_bits, preferred_bits, rows)
+
+
+def indexed_kernel(store, required, preferred):
+    # What scoring.py does: rarest posting list, then bitsets of just those rows
+    rows = store.match_required(required)
+    preferred_bits = pack_ids(store.skill_vocab.encode(preferred), len(store.skill_vocab))
+    return rows, overlap(store.skill_bits, preferred_bits, rows)
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set-based vs bitset skill matching")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'query':>6} {'matches':>9} {'sets s':>9} {'bitset s':>9} {'indexed s':>10} {'speedup':>8}")
+    for size in args.sizes:
+        users = generate_users(size)
+        store = UserStore.from_users(users)
+        skill_sets = [set(user["skills"]) for user in users]
+        for number, (required, preferred) in enumerate(QUERIES):
+            (rows, counts), set_time = best_of(1, set_kernel, skill_sets, required, preferred)
+            (bit_rows, bit_counts), bit_time = best_of(args.repeat, bitset_kernel, store, required, preferred)
+            (idx_rows, idx_counts), idx_time = best_of(args.repeat, indexed_kernel, store, required, preferred)
+            for other_rows, other_counts in ((bit_rows, bit_counts), (idx_rows, idx_counts)):
+                if not (np.array_equal(rows, other_rows) and np.array_equal(counts, other_counts)):
+                    raise SystemExit(f"Mismatch for query {number} at {size} users")
+            print(f"{size:>10} {number:>6} {len(rows):>9} {set_time:>9.4f} {bit_time:>9.4f} "
+                  f"{idx_time:>10.4f} {set_time / idx_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
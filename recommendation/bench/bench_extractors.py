@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors import EXTRACTORS, get_extractor
+from make_fixtures import FIXTURES_DIR
+
+# Parse time and peak Python memory per profile for each extractor backend on
+# the saved fixture pages (regenerate them with
+# `python bench/make_fixtures.py --out bench/fixtures`). tracemalloc only sees
+# Python allocations, so lxml's libxml2 tree is not in its peak.
+
+
+def load(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def time_per_call(fn, repeat):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML extractor backends on fixture pages")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = {"github": load("github_profile.html"), "hackerrank": load("hackerrank_profile.html")}
+    print(f"{'page':>11} {'backend':>8} {'ms/profile':>11} {'peak KB':>9} {'speedup':>8}  result")
+    for page, html in pages.items():
+        baseline = None
+        expected = None
+        for name in EXTRACTORS:
+            try:
+                extractor = get_extractor(name)
+            except ImportError as e:
+                print(f"{page:>11} {name:>8}  skipped: {e}")
+                continue
+            if page == "github":
+                fn = lambda: extractor.github(html, "octo-fixture")
+            else:
+                fn = lambda: extractor.hackerrank(html)
+            result = fn()
+            expected = expected or result
+            if result != expected:
+                raise SystemExit(f"{name} extracted {result} from {page}, expected {expected}")
+            seconds = time_per_call(fn, args.repeat)
+            baseline = baseline or seconds
+            print(f"{page:>11} {name:>8} {seconds * 1000:>11.2f} {peak_memory(fn) / 1024:>9.0f} "
+                  f"{baseline / seconds:>7.1f}x  {result}")
+
+
+if __name__ == "__main__":
+    main()
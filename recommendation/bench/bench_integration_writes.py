@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_supabase import FakeSupabase
+from integration_store import IntegrationWriteBuffer, merge_integrations
+
+PLATFORMS = ("github", "leetcode", "hackerrank")
+
+
+def read_modify_write(client, user_id, platform, data):
+    # The old update_integrations: SELECT the whole object, then UPDATE it back
+    response = client.table("users").select("integrations").eq("id", user_id).single().execute()
+    existing = (response.data or {}).get("integrations") or {}
+    existing[platform] = data
+    return client.table("users").update({"integrations": existing}).eq("id", user_id).execute()
+
+
+def rpc_merge(client, user_id, platform, data):
+    return merge_integrations(client, user_id, {platform: data})
+
+
+def run(writer, client, writes, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda write: writer(client, *write), writes))
+    return time.perf_counter() - start
+
+
+def lost_platforms(client, n_users):
+    # Every user was sent all platforms; count the ones a concurrent write dropped
+    return sum(len(PLATFORMS) - len(client.users[i]["integrations"] or {}) for i in range(n_users))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Integration write paths against a fake Supabase")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds per simulated round trip")
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    # All platforms of a user are written back to back, so concurrent writes to
+    # the same row are common, as in a bulk refresh
+    writes = [(user_id, platform, {"username": f"user{user_id}"}) for user_id in range(args.users) for platform in PLATFORMS]
+    print(f"{'path':>18} {'seconds':>8} {'round trips':>12} {'lost platforms':>15}")
+    for name, writer in (("read-modify-write", read_modify_write), ("merge rpc", rpc_merge)):
+        client = FakeSupabase(range(args.users), args.latency)
+        seconds = run(writer, client, writes, args.threads)
+        print(f"{name:>18} {seconds:>8.2f} {client.round_trips:>12} {lost_platforms(client, args.users):>15}")
+
+    client = FakeSupabase(range(args.users), args.latency)
+    buffer = IntegrationWriteBuffer(client, flush_interval=0)
+    seconds = run(lambda client, *write: buffer.add(*write), client, writes, args.threads)
+    start = time.perf_counter()
+    buffer.close()
+    seconds += time.perf_counter() - start
+    print(f"{'buffered bulk':>18} {seconds:>8.2f} {client.round_trips:>12} {lost_platforms(client, args.users):>15}")
+
+
+if __name__ == "__main__":
+    main()
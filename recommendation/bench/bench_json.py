@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_provider import PROVIDERS
+from responses import encode_recommendations, recommendation_rows
+from scoring import build_frame, rank, score_candidates
+from synthetic import generate_users
+from user_store import UserStore
+
+# Serializing a page of recommendations: the DataFrame + to_json path
+# get_recommendations used vs typed rows encoded by each installed JSON
+# provider. Every payload is checked against the to_json one.
+
+
+def to_json_payload(store, rows, scores, order):
+    return build_frame(store, rows, scores, order).to_json(orient='records')
+
+
+def typed_payload(provider):
+    def encode(store, rows, scores, order):
+        return encode_recommendations(provider, recommendation_rows(store, rows, scores, order))
+    return encode
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="to_json vs typed rows + JSON provider")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    store = UserStore.from_users(generate_users(args.users))
+    project = {"required_skills": [], "preferred_skills": ["Python", "AWS", "Docker"], "domain": "AI"}
+    rows, scores = score_candidates(store, project)
+
+    app = Flask(__name__)
+    paths = [("to_json", to_json_payload)]
+    for name, provider_class in PROVIDERS.items():
+        try:
+            paths.append((f"rows+{name}", typed_payload(provider_class(app))))
+        except ImportError as e:
+            print(f"Skipping {name}: {str(e)}")
+
+    print(f"{'rows':>7} " + " ".join(f"{name:>14}" for name, _ in paths) + "   (ms)")
+    for limit in args.limits:
+        order = rank(rows, scores, limit)
+        payloads = []
+        timings = []
+        for name, encode in paths:
+            payload, seconds = best_of(args.repeat, encode, store, rows, scores, order)
+            payloads.append(payload)  # Parsed only after timing: a big parsed payload slows the GC
+            timings.append(seconds)
+        expected = json.loads(payloads[0])
+        for (name, _), payload in zip(paths[1:], payloads[1:]):
+            if json.loads(payload) != expected:
+                raise SystemExit(f"{name} payload differs from to_json at {limit} rows")
+        print(f"{len(order):>7} " + " ".join(f"{seconds * 1e3:>14.2f}" for seconds in timings)
+              + "   " + " ".join(f"{timings[0] / seconds:.1f}x" for seconds in timings[1:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import recommendations_frame
+from synthetic import generate_users
+from user_store import UserStore
+
+PROJECTS = [
+    {"project_id": 101, "required_skills": ["Python"], "preferred_skills": ["Machine Learning", "AWS"], "domain": "AI"},
+    {"project_id": 102, "required_skills": [], "preferred_skills": ["Node.js", "GraphQL", "MongoDB"], "domain": "Web"},
+    {"project_id": 103, "required_skills": ["Docker", "Kubernetes"], "preferred_skills": ["AWS"], "domain": "Cloud"},
+]
+
+
+def fixed_jaccard_similarity(user_skills, preferred_skills):
+    user_skills_set = set(user_skills)
+    project_skills_set = set(preferred_skills)
+    intersection = len(user_skills_set & project_skills_set)
+    denominator = len(project_skills_set)
+    return intersection / denominator if denominator != 0 else 0
+
+
+def legacy_recommendations_frame(users, project):
+    # The per-row get_recommendations pipeline this engine replaces
+    filtered_users = []
+    for user in users:
+        if set(project["required_skills"]).issubset(set(user["skills"])):
+            filtered_users.append({
+                'user_id': user.get('user_id'),
+                'name': user.get('name'),
+                'skills': user.get('skills', []),
+                'feedback': user.get('feedback', 0),
+                'projects_completed': user.get('projects_completed', 0),
+                'completed_projects': user.get('completed_projects', [])
+            })
+    if not filtered_users:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(filtered_users)
+    df['content_based'] = df['skills'].apply(
+        lambda x: fixed_jaccard_similarity(x, project['preferred_skills'])
+    )
+    df['popularity_score'] = df['feedback'] * 0.1 + \
+        df.apply(lambda x: 0.5 if x['projects_completed'] > 10
+                 else (x['projects_completed']/2) * 0.1, axis=1)
+    df['pre_requisite_score'] = 1.0
+    df['collaborative_score'] = df['completed_projects'].apply(
+        lambda x: 0.8 if any(p.get('domain') == project['domain'] for p in x) else 0.3
+    )
+    df['ensemble_score'] = (
+        df['content_based'] * 0.3 +
+        df['popularity_score'] * 0.2 +
+        df['pre_requisite_score'] * 0.3 +
+        df['collaborative_score'] * 0.2
+    )
+    return df
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row and columnar scoring")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--skip-legacy-above", type=int, default=None,
+                        help="Only time the columnar engine for pools larger than this")
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'project':>8} {'matches':>9} {'legacy s':>10} {'columnar s':>11} {'speedup':>8}")
+    for size in args.sizes:
+        users = generate_users(size)
+        store, build_time = timed(UserStore.from_users, users)
+        print(f"{size:>10} store build {build_time:.2f}s")
+        for project in PROJECTS:
+            new, new_time = timed(recommendations_frame, store, project)
+            if args.skip_legacy_above is not None and size > args.skip_legacy_above:
+                print(f"{size:>10} {project['project_id']:>8} {len(new):>9} {'-':>10} {new_time:>11.4f} {'-':>8}")
+                continue
+            old, old_time = timed(legacy_recommendations_frame, users, project)
+            # The columnar frame comes back ranked; compare per user
+            if len(old) != len(new) or len(new) > 0 and not np.array_equal(
+                old.sort_values('user_id')['ensemble_score'].to_numpy(),
+                new.sort_values('user_id')['ensemble_score'].to_numpy(),
+            ):
+                raise SystemExit(f"ensemble_score mismatch for project {project['project_id']} at {size} users")
+            print(f"{size:>10} {project['project_id']:>8} {len(new):>9} {old_time:>10.4f} "
+                  f"{new_time:>11.4f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
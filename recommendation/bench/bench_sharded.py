@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_scoring import PROJECTS
+from scoring import recommendations_frame
+from sharded import ShardedScorer
+from synthetic import generate_users
+from user_store import UserStore
+
+# Single-request latency of get_recommendations' scoring, in the request
+# thread vs sharded over 1..N threads or processes. Every sharded result is
+# checked against the single-threaded one.
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded vs single-threaded scoring latency")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--modes", nargs="+", default=["thread", "process"], choices=["thread", "process"])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    store = UserStore.from_users(generate_users(args.users))
+    print(f"{args.users} users, limit={args.limit}, cpus={os.cpu_count()}")
+    print(f"{'project':>8} {'mode':>8} {'shards':>7} {'ms':>9} {'speedup':>8}")
+    for project in PROJECTS:
+        store.collaborative(project["domain"])  # Memoized, as after the first request
+        expected, baseline = best_of(args.repeat, recommendations_frame, store, project, args.limit)
+        print(f"{project['project_id']:>8} {'single':>8} {1:>7} {baseline * 1e3:>9.1f} {1:>7.2f}x")
+        for mode in args.modes:
+            for shards in args.shards:
+                scorer = ShardedScorer(shards, mode)
+                try:
+                    scorer.recommendations_frame(store, project, args.limit)  # Start workers, map columns
+                    frame, seconds = best_of(args.repeat, scorer.recommendations_frame, store, project, args.limit)
+                finally:
+                    scorer.close()
+                if not frame.equals(expected):
+                    raise SystemExit(f"Sharded result differs for project {project['project_id']} ({mode}, {shards} shards)")
+                print(f"{'':>8} {mode:>8} {shards:>7} {seconds * 1e3:>9.1f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_scoring import PROJECTS
+from scoring import candidate_rows, collaborative_scores, content_scores, popularity_scores, score_candidates
+from synthetic import generate_users
+from user_store import UserStore
+
+# Per-request cost of the user-only score components: recomputed from the raw
+# columns on every request (as before) vs precomputed popularity and memoized
+# per-domain collaborative scores.
+
+
+def recomputed_popularity(store, rows):
+    projects_completed = store.projects_completed[rows]
+    return store.feedback[rows] * 0.1 + np.where(projects_completed > 10, 0.5, (projects_completed / 2) * 0.1)
+
+
+def recomputed_collaborative(store, rows, domain):
+    column = store.domain_vocab.get(domain)
+    if column is None:
+        return np.full(len(rows), 0.3)
+    return np.where(store.domains[rows, column], 0.8, 0.3)
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the static score components per request")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--profile", action="store_true", help="Also print a cProfile of score_candidates")
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'project':>8} {'rows':>9} {'content ms':>11} {'popularity ms':>14} "
+          f"{'memo ms':>8} {'collab ms':>10} {'memo ms':>8} {'saved':>6}")
+    for size in args.sizes:
+        store = UserStore.from_users(generate_users(size))
+        for project in PROJECTS:
+            rows = candidate_rows(store, project)
+            domain = project["domain"]
+            store.collaborative(domain)  # Memoized once, as on the first request for a domain
+            _, content = best_of(args.repeat, content_scores, store, rows, project["preferred_skills"])
+            old_pop, pop = best_of(args.repeat, recomputed_popularity, store, rows)
+            new_pop, memo_pop = best_of(args.repeat, popularity_scores, store, rows)
+            old_col, col = best_of(args.repeat, recomputed_collaborative, store, rows, domain)
+            new_col, memo_col = best_of(args.repeat, collaborative_scores, store, rows, domain)
+            if not (np.array_equal(old_pop, new_pop) and np.array_equal(old_col, new_col)):
+                raise SystemExit(f"Memoized scores differ for project {project['project_id']} at {size} users")
+            before = content + pop + col
+            after = content + memo_pop + memo_col
+            print(f"{size:>10} {project['project_id']:>8} {len(rows):>9} {content * 1e3:>11.2f} {pop * 1e3:>14.2f} "
+                  f"{memo_pop * 1e3:>8.2f} {col * 1e3:>10.2f} {memo_col * 1e3:>8.2f} {1 - after / before:>6.0%}")
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            for project in PROJECTS:
+                score_candidates(store, project)
+            profiler.disable()
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(12)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import copy
+import threading
+import time
+from types import SimpleNamespace
+
+# In-memory stand-in for the slice of the supabase-py client the integrations
+# service uses: table("users").select/update(...).eq(...).single().execute() and
+# rpc("merge_integrations" / "merge_integrations_bulk"). Every execute() counts
+# as one round trip and sleeps `latency` seconds. RPCs run atomically like a
+# single SQL statement; a table select followed by an update does not.
+
+
+class FakeSupabase:
+    def __init__(self, users=None, latency=0.0):
+        self.users = {user_id: {"integrations": None, "integration_handles": None} for user_id in users or []}
+        self.latency = latency
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def _round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def table(self, name):
+        return _Query(self)
+
+    def rpc(self, name, params):
+        return _Call(self, getattr(self, f"_rpc_{name}"), params)
+
+    def _merge(self, user_id, patch, handles):
+        row = self.users.get(user_id)
+        if row is None:
+            return None
+        row["integrations"] = {**(row["integrations"] or {}), **patch}
+        row["integration_handles"] = {**(row["integration_handles"] or {}), **(handles or {})}
+        return row["integrations"]
+
+    def _rpc_merge_integrations(self, params):
+        with self._lock:
+            return self._merge(params["p_user_id"], params["p_patch"], params.get("p_handles"))
+
+    def _rpc_merge_integrations_bulk(self, params):
+        with self._lock:
+            return [u["id"] for u in params["p_updates"] if self._merge(u["id"], u["patch"], u.get("handles")) is not None]
+
+
+class _Call:
+    def __init__(self, client, fn, params):
+        self.client = client
+        self.fn = fn
+        self.params = params
+
+    def execute(self):
+        self.client._round_trip()
+        return SimpleNamespace(data=self.fn(self.params))
+
+
+class _Query:
+    def __init__(self, client):
+        self.client = client
+        self.columns = None
+        self.values = None
+        self.user_id = None
+        self.one = False
+
+    def select(self, columns):
+        self.columns = [column.strip() for column in columns.split(",")]
+        return self
+
+    def update(self, values):
+        self.values = values
+        return self
+
+    def eq(self, column, value):
+        self.user_id = value
+        return self
+
+    def single(self):
+        self.one = True
+        return self
+
+    def execute(self):
+        self.client._round_trip()
+        with self.client._lock:
+            row = self.client.users.get(self.user_id)
+            if row is None:
+                return SimpleNamespace(data=None if self.one else [])
+            if self.values is not None:
+                row.update(self.values)
+            data = copy.deepcopy({"id": self.user_id, **{key: row.get(key) for key in self.columns or row}})
+        return SimpleNamespace(data=data if self.one else [data])
@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import Pool
+
+import httpx
+import numpy as np
+
+RECOMMENDATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RECOMMENDATION_DIR)
+
+from synthetic import DATA_PATH, UserGenerator, write_users
+
+# Starts the recommender under gunicorn (gunicorn.conf.py, preloaded) once per
+# worker count and drives POST /recommend from several client processes for a
+# fixed time, reporting throughput and p50/p95/p99 latency, to show how the
+# server scales with workers. --url loads a server that is already running.
+#
+#   python bench/load_test.py --workers 1,2,4 --users 100000 --json before.json
+#   python bench/load_test.py --workers 1,2,4 --users 100000 --compare before.json
+#
+# Projects are drawn from the skills/domains in the served pool. The result
+# cache is off unless --cache is given, so every request is scored.
+
+
+def make_projects(users, n_projects, seed=0):
+    # Skills and domains are drawn from their occurrences in `users`, so common
+    # skills show up in projects about as often as they do in the pool
+    rng = random.Random(seed)
+    skills = [skill for user in users for skill in user["skills"]]
+    domains = [p["domain"] for user in users for p in user["completed_projects"]]
+    return [{
+        "project_id": i,
+        "required_skills": rng.sample(skills, rng.randint(0, 1)),
+        "preferred_skills": list(dict.fromkeys(rng.sample(skills, rng.randint(1, 4)))),
+        "domain": rng.choice(domains),
+    } for i in range(n_projects)]
+
+
+def start_server(data_dir, port, workers, threads, cache):
+    env = dict(os.environ, GUNICORN_PORT=str(port), GUNICORN_WORKERS=str(workers), GUNICORN_THREADS=str(threads))
+    if not cache:
+        env["RESULT_CACHE_SIZE"] = "0"
+    # cwd is the data directory so app.py loads its data.json
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(RECOMMENDATION_DIR, "gunicorn.conf.py"),
+         "--pythonpath", RECOMMENDATION_DIR, "app:app"],
+        cwd=data_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {server.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/users/stats", timeout=1).raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("gunicorn did not come up")
+
+
+def run_client(args):
+    # One client process: `concurrency` threads with their own connection each,
+    # posting projects until `duration` is up. Returns (latencies, errors).
+    url, projects, concurrency, duration, seed = args
+    deadline = time.monotonic() + duration
+    latencies, errors = [], [0]
+
+    def loop(thread_seed):
+        rng = random.Random(thread_seed)
+        with httpx.Client(timeout=30) as client:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    client.post(url, json=rng.choice(projects)).raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=loop, args=(seed * 1000 + i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def drive(url, projects, clients, concurrency, duration):
+    with Pool(clients) as pool:
+        results = pool.map(run_client, [(url, projects, concurrency, duration, seed) for seed in range(clients)])
+    latencies = np.concatenate([np.asarray(latency) for latency, _ in results])
+    return latencies, sum(errors for _, errors in results)
+
+
+def percentiles(latencies):
+    ms = latencies * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (0.0, 0.0, 0.0)
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "mean_ms": float(ms.mean()) if len(ms) else 0.0}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RECOMMENDATION_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(runs, path):
+    # Throughput and tail latency against a previous --json report, per worker count
+    with open(path, "r") as file:
+        previous = json.load(file)
+    before = {run["workers"]: run for run in previous["runs"]}
+    print(f"vs {path} (commit {previous.get('commit')})")
+    print(f"{'workers':>8} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for run in runs:
+        old = before.get(run["workers"])
+        if old is None:
+            continue
+        deltas = [run[key] / old[key] - 1 if old[key] else 0.0 for key in ("throughput", "p50_ms", "p95_ms", "p99_ms")]
+        print(f"{run['workers']:>8} " + " ".join(f"{delta:>+8.1%}" for delta in deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput of /recommend under gunicorn per worker count")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to try")
+    parser.add_argument("--threads", type=int, default=4, help="Threads per worker")
+    parser.add_argument("--users", type=int, default=None, help="Serve a synthetic pool of this size instead of data.json")
+    parser.add_argument("--distribution", choices=["data", "zipf"], default="zipf", help="Skill distribution of --users")
+    parser.add_argument("--url", default=None, help="Load an already running server instead (e.g. http://127.0.0.1:5000)")
+    parser.add_argument("--clients", type=int, default=4, help="Load generator processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="Connections per client process")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--limit", type=int, default=20, help="?limit= on every request")
+    parser.add_argument("--port", type=int, default=5050)
+    parser.add_argument("--cache", action="store_true", help="Leave the result cache on")
+    parser.add_argument("--json", default=None, help="Write the results to this file")
+    parser.add_argument("--compare", default=None, help="Print the change against an earlier --json file")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="prohunt-load-")
+    try:
+        if args.users and not args.url:
+            write_users(os.path.join(data_dir, "data.json"), args.users, distribution=args.distribution)
+            sample = UserGenerator(args.distribution).chunk(0, min(args.users, 10_000))
+        else:
+            shutil.copy(DATA_PATH, os.path.join(data_dir, "data.json"))
+            with open(DATA_PATH, "r") as file:
+                sample = json.load(file)
+        projects = make_projects(sample, 500)
+        n_users = None if args.url else args.users or len(sample)
+        print(f"{n_users or 'external'} users, {args.clients}x{args.concurrency} connections, "
+              f"{args.duration:.0f}s per run, cpus={os.cpu_count()}")
+        print(f"{'workers':>8} {'req/s':>9} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+        runs = []
+        baseline = None
+        for workers in ["external"] if args.url else [int(w) for w in args.workers.split(",")]:
+            server = None if args.url else start_server(data_dir, args.port, workers, args.threads, args.cache)
+            url = f"{args.url or f'http://127.0.0.1:{args.port}'}/recommend?limit={args.limit}"
+            try:
+                drive(url, projects, args.clients, args.concurrency, min(2.0, args.duration))  # Warm-up
+                latencies, errors = drive(url, projects, args.clients, args.concurrency, args.duration)
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait()
+            run = dict(workers=workers, requests=len(latencies), errors=errors,
+                       throughput=len(latencies) / args.duration, **percentiles(latencies))
+            runs.append(run)
+            baseline = baseline or run["throughput"]
+            print(f"{workers:>8} {run['throughput']:>9.1f} {run['throughput'] / baseline:>7.2f}x {run['p50_ms']:>8.1f} "
+                  f"{run['p95_ms']:>8.1f} {run['p99_ms']:>8.1f} {errors:>7}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.json:
+        report = {"commit": git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "users": n_users,
+                  "cpus": os.cpu_count(), "params": vars(args), "runs": runs}
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Wrote {args.json}")
+    if args.compare:
+        compare(runs, args.compare)
+
+
+if __name__ == "__main__":
+    main()
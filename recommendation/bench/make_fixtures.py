@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import random
+
+# Writes the saved profile pages used by bench_extractors.py. They follow the
+# markup the scrapers rely on (Counter spans in the profile nav, the sidebar
+# block with followers/following, HackerRank badge cards) and are padded with
+# the same kind of bulk the real pages carry: inline JSON/CSS in <head>, the
+# contribution calendar, pinned repositories and the footer.
+#
+#   python bench/make_fixtures.py                        # dry run: sizes only
+#   python bench/make_fixtures.py --out bench/fixtures   # regenerate the saved pages
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def head(rng, title, payload_items):
+    payload = json.dumps([
+        {"id": i, "name": f"item-{i}", "description": "x" * rng.randint(20, 80), "tags": ["a", "b", "c"]}
+        for i in range(payload_items)
+    ])
+    style = "\n".join(f".c{i} {{ margin: {i % 16}px; padding: {i % 8}px; color: #{i % 4096:03x}; }}" for i in range(400))
+    return (
+        f"<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n<title>{title}</title>\n"
+        + "".join(f'<link rel="stylesheet" href="/assets/bundle-{i}.css">\n' for i in range(12))
+        + f"<style>\n{style}\n</style>\n"
+        + f'<script type="application/json" id="embedded-data">{payload}</script>\n</head>\n'
+    )
+
+
+def github_page(rng, user="octo-fixture"):
+    counters = [("Repositories", 42), ("Projects", 0), ("Packages", 3), ("Stars", 1234)]
+    nav = "".join(
+        f'<a class="UnderlineNav-item" href="/{user}?tab={name.lower()}">{name}'
+        f' <span title="{count}" class="Counter">{count}</span></a>\n'
+        for name, count in counters
+    )
+    sidebar = (
+        '<div class="js-profile-editable-replace"><div class="clearfix d-flex d-md-block flex-items-center mb-4 mb-md-0">'
+        '<div class="mb-3">'
+        f'<a class="Link--secondary" href="/{user}?tab=followers"><svg height="16"></svg>'
+        '<span class="text-bold color-fg-default">3.4k</span> followers</a> · '
+        f'<a class="Link--secondary" href="/{user}?tab=following"><span class="text-bold color-fg-default">87</span> following</a>'
+        '</div></div>'
+        '<ul class="vcard-details"><li><span class="p-label">Somewhere</span></li></ul></div>\n'
+    )
+    weeks = "".join(
+        "<tr>" + "".join(
+            f'<td tabindex="0" data-date="2024-{1 + w % 12:02d}-{1 + d:02d}" data-level="{rng.randint(0, 4)}" '
+            f'class="ContributionCalendar-day"><span class="sr-only">{rng.randint(0, 20)} contributions</span></td>'
+            for d in range(7)
+        ) + "</tr>\n"
+        for w in range(53)
+    )
+    pinned = "".join(
+        f'<li class="pinned-item-list-item"><div class="Box"><a href="/{user}/repo-{i}"><span class="repo">repo-{i}</span></a>'
+        f'<p class="pinned-item-desc">{"lorem ipsum " * rng.randint(5, 20)}</p>'
+        f'<span class="d-inline-block mr-3"><span itemprop="programmingLanguage">Python</span></span>'
+        f'<a class="pinned-item-meta" href="/{user}/repo-{i}/stargazers">{rng.randint(0, 900)}</a></div></li>\n'
+        for i in range(6)
+    )
+    footer = "".join(f'<li class="mr-3"><a href="/site/{i}">Footer link {i}</a></li>\n' for i in range(40))
+    return (
+        head(rng, f"{user} (Fixture) · GitHub", 600)
+        + '<body class="logged-out env-production page-responsive">\n'
+        + '<div class="application-main " data-commit-hovercards-enabled>\n<main id="js-pjax-container">\n'
+        + f'<div><div class="mt-4 position-sticky top-0"><nav class="UnderlineNav">{nav}</nav></div>\n'
+        + '<div class="container-xl"><div class="Layout-main"><div><div>\n<div class="Layout-sidebar"><div><div>\n'
+        + f'<span class="p-nickname vcard-username d-block">{user}</span>\n'
+        + sidebar
+        + '</div></div></div>\n'
+        + f'<div class="js-yearly-contributions"><table class="ContributionCalendar-grid">{weeks}</table></div>\n'
+        + f'<ol class="pinned-items">{pinned}</ol>\n'
+        + '</div></div></div></div></div>\n</main>\n</div>\n'
+        + f'<footer class="footer"><ul>{footer}</ul></footer>\n</body>\n</html>\n'
+    )
+
+
+def hackerrank_page(rng, user="hr-fixture", badges=7):
+    cards = "".join(
+        f'<div class="hacker-badge"><div class="badge-card"><svg class="badge"><text>{name}</text></svg>'
+        f'<div class="badge-title">{name}</div><div class="badge-stars">{"★" * rng.randint(1, 5)}</div></div></div>\n'
+        for name in ["Problem Solving", "Python", "SQL", "Java", "C++", "30 Days of Code", "10 Days of JS"][:badges]
+    )
+    submissions = "".join(
+        f'<div class="submission-row"><span class="challenge">Challenge {i}</span><span class="score">{rng.randint(0, 100)}</span></div>\n'
+        for i in range(400)
+    )
+    return (
+        head(rng, f"{user} | HackerRank", 400)
+        + f'<body><div id="content"><div class="profile-page"><section class="badges">{cards}</section>\n'
+        + f'<section class="recent-submissions">{submissions}</section></div></div></body>\n</html>\n'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Saved profile pages for bench_extractors.py")
+    parser.add_argument("--out", help=f"Directory to write the pages to (bench_extractors.py reads {FIXTURES_DIR}); "
+                                      "without it nothing is written")
+    parser.add_argument("--seed", type=int, default=7, help="Seed of the padding (7 reproduces the saved pages)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    for name, page in (("github_profile.html", github_page(rng)), ("hackerrank_profile.html", hackerrank_page(rng))):
+        size = len(page.encode("utf-8")) // 1024
+        if not args.out:
+            print(f"Would write {name} ({size} KB); pass --out to write it")
+            continue
+        path = os.path.join(args.out, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(page)
+        print(f"Wrote {path} ({size} KB)")
+
+
+if __name__ == "__main__":
+    main()
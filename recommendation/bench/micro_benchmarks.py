@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+
+RECOMMENDATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RECOMMENDATION_DIR)
+os.chdir(RECOMMENDATION_DIR)  # app.py loads data.json from the working directory
+
+import app
+from bench_scoring import PROJECTS
+from records import to_records
+from result_cache import ResultCache
+from synthetic import generate_users
+from user_pool import UserPool
+from user_store import UserStore
+
+# pytest-benchmark microbenchmarks of the app.py scoring functions on synthetic
+# pools (bench/synthetic.py):
+#
+#   pytest bench/micro_benchmarks.py --benchmark-autosave
+#   pytest bench/micro_benchmarks.py --benchmark-compare    # against the last saved run
+#
+# BENCH_USERS sets the pool sizes (comma-separated, default 10000) and
+# BENCH_DISTRIBUTION the skill distribution ("zipf" or "data").
+
+SIZES = [int(size) for size in os.environ.get("BENCH_USERS", "10000").split(",")]
+DISTRIBUTION = os.environ.get("BENCH_DISTRIBUTION", "zipf")
+PROJECT = PROJECTS[0]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}users")
+def users(request):
+    return generate_users(request.param, distribution=DISTRIBUTION)
+
+
+@pytest.fixture(scope="module")
+def records(users):
+    return to_records(users, app.skill_vocab, app.domain_vocab)
+
+
+@pytest.fixture
+def served(users, monkeypatch):
+    # Point app.py at a pool of the synthetic users, with the result cache off
+    # so every call is scored
+    monkeypatch.setattr(app, "pool", UserPool(UserStore.from_users(users), ann=None))
+    monkeypatch.setattr(app, "results", ResultCache(max_size=0))
+
+
+def test_fixed_jaccard_similarity(benchmark, records):
+    preferred = app.skill_vocab.bits(PROJECT["preferred_skills"])
+    denominator = len(set(PROJECT["preferred_skills"]))
+    benchmark(lambda: [app.fixed_jaccard_similarity(user.skills, preferred, denominator) for user in records])
+
+
+def test_pre_requisite_based(benchmark, records):
+    benchmark(app.pre_requisite_based, records, PROJECT)
+
+
+def test_collaborative_based(benchmark, records):
+    benchmark(app.collaborative_based, records, PROJECT)
+
+
+def test_ensemble_scoring(benchmark, users):
+    result = benchmark(app.ensemble_scoring, users, PROJECT)
+    assert not result.empty
+
+
+@pytest.mark.parametrize("limit", [20, None], ids=["limit20", "all"])
+def test_get_recommendations(benchmark, served, limit):
+    result = benchmark(app.get_recommendations, PROJECT, limit)
+    assert result != "[]"
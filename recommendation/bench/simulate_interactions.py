@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interaction_log import InteractionLog
+from load_test import make_projects
+from scoring import ENSEMBLE_FEATURES, rank, score_candidates
+from snapshot import load_columns
+from user_store import UserStore
+
+# Writes an interaction log (interaction_log.py) for train_weights.py to learn
+# from, without real traffic: each project's top --shown users under the fixed
+# weights are "shown", and users are viewed/invited/accepted in order of a
+# hidden utility, the --weights dot product of their scores plus Gumbel noise.
+# The weights train_weights.py recovers should lean towards the hidden ones:
+#
+#   python bench/simulate_interactions.py --out /tmp/interactions --weights 0.6 0.05 0.3 0.35
+#   python train_weights.py --interactions /tmp/interactions --model-dir /tmp/models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated interaction logs for train_weights.py")
+    parser.add_argument("--data", default="data.json", help="User pool (the one train_weights.py reads)")
+    parser.add_argument("--out", required=True, help="Interaction log directory")
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--shown", type=int, default=20, help="Users shown per project")
+    parser.add_argument("--weights", type=float, nargs=len(ENSEMBLE_FEATURES), default=[0.6, 0.05, 0.3, 0.35],
+                        help=f"Hidden utility weights ({', '.join(ENSEMBLE_FEATURES)})")
+    parser.add_argument("--noise", type=float, default=0.05, help="Gumbel noise scale of the utility")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.data, "r") as file:
+        users = json.load(file)
+    store = UserStore(load_columns(args.data))
+    log = InteractionLog(args.out)
+    rng = np.random.default_rng(args.seed)
+    hidden = np.array(args.weights)
+
+    logged = 0
+    for project in make_projects(users, args.projects, args.seed):
+        rows, scores = score_candidates(store, project)
+        if len(rows) < 2:
+            continue
+        order = rank(rows, scores, args.shown)
+        user_ids = store.column(rows[order], "user_id")
+        features = np.column_stack([scores[feature][order] for feature in ENSEMBLE_FEATURES])
+        preferred = np.argsort(-(features @ hidden + rng.gumbel(0, args.noise, len(order))))
+        log.append(project, "shown", user_ids)
+        log.append(project, "viewed", [user_ids[i] for i in preferred[:5]])
+        log.append(project, "invited", [user_ids[i] for i in preferred[:2]])
+        log.append(project, "accepted", [user_ids[i] for i in preferred[:1]])
+        logged += 1
+    print(f"Logged interactions for {logged} projects to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
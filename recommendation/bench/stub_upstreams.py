@@ -0,0 +1,96 @@
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for GitHub, LeetCode and HackerRank so the integrations service
+# can be exercised without touching the real sites:
+#
+#   python bench/stub_upstreams.py --port 8900 --delay 0.2
+#   GITHUB_BASE_URL=http://127.0.0.1:8900/github \
+#   LEETCODE_BASE_URL=http://127.0.0.1:8900/leetcode \
+#   HACKERRANK_BASE_URL=http://127.0.0.1:8900/hackerrank python integrations.py
+#
+# Usernames starting with "missing" get a 404, "slow" ones sleep --slow-delay.
+
+GITHUB_PAGE = """<html><body><div class="application-main"><main><div><div>
+<div class="Layout-main"><div><div><div class="Layout-sidebar"><div><div>
+<div class="js-profile-editable-replace"><div><div>
+<span>{followers}</span><span>{following}</span>
+</div></div></div></div></div></div></div></div>
+<span class="p-nickname vcard-username d-block">{user}</span>
+<span class="Counter">{repositories}</span><span class="Counter">3</span>
+<span class="Counter">0</span><span class="Counter">{stars}</span>
+</div></div></main></div></body></html>"""
+
+HACKERRANK_PAGE = """<html><body><div class="badges">{badges}</div></body></html>"""
+
+
+def github_page(user):
+    return GITHUB_PAGE.format(user=user, followers=len(user) * 7, following=len(user), repositories=len(user) * 3, stars=len(user) * 11)
+
+
+def leetcode_stats(user):
+    return {
+        "status": "success", "totalSolved": len(user) * 17, "totalQuestions": 3300,
+        "acceptanceRate": 61.5, "ranking": 100000 + len(user), "contributionPoints": len(user) * 5,
+    }
+
+
+def hackerrank_page(user):
+    return HACKERRANK_PAGE.format(badges='<div class="badge-card">*</div>' * (len(user) % 6))
+
+
+def make_handler(delay, slow_delay):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real upstreams
+
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if len(parts) != 2 or parts[0] not in ("github", "leetcode", "hackerrank"):
+                return self._send(404, "text/plain", b"not found")
+            platform, user = parts
+            time.sleep(slow_delay if user.startswith("slow") else delay)
+            if user.startswith("missing"):
+                return self._send(404, "text/plain", b"not found")
+            if platform == "github":
+                return self._send(200, "text/html", github_page(user).encode())
+            if platform == "leetcode":
+                return self._send(200, "application/json", json.dumps(leetcode_stats(user)).encode())
+            return self._send(200, "text/html", hackerrank_page(user).encode())
+
+        def _send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def serve(host="127.0.0.1", port=8900, delay=0.0, slow_delay=30.0):
+    server = ThreadingHTTPServer((host, port), make_handler(delay, slow_delay))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub GitHub/LeetCode/HackerRank server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before every response")
+    parser.add_argument("--slow-delay", type=float, default=30.0, help="Seconds to wait for users named slow*")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.delay, args.slow_delay)
+    base = f"http://{args.host}:{args.port}"
+    print(f"GITHUB_BASE_URL={base}/github LEETCODE_BASE_URL={base}/leetcode HACKERRANK_BASE_URL={base}/hackerrank")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
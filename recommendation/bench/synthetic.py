@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+
+RECOMMENDATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(RECOMMENDATION_DIR, "data.json")
+
+sys.path.insert(0, RECOMMENDATION_DIR)
+
+from vocab import domain_vocabulary, skill_vocabulary
+
+# Synthetic user pool following the data.json schema, for 10k to 10M users.
+#
+#   distribution="data" - skills and domains sampled with their data.json
+#                         frequencies (only the ~20 skills data.json uses)
+#   distribution="zipf" - the whole skills.json/domains.json vocabulary with
+#                         Zipf-distributed popularity: data.json's skills and
+#                         domains take the top ranks in their observed order,
+#                         the rest of the vocabulary follows in random order,
+#                         so a few skills are everywhere and most are rare
+#
+# Skills-per-user and projects-per-user counts follow data.json either way.
+# Users are generated in vectorized chunks; iter_users/write_users stream them
+# so pools that do not fit in memory as dicts can still be written out.
+
+CHUNK_SIZE = 50_000
+ZIPF_EXPONENT = 1.1
+
+
+def _frequencies(values):
+    counts = Counter(values)
+    keys = sorted(counts, key=lambda key: (-counts[key], str(key)))
+    weights = np.array([counts[key] for key in keys], dtype=np.float64)
+    return keys, weights / weights.sum()
+
+
+def _zipf(observed, vocabulary, rng, exponent):
+    # Observed names by frequency first, then the rest of the vocabulary shuffled
+    rest = [name for name in vocabulary if name not in set(observed)]
+    names = list(observed) + [rest[i] for i in rng.permutation(len(rest))]
+    weights = 1.0 / np.arange(1, len(names) + 1) ** exponent
+    return names, weights / weights.sum()
+
+
+class UserGenerator:
+    """
+    Vectorized generator of data.json-shaped users.
+
+    Parameters:
+        distribution (str): "data" or "zipf" (see above).
+        seed (int): Seed of the whole stream; chunk i is always the same users.
+        zipf_exponent (float): Skew of the "zipf" skill and domain popularity.
+    """
+
+    def __init__(self, distribution="data", seed=42, source_path=DATA_PATH, zipf_exponent=ZIPF_EXPONENT):
+        if distribution not in ("data", "zipf"):
+            raise ValueError(f"Unknown distribution {distribution!r}, expected 'data' or 'zipf'")
+        with open(source_path, "r") as file:
+            source = json.load(file)
+        self.seed = seed
+        self.skills, self.skill_p = _frequencies(s for user in source for s in user["skills"])
+        self.domains, self.domain_p = _frequencies(p["domain"] for user in source for p in user["completed_projects"])
+        if distribution == "zipf":
+            rng = np.random.default_rng(seed)
+            self.skills, self.skill_p = _zipf(self.skills, skill_vocabulary().names, rng, zipf_exponent)
+            self.domains, self.domain_p = _zipf(self.domains, domain_vocabulary().names, rng, zipf_exponent)
+        self.skill_counts, self.skill_count_p = _frequencies(len(user["skills"]) for user in source)
+        self.project_counts, self.project_count_p = _frequencies(len(user["completed_projects"]) for user in source)
+        self._log_skill_p = np.log(self.skill_p)
+
+    def _sample_skills(self, rng, n_skills):
+        # Weighted sampling without replacement for every user at once: the
+        # n largest of log(p) + Gumbel noise are a draw of n distinct skills
+        width = min(int(n_skills.max()), len(self.skills))
+        keys = self._log_skill_p + rng.gumbel(size=(len(n_skills), len(self.skills)))
+        top = np.argpartition(-keys, width - 1, axis=1)[:, :width]
+        order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+        return np.take_along_axis(top, order, axis=1)
+
+    def chunk(self, start, n_users):
+        # Users start + 1 .. start + n_users
+        rng = np.random.default_rng([self.seed, start])
+        n_skills = np.minimum(rng.choice(self.skill_counts, size=n_users, p=self.skill_count_p), len(self.skills))
+        n_projects = rng.choice(self.project_counts, size=n_users, p=self.project_count_p)
+        feedback = np.round(rng.uniform(3.5, 5.0, size=n_users), 1)
+        projects_completed = rng.integers(0, 31, size=n_users)
+        skills = self._sample_skills(rng, n_skills) if n_users else np.empty((0, 0), dtype=np.int64)
+        domains = rng.choice(len(self.domains), size=int(n_projects.sum()), p=self.domain_p)
+        project_ids = 100 + rng.integers(0, 100, size=len(domains))
+        project_starts = np.concatenate([[0], np.cumsum(n_projects)])
+
+        users = []
+        for i in range(n_users):
+            lo, hi = project_starts[i], project_starts[i + 1]
+            users.append({
+                "user_id": start + i + 1,
+                "name": f"User {start + i + 1}",
+                "skills": [self.skills[s] for s in skills[i, :n_skills[i]].tolist()],
+                "certifications": [],
+                "projects_completed": int(projects_completed[i]),
+                "feedback": float(feedback[i]),
+                "location": "Remote",
+                "availability": "Available",
+                "communication": 4.5,
+                "shift": "Day",
+                "compensation_type": "Price",
+                "completed_projects": [
+                    {"project_id": int(project_id), "domain": self.domains[d]}
+                    for project_id, d in zip(project_ids[lo:hi].tolist(), domains[lo:hi].tolist())
+                ],
+            })
+        return users
+
+    def iter_chunks(self, n_users, chunk_size=CHUNK_SIZE):
+        for start in range(0, n_users, chunk_size):
+            yield self.chunk(start, min(chunk_size, n_users - start))
+
+
+def generate_users(n_users, seed=42, source_path=DATA_PATH, distribution="data"):
+    generator = UserGenerator(distribution, seed, source_path)
+    return [user for chunk in generator.iter_chunks(n_users) for user in chunk]
+
+
+def write_users(path, n_users, seed=42, distribution="data"):
+    # Streams a JSON array of n_users users to `path` without holding them all
+    generator = UserGenerator(distribution, seed)
+    with open(path, "w") as file:
+        file.write("[")
+        for i, chunk in enumerate(generator.iter_chunks(n_users)):
+            body = json.dumps(chunk)[1:-1]
+            if body:
+                file.write((",\n" if i else "\n") + body)
+        file.write("\n]\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic users file in the data.json schema")
+    parser.add_argument("users", type=int, help="Number of users, e.g. 10000 to 10000000")
+    parser.add_argument("output", help="Path of the JSON file to write")
+    parser.add_argument("--distribution", choices=["data", "zipf"], default="zipf")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    write_users(args.output, args.users, args.seed, args.distribution)
+    print(f"Wrote {args.users} users to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
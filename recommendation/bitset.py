@@ -0,0 +1,70 @@
+import numpy as np
+
+# Packed skill bitsets: one row of uint64 words per user, bit i of the row set
+# when the user has skill ID i. With a few hundred skills a row is a handful of
+# words, so "has every required skill" and "how many preferred skills" become
+# word-wise AND / compare / popcount over the whole pool at once.
+
+WORD_BITS = 64
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def n_words(n_bits):
+    return max(1, -(-n_bits // WORD_BITS))
+
+
+def pack_csr(indptr, ids, n_rows, n_bits):
+    # uint64 bitset matrix from CSR-style rows of IDs
+    bits = np.zeros((n_rows, n_words(n_bits)), dtype=np.uint64)
+    ids = np.asarray(ids, dtype=np.int64)
+    rows = np.repeat(np.arange(n_rows), np.diff(np.asarray(indptr, dtype=np.int64)))
+    np.bitwise_or.at(bits, (rows, ids // WORD_BITS), np.left_shift(np.uint64(1), (ids % WORD_BITS).astype(np.uint64)))
+    return bits
+
+
+def pack_ids(ids, n_bits):
+    # Single bitset row for a set of IDs
+    row = np.zeros(n_words(n_bits), dtype=np.uint64)
+    for i in ids:
+        row[i // WORD_BITS] |= np.uint64(1) << np.uint64(i % WORD_BITS)
+    return row
+
+
+def popcount(bits):
+    # Set bits per row of a uint64 matrix
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+    # SWAR popcount, a handful of vector ops per word
+    bits = bits - ((bits >> np.uint64(1)) & _M1)
+    bits = (bits & _M2) + ((bits >> np.uint64(2)) & _M2)
+    bits = (bits + (bits >> np.uint64(4))) & _M4
+    return ((bits * _H01) >> np.uint64(56)).sum(axis=-1, dtype=np.int64)
+
+
+def _select(bits, rows, mask):
+    # The rows' words that `mask` has bits in, and those words of the mask.
+    # With a vocabulary of hundreds of skills a query touches only a few words.
+    words = np.flatnonzero(mask)
+    if len(words) == len(mask):
+        selected = bits if rows is None else bits[rows]
+    elif rows is None:
+        selected = bits[:, words]
+    else:
+        selected = bits[np.asarray(rows)[:, None], words]
+    return selected, mask[words]
+
+
+def has_all(bits, required, rows=None):
+    # (U & R) == R for every row of U (or of U[rows])
+    bits, required = _select(bits, rows, required)
+    return ((bits & required) == required).all(axis=-1)
+
+
+def overlap(bits, mask, rows=None):
+    # |U & M| for every row of U (or of U[rows])
+    bits, mask = _select(bits, rows, mask)
+    return popcount(bits & mask)
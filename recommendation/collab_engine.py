@@ -0,0 +1,129 @@
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+
+class PearsonEngine:
+    """
+    User-user Pearson similarity over the user x project interaction matrix,
+    computed once and kept in memory instead of calling pearsonr per pair.
+
+    For count vectors x, y over n project columns:
+        corr = (n*x.y - sum(x)*sum(y)) / sqrt((n*x.x - sum(x)^2) * (n*y.y - sum(y)^2))
+    so the sparse Gram matrix X X^T plus per-user sums are enough to rebuild any
+    entry. n depends on which users a request passes in (the old pivot table
+    only had the projects those users completed), so only n is resolved per
+    request; everything else is looked up for the relevant rows.
+
+    Parameters:
+    - users: List of user dictionaries containing user_id and completed projects.
+    - block_size: Number of user rows multiplied at a time when building X X^T.
+    """
+
+    def __init__(self, users, block_size=2048):
+        self.block_size = block_size
+        self.rows = {}           # user_id -> row
+        self.user_ids = []       # row -> user_id
+        self.projects = {}       # project_id -> column
+        self.domain_rows = {}    # domain -> set of rows with a completed project in it
+        entries = {}
+        for user in users:
+            row = self._row(user['user_id'])
+            for project in user.get('completed_projects', []):
+                col = self.projects.setdefault(project['project_id'], len(self.projects))
+                entries[row, col] = entries.get((row, col), 0) + 1  # pivot_table aggfunc='size'
+                self.domain_rows.setdefault(project.get('domain'), set()).add(row)
+
+        keys = list(entries)
+        self.interactions = csr_matrix(
+            ([entries[key] for key in keys], ([r for r, _ in keys], [c for _, c in keys])),
+            shape=(len(self.rows), len(self.projects)), dtype=np.float64,
+        )
+        self._build()
+
+    def _row(self, user_id):
+        if user_id not in self.rows:
+            self.rows[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+        return self.rows[user_id]
+
+    def _build(self):
+        x = self.interactions
+        blocks = [x[start:start + self.block_size] @ x.T for start in range(0, x.shape[0], self.block_size)]
+        self.gram = vstack(blocks, format='csr') if blocks else csr_matrix((0, 0))
+        self.sums = np.asarray(x.sum(axis=1)).ravel()
+        self.squares = self.gram.diagonal()
+        self._delta = csr_matrix(self.gram.shape)  # Pending Gram updates, folded in lazily
+
+    def _grow(self, n_rows, n_cols):
+        if n_rows > self.interactions.shape[0] or n_cols > self.interactions.shape[1]:
+            self.interactions.resize((max(n_rows, self.interactions.shape[0]), max(n_cols, self.interactions.shape[1])))
+        if n_rows > self.gram.shape[0]:
+            self.gram.resize((n_rows, n_rows))
+            self._delta.resize((n_rows, n_rows))
+            self.sums = np.append(self.sums, np.zeros(n_rows - len(self.sums)))
+            self.squares = np.append(self.squares, np.zeros(n_rows - len(self.squares)))
+
+    def record_completion(self, user_id, project):
+        # Incrementally add one completed project for a (possibly new) user
+        row = self._row(user_id)
+        col = self.projects.setdefault(project['project_id'], len(self.projects))
+        self._grow(len(self.rows), len(self.projects))
+        self.domain_rows.setdefault(project.get('domain'), set()).add(row)
+
+        # x_u += e_col  =>  G += e_u c^T + c e_u^T + e_u e_u^T, with c the old column
+        column = self.interactions[:, col].tocoo()
+        others = column.row
+        counts = column.data
+        n = self.gram.shape[0]
+        delta = csr_matrix(
+            (np.concatenate([counts, counts, [1.0]]),
+             (np.concatenate([np.full(len(others), row), others, [row]]),
+              np.concatenate([others, np.full(len(others), row), [row]]))),
+            shape=(n, n),
+        )
+        self._delta = self._delta + delta
+        self.interactions = self.interactions + csr_matrix(([1.0], ([row], [col])), shape=self.interactions.shape)
+        self.sums[row] += 1
+        self.squares[row] += delta[row, row]
+
+        if self._delta.nnz > max(1024, self.gram.nnz // 10):
+            self.gram = self.gram + self._delta
+            self._delta = csr_matrix(self.gram.shape)
+
+    def scores(self, user_ids, domain):
+        """
+        Average non-negative Pearson similarity of each user who worked in
+        `domain` to every other user in `user_ids`, rounded to 4 places.
+        Only users with completed projects take part, as in the pivot table.
+        """
+        active = np.array(sorted({self.rows[u] for u in user_ids if u in self.rows and self.sums[self.rows[u]] > 0}),
+                          dtype=np.int64)
+        if len(active) == 0:
+            return {}
+        relevant = np.array(sorted(self.domain_rows.get(domain, set()).intersection(active.tolist())), dtype=np.int64)
+        if len(relevant) == 0:
+            return {}
+
+        # Number of project columns the pivot table over `active` would have
+        n = len(np.unique(self.interactions[active].indices))
+        sums = self.sums
+        squares = self.squares
+        totals = np.zeros(len(relevant))
+        for start in range(0, len(relevant), self.block_size):
+            block = relevant[start:start + self.block_size]
+            gram = (self.gram[block] + self._delta[block])[:, active].tocoo()
+            r = block[gram.row]
+            s = active[gram.col]
+            numerator = n * gram.data - sums[r] * sums[s]
+            denominator = np.sqrt((n * squares[r] - sums[r] ** 2) * (n * squares[s] - sums[s] ** 2))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = np.where(denominator > 0, numerator / denominator, 0.0)
+            corr = np.clip(corr, 0, 1)  # Ensure non-negative values
+            corr[r == s] = 0  # Exclude self-similarity
+            totals[start:start + len(block)] = np.bincount(gram.row, weights=corr, minlength=len(block))
+
+        others = len(active) - 1
+        return {
+            self.user_ids[row]: round(total / others, 4) if others else 0
+            for row, total in zip(relevant.tolist(), totals)
+        }
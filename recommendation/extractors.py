@@ -0,0 +1,225 @@
+import os
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml is optional; the "lxml" backend is unavailable without it
+    etree = lxml_html = None
+
+# What a backend may raise on a body it cannot make sense of; fetchers.py turns
+# these into the platform's error result
+EXTRACT_ERRORS = (ValueError,) if etree is None else (ValueError, etree.Error)
+
+# Pluggable HTML extraction for the scraped profile pages. Every backend exposes
+#   github(html, user_name) -> {"username", "repositories", "stars", "followers", "following"}
+#   hackerrank(html)        -> {"badges"}
+# and returns exactly what the original BeautifulSoup code did:
+#   "bs4"    - BeautifulSoup + CSS selector (the original code)
+#   "lxml"   - lxml tree + precompiled XPath
+#   "stream" - stdlib HTMLParser tokenizer, no tree, stops once it has what it needs
+#
+# HTML_EXTRACTOR picks the default; without it lxml is used when installed.
+
+# CSS path of the block whose first two <span>s are followers / following
+SIDEBAR_PATH = [
+    ("body", None), ("div", "application-main"), ("main", None), ("div", None), ("div", None),
+    ("div", "Layout-main"), ("div", None), ("div", None), ("div", "Layout-sidebar"), ("div", None),
+    ("div", None), ("div", "js-profile-editable-replace"), ("div", None), ("div", None),
+]
+SIDEBAR_SELECTOR = " > ".join(tag + (f".{cls}" if cls else "") for tag, cls in SIDEBAR_PATH)
+
+
+def github_result(user_name, counters, spans):
+    return {
+        "username": user_name,
+        "repositories": counters[0] if counters else "0",
+        "stars": counters[3] if len(counters) > 3 else "0",
+        "followers": spans[0] if len(spans) >= 2 else "0",
+        "following": spans[1] if len(spans) >= 2 else "0",
+    }
+
+
+def hackerrank_result(badges):
+    return {"badges": badges if badges else "0"}
+
+
+class Bs4Extractor:
+    name = "bs4"
+
+    def github(self, html, user_name):
+        soup = BeautifulSoup(html, "html.parser")
+        counters = [span.text.strip() for span in soup.find_all("span", class_="Counter")]
+        section = soup.select(SIDEBAR_SELECTOR)
+        spans = [span.text.strip() for span in section[0].find_all("span")[:2]] if section else []
+        return github_result(user_name, counters, spans)
+
+    def hackerrank(self, html):
+        soup = BeautifulSoup(html, "html.parser")
+        return hackerrank_result(len(soup.find_all("div", class_="badge-card")))
+
+
+def _has_class(cls):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+
+class LxmlExtractor:
+    name = "lxml"
+
+    def __init__(self):
+        if lxml_html is None:
+            raise ImportError("The lxml extractor needs the lxml package")
+        steps = "/".join(tag + (f"[{_has_class(cls)}]" if cls else "") for tag, cls in SIDEBAR_PATH)
+        self.counters = etree.XPath(f"//span[{_has_class('Counter')}]")
+        self.sidebar_spans = etree.XPath(f"(//{steps})[1]//span")
+        self.badges = etree.XPath(f"count(//div[{_has_class('badge-card')}])")
+
+    def _parse(self, html):
+        # None for a page without elements (empty, only comments or an XML
+        # declaration); BeautifulSoup finds nothing in those either
+        if not html.strip():
+            return None
+        try:
+            return lxml_html.fromstring(html)
+        except etree.ParserError:
+            return None
+
+    def github(self, html, user_name):
+        root = self._parse(html)
+        if root is None:
+            return github_result(user_name, [], [])
+        tree = root.getroottree()
+        counters = [span.text_content().strip() for span in self.counters(tree)]
+        spans = [span.text_content().strip() for span in self.sidebar_spans(tree)[:2]]
+        return github_result(user_name, counters, spans)
+
+    def hackerrank(self, html):
+        root = self._parse(html)
+        return hackerrank_result(int(self.badges(root.getroottree())) if root is not None else 0)
+
+
+class _StopParsing(Exception):
+    pass
+
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+
+class _GithubTokenizer(HTMLParser):
+    # Tracks just enough of the open-element stack to recognise SIDEBAR_PATH,
+    # collects text of Counter spans and of the first two sidebar spans, and
+    # stops as soon as it has four counters and both sidebar values
+    def __init__(self):
+        super().__init__()
+        self.stack = []            # (tag, classes) of open elements
+        self.section_depth = None  # stack depth of the sidebar block while inside it
+        self.section_seen = False
+        self.counters = []
+        self.spans = []
+        self.open = []             # [stack depth, text parts, target list, index] being captured
+
+    def _matches_path(self):
+        if len(self.stack) < len(SIDEBAR_PATH):
+            return False
+        for (tag, classes), (want_tag, want_class) in zip(self.stack[-len(SIDEBAR_PATH):], SIDEBAR_PATH):
+            if tag != want_tag or (want_class and want_class not in classes):
+                return False
+        return True
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        classes = ()
+        for key, value in attrs:
+            if key == "class" and value:
+                classes = value.split()
+        self.stack.append((tag, classes))
+        if tag == "span":
+            if "Counter" in classes:
+                self.counters.append(None)
+                self.open.append([len(self.stack), [], self.counters, len(self.counters) - 1])
+            if self.section_depth is not None and len(self.spans) < 2:
+                self.spans.append(None)
+                self.open.append([len(self.stack), [], self.spans, len(self.spans) - 1])
+        elif not self.section_seen and tag == "div" and self._matches_path():
+            self.section_seen = True
+            self.section_depth = len(self.stack)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Close up to the nearest matching open element (tolerates unclosed tags)
+        for depth in range(len(self.stack), 0, -1):
+            if self.stack[depth - 1][0] == tag:
+                break
+        else:
+            return
+        del self.stack[depth - 1:]
+        still_open = []
+        for capture in self.open:
+            if capture[0] >= depth:
+                capture[2][capture[3]] = "".join(capture[1]).strip()
+            else:
+                still_open.append(capture)
+        self.open = still_open
+        if self.section_depth is not None and self.section_depth >= depth:
+            self.section_depth = None
+        if self._done():
+            raise _StopParsing()
+
+    def handle_data(self, data):
+        for capture in self.open:
+            capture[1].append(data)
+
+    def _done(self):
+        return (
+            len(self.counters) >= 4 and None not in self.counters[:4]
+            and len(self.spans) >= 2 and None not in self.spans
+        )
+
+
+class _BadgeTokenizer(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.badges = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "div":
+            for key, value in attrs:
+                if key == "class" and value and "badge-card" in value.split():
+                    self.badges += 1
+
+
+class StreamExtractor:
+    name = "stream"
+
+    def github(self, html, user_name):
+        parser = _GithubTokenizer()
+        try:
+            parser.feed(html)
+            parser.close()
+        except _StopParsing:
+            pass
+        counters = [text for text in parser.counters if text is not None]
+        spans = [text for text in parser.spans if text is not None]
+        return github_result(user_name, counters, spans)
+
+    def hackerrank(self, html):
+        parser = _BadgeTokenizer()
+        parser.feed(html)
+        parser.close()
+        return hackerrank_result(parser.badges)
+
+
+EXTRACTORS = {"bs4": Bs4Extractor, "lxml": LxmlExtractor, "stream": StreamExtractor}
+
+
+def get_extractor(name=None):
+    name = name or os.environ.get("HTML_EXTRACTOR") or ("lxml" if lxml_html is not None else "bs4")
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown HTML extractor {name!r}, expected one of {', '.join(EXTRACTORS)}")
+    return EXTRACTORS[name]()
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+from extractors import EXTRACT_ERRORS, get_extractor
+
+# Async fetch layer for integrations.py. One httpx.AsyncClient lives on a
+# background event loop for the whole process, so every Flask request reuses the
+# same pool of keep-alive connections; each upstream host additionally gets its
+# own concurrency limit so one slow site cannot take every connection.
+#
+# Base URLs come from the environment so the service can be pointed at a local
+# stub server (see bench/stub_upstreams.py) instead of the real sites.
+
+BASE_URLS = {
+    "github": os.environ.get("GITHUB_BASE_URL", "https://github.com"),
+    "leetcode": os.environ.get("LEETCODE_BASE_URL", "https://leetcode-stats-api.herokuapp.com"),
+    "hackerrank": os.environ.get("HACKERRANK_BASE_URL", "https://www.hackerrank.com"),
+}
+CONNECT_TIMEOUT = float(os.environ.get("INTEGRATIONS_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.environ.get("INTEGRATIONS_READ_TIMEOUT", "10"))
+MAX_CONNECTIONS = int(os.environ.get("INTEGRATIONS_MAX_CONNECTIONS", "100"))
+MAX_PER_HOST = int(os.environ.get("INTEGRATIONS_MAX_PER_HOST", "8"))
+
+PLATFORMS = ("github", "leetcode", "hackerrank", "linkedin")
+
+GITHUB_ERROR = {
+    "username": "Error",
+    "repositories": "0",
+    "stars": "0",
+    "followers": "0",
+    "following": "0"
+}
+
+
+# LeetCode answers with JSON; GitHub and HackerRank pages are parsed by a
+# pluggable extractor backend (extractors.py)
+
+def parse_leetcode(data, user_name):
+    return {
+        "username": user_name,
+        "total_solved": str(data.get("totalSolved", "0")) + "/" + str(data.get("totalQuestions", "0")),
+        "acceptance_rate": str(data.get("acceptanceRate", "0")),
+        "ranking": str(data.get("ranking", "0")),
+        "contribution_points": str(data.get("contributionPoints", "0")),
+    }
+
+
+class Fetcher:
+    """
+    Owns the event loop thread and the shared AsyncClient. fetch/fetch_all are
+    safe to call from any (synchronous) Flask worker thread.
+    """
+
+    def __init__(self, base_urls=None, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_connections=MAX_CONNECTIONS, max_per_host=MAX_PER_HOST, extractor=None):
+        self.base_urls = dict(BASE_URLS, **(base_urls or {}))
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_per_host = max_per_host
+        self.extractor = extractor if extractor is not None else get_extractor()
+        self._host_limits = {}
+        self._client = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="integrations-fetcher", daemon=True)
+        self._thread.start()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        if self._client is not None:
+            self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _get(self, url):
+        # Only ever touched on the loop thread, so no locking is needed
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, follow_redirects=True,
+                headers={"User-Agent": "prohunt-integrations"},
+            )
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        async with self._host_limits[host]:
+            return await self._client.get(url)
+
+    async def fetch_github(self, user_name):
+        try:
+            response = await self._get(f"{self.base_urls['github']}/{user_name}")
+            response.raise_for_status()
+            return self.extractor.github(response.text, user_name)
+        except (httpx.HTTPError, *EXTRACT_ERRORS) as e:
+            print(f"Error fetching GitHub data for {user_name}: {str(e) or type(e).__name__}")
+            return dict(GITHUB_ERROR)
+
+    async def fetch_leetcode(self, user_name):
+        try:
+            response = await self._get(f"{self.base_urls['leetcode']}/{user_name}")
+            if response.status_code == 200:
+                return parse_leetcode(response.json(), user_name)
+            print(f"Failed to fetch LeetCode data for {user_name}: {response.status_code}")
+            return {"error": "Failed to fetch LeetCode data"}
+        except Exception as e:
+            print(f"Error fetching LeetCode data for {user_name}: {str(e) or type(e).__name__}")
+            return {"error": str(e) or type(e).__name__}
+
+    async def fetch_hackerrank(self, user_name):
+        try:
+            response = await self._get(f"{self.base_urls['hackerrank']}/{user_name}")
+            return self.extractor.hackerrank(response.text)
+        except (httpx.HTTPError, *EXTRACT_ERRORS) as e:
+            print(f"Error fetching HackerRank data for {user_name}: {str(e) or type(e).__name__}")
+            return {"error": str(e) or type(e).__name__}
+
+    async def fetch_linkedin(self, user_name):
+        return {"status": "LinkedIn scraping requires authentication"}
+
+    async def _fetch_all(self, usernames):
+        platforms = list(usernames)
+        results = await asyncio.gather(*(
+            getattr(self, f"fetch_{platform}")(usernames[platform]) for platform in platforms
+        ))
+        return dict(zip(platforms, results))
+
+    def fetch(self, platform, user_name):
+        return self._run(getattr(self, f"fetch_{platform}")(user_name))
+
+    def fetch_all(self, usernames):
+        # usernames: platform -> username; all platforms are fetched concurrently
+        return self._run(self._fetch_all(usernames))
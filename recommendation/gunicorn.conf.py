@@ -0,0 +1,44 @@
+import gc
+import multiprocessing
+import os
+
+# Production serving for both Flask apps (run from recommendation/):
+#
+#   gunicorn -c gunicorn.conf.py app:app                                          # recommender, :5000
+#   GUNICORN_PORT=5001 GUNICORN_PRELOAD=0 gunicorn -c gunicorn.conf.py integrations:app  # integrations, :5001
+#
+# With preload_app the recommender's user pool, bitsets and ANN index are built
+# once in the master and shared copy-on-write by the forked workers, instead of
+# every worker parsing data.json. The integrations service has nothing worth
+# sharing and owns an event-loop thread (fetchers.Fetcher) that must be started
+# in the worker itself, so it runs without preloading.
+
+bind = f"{os.environ.get('GUNICORN_HOST', '0.0.0.0')}:{os.environ.get('GUNICORN_PORT', '5000')}"
+workers = int(os.environ.get("GUNICORN_WORKERS", str(multiprocessing.cpu_count())))
+# Each worker serves GUNICORN_THREADS requests at once (gthread); NumPy scoring
+# releases the GIL for most of a request
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+if preload_app:
+    # Keep the collector from touching the preloaded objects before the fork;
+    # a collection writes to every object's GC header and un-shares its page
+    gc.disable()
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before workers are forked:
+    # move everything allocated so far into the permanent generation so the
+    # workers' collections never scan (and copy) it
+    if preload_app:
+        gc.freeze()
+        server.log.info("Froze %d preloaded objects", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    gc.enable()
@@ -0,0 +1,155 @@
+import os
+import threading
+
+# Supabase writes for integrations, one round trip each, via the JSONB merge
+# functions in sql/merge_integrations.sql. `client` is anything with the
+# supabase-py `rpc(name, params).execute()` interface, so a fake client can
+# stand in for Supabase (see bench/fake_supabase.py).
+
+BUFFER_MAX_USERS = int(os.environ.get("INTEGRATIONS_BUFFER_MAX_USERS", "500"))
+BUFFER_FLUSH_INTERVAL = float(os.environ.get("INTEGRATIONS_BUFFER_FLUSH_INTERVAL", "2"))
+
+
+def merge_integrations(client, user_id, patch, handles=None):
+    # Patch only the given platform keys; response.data is the merged object,
+    # or None when the user does not exist. `handles` ({platform: username})
+    # go to integration_handles, the accounts the refresh worker fetches again.
+    params = {"p_user_id": user_id, "p_patch": patch, "p_handles": handles or {}}
+    return client.rpc("merge_integrations", params).execute()
+
+
+def merge_integrations_bulk(client, patches, handles=None):
+    # patches: user_id -> {platform: data}, handles: user_id -> {platform: username};
+    # response.data is the list of the user ids that were updated
+    handles = handles or {}
+    updates = [{"id": user_id, "patch": patch, "handles": handles.get(user_id, {})} for user_id, patch in patches.items()]
+    return client.rpc("merge_integrations_bulk", {"p_updates": updates}).execute()
+
+
+class _PendingWrite:
+    # One buffered platform write: the data, the account it was fetched for,
+    # the flushes it has failed and the done callbacks waiting on it
+    __slots__ = ("data", "handle", "attempts", "callbacks")
+
+    def __init__(self, data, handle, callbacks):
+        self.data = data
+        self.handle = handle
+        self.attempts = 0
+        self.callbacks = callbacks
+
+
+class IntegrationWriteBuffer:
+    """
+    Coalesces integration writes from many workers into bulk merges. Writes for
+    the same user are folded into one patch (a later write for the same
+    platform replaces the earlier one), and the buffer is flushed when it holds
+    `max_users` users or every `flush_interval` seconds.
+
+    A failed flush puts its writes back (under any newer writes for the same
+    platform) to be retried on the next flush; a write is dropped once it has
+    failed `max_retries` + 1 flushes.
+
+    add() takes the account the data was fetched for (stored in
+    integration_handles) and an optional `done(error)` callback, called once
+    the write is in Supabase (error None), or with an error when it was
+    dropped or its user does not exist, so callers can acknowledge work only
+    when it is stored.
+    """
+
+    def __init__(self, client, max_users=BUFFER_MAX_USERS, flush_interval=BUFFER_FLUSH_INTERVAL, max_retries=3):
+        self.client = client
+        self.max_users = max_users
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.counters = {
+            "writes": 0, "flushes": 0, "users_written": 0, "users_missing": 0, "flush_errors": 0, "dropped": 0,
+        }
+        self._pending = {}  # user_id -> {platform: _PendingWrite}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        if flush_interval:
+            self._thread = threading.Thread(target=self._flush_periodically, name="integrations-buffer", daemon=True)
+            self._thread.start()
+
+    def add(self, user_id, platform, data, handle=None, done=None):
+        with self._lock:
+            writes = self._pending.setdefault(user_id, {})
+            # A replaced write is acknowledged together with the one replacing it
+            replaced = writes.get(platform)
+            callbacks = replaced.callbacks if replaced is not None else []
+            writes[platform] = _PendingWrite(data, handle, callbacks + ([done] if done is not None else []))
+            self.counters["writes"] += 1
+            full = len(self._pending) >= self.max_users
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            patches = {user_id: {platform: write.data for platform, write in writes.items()}
+                       for user_id, writes in pending.items()}
+            handles = {user_id: {platform: write.handle for platform, write in writes.items() if write.handle}
+                       for user_id, writes in pending.items()}
+            try:
+                response = merge_integrations_bulk(self.client, patches, handles)
+            except Exception as e:
+                print(f"Error flushing {len(pending)} integration updates: {str(e)}")
+                _notify(self._requeue(pending), e)
+                return 0
+            updated = {str(user_id) for user_id in response.data or []}
+            missing = {user_id: writes for user_id, writes in pending.items() if str(user_id) not in updated}
+            with self._lock:
+                self.counters["flushes"] += 1
+                self.counters["users_written"] += len(pending) - len(missing)
+                self.counters["users_missing"] += len(missing)
+            if missing:
+                print(f"Integration updates for {len(missing)} unknown users were not stored")
+            for user_id, writes in pending.items():
+                error = LookupError(f"No user {user_id}") if user_id in missing else None
+                _notify(writes.values(), error)
+            return len(pending) - len(missing)
+
+    def _requeue(self, pending):
+        # Put the failed writes back unless a newer one replaced them or they
+        # have used up their retries; returns the dropped ones
+        dropped = []
+        with self._lock:
+            self.counters["flush_errors"] += 1
+            for user_id, writes in pending.items():
+                for platform, write in writes.items():
+                    write.attempts += 1
+                    newer = self._pending.get(user_id, {}).get(platform)
+                    if newer is not None:
+                        newer.callbacks = write.callbacks + newer.callbacks
+                    elif write.attempts > self.max_retries:
+                        dropped.append(write)
+                        self.counters["dropped"] += 1
+                    else:
+                        self._pending.setdefault(user_id, {})[platform] = write
+        return dropped
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def __len__(self):
+        return len(self._pending)
+
+
+def _notify(writes, error):
+    for done in (done for write in writes for done in write.callbacks):
+        try:
+            done(error)
+        except Exception as e:
+            print(f"Error in integration write callback: {str(e)}")
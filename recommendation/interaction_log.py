@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+import time
+
+from result_cache import project_key
+
+INTERACTIONS_DIR = os.environ.get(
+    "INTERACTIONS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "interactions")
+)
+
+# What happened to a recommended user, as a relevance grade: a user's label
+# for a project is the highest grade logged for them. "shown" users that were
+# never acted on are the negatives train_weights.py learns from.
+EVENT_GRADES = {"shown": 0, "viewed": 1, "invited": 2, "accepted": 3}
+# The project fields scoring reads; enough to recompute the features offline
+PROJECT_FIELDS = ("required_skills", "preferred_skills", "domain")
+
+
+class InteractionLog:
+    """
+    Append-only JSON-lines log of interactions with recommendations, one file
+    per UTC day ("interactions-YYYYMMDD.jsonl"). Every record is written with a
+    single O_APPEND write, so gunicorn workers can share the directory.
+    """
+
+    def __init__(self, directory=INTERACTIONS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def append(self, project, event, user_ids):
+        if event not in EVENT_GRADES:
+            raise ValueError(f"Unknown event {event!r}, expected one of {', '.join(EVENT_GRADES)}")
+        record = {
+            "time": time.time(),
+            "event": event,
+            "project_id": project.get("project_id"),
+            "project": {field: project.get(field) for field in PROJECT_FIELDS},
+            "user_ids": list(user_ids),
+        }
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        path = os.path.join(self.directory, f"interactions-{time.strftime('%Y%m%d', time.gmtime())}.jsonl")
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        return len(record["user_ids"])
+
+
+def read_interactions(directory=INTERACTIONS_DIR):
+    # Every logged record, oldest file first; unreadable lines are skipped
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.startswith("interactions-") and name.endswith(".jsonl"))
+    except FileNotFoundError:
+        return
+    for name in names:
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as file:
+            for number, line in enumerate(file, 1):
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    print(f"Error reading {name} line {number}: {str(e)}")
+
+
+def interaction_labels(records):
+    # Group records by project (the canonical project_key, since project_id is
+    # not reliably unique) into {key: {"project": ..., "labels": {user_id: grade}}}
+    projects = {}
+    for record in records:
+        project = record["project"]
+        entry = projects.setdefault(project_key(project), {"project": project, "labels": {}})
+        grade = EVENT_GRADES.get(record["event"])
+        if grade is None:
+            continue
+        labels = entry["labels"]
+        for user_id in record["user_ids"]:
+            labels[user_id] = max(grade, labels.get(user_id, grade))
+    return projects
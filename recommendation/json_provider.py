@@ -0,0 +1,98 @@
+import dataclasses
+import os
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the "orjson" provider is unavailable without it
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; the "msgspec" provider is unavailable without it
+    msgspec = None
+
+# Pluggable JSON for the Flask apps: jsonify, request.get_json() and the
+# recommendation payloads (responses.py) all go through app.json.
+#   "orjson"  - orjson, serializes dataclasses and NumPy arrays natively
+#   "msgspec" - msgspec.json
+#   "stdlib"  - Flask's json-module provider, taught NumPy values
+# JSON_PROVIDER picks one; without it the first installed of orjson, msgspec,
+# stdlib is used. Like Flask's default, keys are sorted unless sort_keys=False
+# is passed to dumps.
+
+
+def _default(obj):
+    # Values the encoders do not handle themselves
+    if hasattr(obj, "tolist"):  # NumPy arrays and scalars
+        return obj.tolist()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        # Shallow: nested values come back through here if they need it
+        return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+    return DefaultJSONProvider.default(obj)
+
+
+class StdlibProvider(DefaultJSONProvider):
+    name = "stdlib"
+    fast_structs = False  # Dataclasses go through _default one by one
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(JSONProvider):
+    name = "orjson"
+    fast_structs = True
+    sort_keys = True
+
+    def __init__(self, app):
+        if orjson is None:
+            raise ImportError("The orjson JSON provider needs the orjson package")
+        super().__init__(app)
+        self.option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        option = self.option | (orjson.OPT_SORT_KEYS if kwargs.get("sort_keys", self.sort_keys) else 0)
+        return orjson.dumps(obj, default=_default, option=option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+class MsgspecProvider(JSONProvider):
+    name = "msgspec"
+    fast_structs = True
+    sort_keys = True
+
+    def __init__(self, app):
+        if msgspec is None:
+            raise ImportError("The msgspec JSON provider needs the msgspec package")
+        super().__init__(app)
+        self.encoders = {
+            True: msgspec.json.Encoder(enc_hook=_default, order="sorted"),
+            False: msgspec.json.Encoder(enc_hook=_default),
+        }
+        self.decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj, **kwargs):
+        return self.encoders[bool(kwargs.get("sort_keys", self.sort_keys))].encode(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return self.decoder.decode(s)
+
+
+PROVIDERS = {"orjson": OrjsonProvider, "msgspec": MsgspecProvider, "stdlib": StdlibProvider}
+
+
+def get_provider_class(name=None):
+    if name is None:
+        name = os.environ.get("JSON_PROVIDER")
+    if name is None:
+        name = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "stdlib"
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown JSON provider {name!r}, expected one of {', '.join(PROVIDERS)}")
+    return PROVIDERS[name]
+
+
+def install(app, name=None):
+    app.json = get_provider_class(name)(app)
+    return app.json
@@ -0,0 +1,224 @@
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Minimal Prometheus-style metrics for the Flask apps: counters, histograms and
+# callback gauges in a registry rendered in the text exposition format at
+# /metrics. Under gunicorn every worker keeps its own registry; the
+# process_worker_info sample tells the scraped processes apart.
+#
+# PROFILE_SAMPLE_RATE (0..1) additionally runs that fraction of profiled()
+# blocks under cProfile and dumps the stats to PROFILE_DIR (view them with
+# `python -m pstats` or snakeviz).
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; from cache hits (well under a millisecond) to slow scrapes
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 10, 100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in self.values.items()]
+
+
+class Histogram(Metric):
+    """
+    Cumulative-bucket histogram, one set of buckets per label combination.
+
+    Parameters:
+        buckets (tuple): Upper bounds, ascending; +Inf is added implicitly.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., count, sum]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            series = {key: list(values) for key, values in self.series.items()}
+        for key, values in series.items():
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-2] + [values[-2]]):
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [le])} {count}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {values[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(values[-1])}")
+        return lines
+
+
+class Gauge(Metric):
+    """
+    Gauge read from a callback at scrape time, for values something else
+    already tracks (cache statistics, pool sizes). `fn` returns a number, or a
+    dict of label-value tuples -> number.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help, fn, labels=()):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def samples(self):
+        values = self.fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in values.items()]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, fn, labels=()):
+        return self.register(Gauge(name, help, fn, labels))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"Error collecting metric {metric.name}: {str(e)}")
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        lines.append("# HELP process_worker_info Process serving this scrape")
+        lines.append("# TYPE process_worker_info gauge")
+        lines.append(f'process_worker_info{{worker="{os.getpid()}"}} 1')
+        return "\n".join(lines) + "\n"
+
+
+def instrument(app, registry, prefix):
+    # Per-endpoint request latency and status counts for every route of `app`
+    latency = registry.histogram(f"{prefix}_request_seconds", "Request latency by endpoint", ["endpoint"])
+    responses = registry.counter(f"{prefix}_responses_total", "Responses by endpoint and status", ["endpoint", "status"])
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop("request_start", None)
+        endpoint = request.endpoint or "unknown"
+        if start is not None:
+            latency.observe(time.perf_counter() - start, endpoint=endpoint)
+        responses.inc(endpoint=endpoint, status=response.status_code)
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return registry.render(), 200, {"Content-Type": CONTENT_TYPE}
+
+
+@contextmanager
+def profiled(name, rate=None):
+    # Runs the block under cProfile for a `rate` fraction of calls and writes
+    # PROFILE_DIR/<name>-<time>-<pid>-<thread>.prof
+    rate = PROFILE_SAMPLE_RATE if rate is None else rate
+    if rate <= 0 or random.random() >= rate:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # Another profiler is already running in this thread
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}.prof")
+            profiler.dump_stats(path)
+        except Exception as e:
+            print(f"Error writing profile for {name}: {str(e)}")
@@ -12,9 +12,13 @@ from flask_cors import CORS, cross_origin
 
 
 import json
+from collab_engine import PearsonEngine
+from ranker import Ranker
 
 with open("data.json", "r") as file:
     users = json.load(file) 
+collab_engine = PearsonEngine(users)
+ranker = Ranker("ranker-oldapp")
 app = Flask(__name__)
 cors = CORS(app) # allow CORS for all domains on all routes.
 app.config['CORS_HEADERS'] = 'Content-Type'
@@ -60,39 +64,9 @@ def collaborative_based(users, project):
     project_id = project["project_id"]
     domain = project["domain"]
     print("pr_id",project_id,domain)
-    # Flatten the data to have user_id, project_id, and domain for each completed project
-    data = []
-    for user in users:
-        for project in user['completed_projects']:
-            data.append({
-                'user_id': user['user_id'],
-                'project_id': project['project_id'],
-                'domain': project['domain']
-            })
-
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
-
-    # Create User-Project Interaction Matrix (Binary)
-    user_project_matrix = df.pivot_table(index='user_id', columns='project_id', aggfunc='size', fill_value=0)
-
-    # Compute Pearson Similarity Matrix
-    user_ids = user_project_matrix.index
-    similarity_matrix = pd.DataFrame(index=user_ids, columns=user_ids)
-
-    for u1 in user_ids:
-        for u2 in user_ids:
-            if u1 == u2:
-                similarity_matrix.loc[u1, u2] = 1  # Self similarity = 1
-            else:
-                corr, _ = pearsonr(user_project_matrix.loc[u1], user_project_matrix.loc[u2])
-                similarity_matrix.loc[u1, u2] = max(0, corr) if not pd.isna(corr) else 0  # Ensure non-negative values
-    relevant_users = df[df['domain'] == domain]['user_id'].unique()
-    user_scores = {}
-    for user in relevant_users:
-        similar_users = similarity_matrix[user].drop(user)  # Exclude self-similarity
-        avg_similarity = similar_users.mean()  # Compute the average similarity score
-        user_scores[user] = round(avg_similarity, 4)
+    # Pearson similarities come from the precomputed engine; only the rows of
+    # the users passed in are looked up
+    user_scores = collab_engine.scores([user['user_id'] for user in users], domain)
     for user in users:
         user['collaborative_score'] = user_scores.get(user['user_id'], 0)  # Default to 0 if not found
     return users
@@ -143,21 +117,16 @@ def ensemble_scoring(users, project):
 
     return data.sort_values(by="ensemble_score", ascending=False)
 
-# Train XGBoost Model
-def train_xgboost(data):
-    X = data[["content_based", "popularity_score", "collaborative_score","pre_requisite_score"]]
-    y = data["ensemble_score"]
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    model = XGBRegressor(objective="reg:squarederror", n_estimators=50, learning_rate=0.1, max_depth=4)
-    model.fit(X_train, y_train)
-    data["predicted_score"] = model.predict(X)
+# Rank with the pre-trained XGBoost model (see train_ranker.py)
+def rank_recommendations(data):
+    data["predicted_score"] = ranker.predict(data)
     return data.sort_values(by="predicted_score", ascending=False)
 
 
 
 def get_recommendations(project):
     filtered_users = ensemble_scoring(users, project)
-    final_recommendations = train_xgboost(filtered_users)
+    final_recommendations = rank_recommendations(filtered_users)
     return final_recommendations
     
 
@@ -172,5 +141,21 @@ def recommend():
     json_str = recommendations.to_json(orient='records', indent=4)
     return json_str
 
+@app.route('/projects/complete', methods=['POST'])
+@cross_origin()
+def complete_project():
+    data = request.get_json()
+    if not data or "user_id" not in data or "project_id" not in data:
+        return jsonify({"error": "Missing user_id or project_id"}), 400
+    completed = {"project_id": data["project_id"], "domain": data.get("domain")}
+    for user in users:
+        if user["user_id"] == data["user_id"]:
+            user["completed_projects"].append(completed)
+            break
+    else:
+        return jsonify({"error": "Unknown user_id"}), 404
+    collab_engine.record_completion(data["user_id"], completed)
+    return jsonify({"success": True})
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,113 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ttl_cache import TTLCache
+
+PROFILE_CACHE_TTL = float(os.environ.get("PROFILE_CACHE_TTL", "300"))
+PROFILE_CACHE_STALE_TTL = float(os.environ.get("PROFILE_CACHE_STALE_TTL", "3600"))
+PROFILE_CACHE_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", "10000"))
+
+
+def is_error(result):
+    # Failed fetches are returned as data by fetchers.py; never cache them
+    return "error" in result or result.get("username") == "Error"
+
+
+class ProfileCache:
+    """
+    Stale-while-revalidate cache of scraped profiles keyed on (platform, username),
+    in front of a fetchers.Fetcher.
+
+    - younger than `ttl`: returned as is (hit)
+    - younger than `ttl + stale_ttl`: returned as is, and one background refresh
+      is started for the key (stale hit)
+    - otherwise: fetched from upstream before returning (miss)
+    """
+
+    def __init__(self, fetcher, ttl=PROFILE_CACHE_TTL, stale_ttl=PROFILE_CACHE_STALE_TTL,
+                 max_size=PROFILE_CACHE_SIZE, refresh_workers=4):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.entries = TTLCache(max_size=max_size, max_age=ttl + stale_ttl)
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="profile-refresh")
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _store(self, key, result):
+        if not is_error(result):
+            self.entries.set(key, result)
+        return result
+
+    def _lookup(self, key):
+        # Cached value or None; schedules a refresh for stale entries
+        value, age = self.entries.get(key)
+        if value is None:
+            self._count("misses")
+            return None
+        if age < self.ttl:
+            self._count("hits")
+            return value
+        self._count("stale_hits")
+        with self._lock:
+            if key in self._refreshing:
+                return value
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, key)
+        return value
+
+    def _refresh(self, key):
+        try:
+            result = self.fetcher.fetch(*key)
+            self._count("refresh_errors" if is_error(result) else "refreshes")
+            self._store(key, result)
+        except Exception as e:
+            self._count("refresh_errors")
+            print(f"Error refreshing {key[0]} profile for {key[1]}: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def fetch(self, platform, user_name, refresh=False):
+        key = (platform, user_name)
+        if not refresh:
+            value = self._lookup(key)
+            if value is not None:
+                return value
+        return self._store(key, self.fetcher.fetch(platform, user_name))
+
+    def fetch_all(self, usernames, refresh=False):
+        # Cached platforms are served from the cache; the rest go upstream in one
+        # concurrent fetch_all
+        results = {}
+        missing = {}
+        for platform, user_name in usernames.items():
+            value = None if refresh else self._lookup((platform, user_name))
+            if value is None:
+                missing[platform] = user_name
+            else:
+                results[platform] = value
+        if missing:
+            for platform, result in self.fetcher.fetch_all(missing).items():
+                results[platform] = self._store((platform, missing[platform]), result)
+        return {platform: results[platform] for platform in usernames}
+
+    def invalidate(self, platform, user_name):
+        self.entries.pop((platform, user_name))
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+        counters.update({
+            "size": len(self.entries),
+            "evictions": self.entries.evictions,
+            "hit_rate": round((counters["hits"] + counters["stale_hits"]) / lookups, 4) if lookups else 0.0,
+        })
+        return counters
@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+from xgboost import XGBRegressor
+
+from scoring import ENSEMBLE_FEATURES
+
+MODEL_DIR = os.environ.get(
+    "RANKER_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+)
+
+
+# Versioned model files are named "<name>-<version>.json", where version is a
+# sortable UTC timestamp with microseconds ("YYYYmmddHHMMSSffffff") written by
+# train_ranker.py / train_weights.py.
+
+def model_path(model_dir, name, version):
+    return os.path.join(model_dir, f"{name}-{version}.json")
+
+
+def latest_model(model_dir, name):
+    prefix = f"{name}-"
+    try:
+        versions = [
+            entry.name[len(prefix):-len(".json")]
+            for entry in os.scandir(model_dir)
+            if entry.name.startswith(prefix) and entry.name.endswith(".json")
+        ]
+    except FileNotFoundError:
+        return None, None
+    if not versions:
+        return None, None
+    version = max(versions)
+    return version, model_path(model_dir, name, version)
+
+
+def save_model(model, model_dir, name):
+    # Write to a temporary file first so a watching Ranker never loads half a model
+    return _save(lambda path: model.save_model(path), model_dir, name)
+
+
+def save_weights(weights, model_dir, name, **info):
+    # Learned ensemble weights ({feature: weight}) plus whatever `info`
+    # describes the training run, read back by EnsembleWeights
+    def write(path):
+        with open(path, "w") as file:
+            json.dump({"weights": weights, **info}, file, indent=2)
+    return _save(write, model_dir, name)
+
+
+def _version(now_ns):
+    seconds, ns = divmod(now_ns, 1_000_000_000)
+    return time.strftime("%Y%m%d%H%M%S", time.gmtime(seconds)) + f"{ns // 1000:06d}"
+
+
+def _save(write, model_dir, name):
+    # os.link never replaces an existing file, so two saves in the same
+    # microsecond get consecutive versions instead of overwriting each other
+    os.makedirs(model_dir, exist_ok=True)
+    now_ns = time.time_ns()
+    tmp_path = os.path.join(model_dir, f".{name}-{_version(now_ns)}-{os.getpid()}.json")
+    write(tmp_path)
+    try:
+        while True:
+            path = model_path(model_dir, name, _version(now_ns))
+            try:
+                os.link(tmp_path, path)
+                return path
+            except FileExistsError:
+                now_ns += 1000
+    finally:
+        os.remove(tmp_path)
+
+
+class VersionedModel(ABC):
+    """
+    Latest "<name>-<version>.json" in `model_dir`, loaded once at startup; a
+    newer file is picked up at most every `check_interval` seconds without a
+    restart. Subclasses implement load(path, version).
+    """
+
+    def __init__(self, name, model_dir=MODEL_DIR, check_interval=5.0):
+        self.name = name
+        self.model_dir = model_dir
+        self.check_interval = check_interval
+        self.version = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    @abstractmethod
+    def load(self, path, version):
+        pass
+
+    def reload(self):
+        version, path = latest_model(self.model_dir, self.name)
+        self._last_check = time.monotonic()
+        if version is None or version == self.version:
+            return False
+        self.load(path, version)
+        self.version = version
+        print(f"Loaded {self.name} version {version}")
+        return True
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._last_check < self.check_interval:
+            return
+        if self._lock.acquire(blocking=False):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Error reloading {self.name}: {str(e)}")
+            finally:
+                self._lock.release()
+
+
+class Ranker(VersionedModel):
+    """
+    Pre-trained XGBoost ranker. predict only runs the model on a batched
+    feature matrix.
+    """
+
+    def __init__(self, name, model_dir=MODEL_DIR, check_interval=5.0):
+        self.model = None
+        self.features = None
+        super().__init__(name, model_dir, check_interval)
+
+    def load(self, path, version):
+        model = XGBRegressor()
+        model.load_model(path)
+        # Swap both together so concurrent predicts see one consistent model
+        self.model, self.features = model, model.get_booster().feature_names
+
+    def predict(self, data):
+        self._maybe_reload()
+        model, features = self.model, self.features
+        if model is None:
+            # No trained model yet: the ranker is trained to imitate the ensemble
+            return data["ensemble_score"].to_numpy(dtype=np.float32)
+        return model.predict(data[features])
+
+
+class EnsembleWeights(VersionedModel):
+    """
+    Ensemble weights learned from interaction logs (train_weights.py), as a
+    vector in ENSEMBLE_FEATURES order for scoring.ensemble_scores. Until a
+    weights file exists, get() returns None and the fixed weights are used.
+    """
+
+    def __init__(self, name="ensemble-weights", model_dir=MODEL_DIR, check_interval=5.0):
+        self.current = (None, None)
+        super().__init__(name, model_dir, check_interval)
+
+    def load(self, path, version):
+        with open(path, "r") as file:
+            weights = json.load(file)["weights"]
+        unknown = set(weights) - set(ENSEMBLE_FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown ensemble features in {path}: {', '.join(sorted(unknown))}")
+        vector = np.array([float(weights.get(feature, 0.0)) for feature in ENSEMBLE_FEATURES])
+        self.current = (version, vector)
+
+    def get(self):
+        # (version, weight vector), read together so a result is never cached
+        # under the version of other weights than it was scored with
+        self._maybe_reload()
+        return self.current
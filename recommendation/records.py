@@ -0,0 +1,44 @@
+# Compact, integer-coded user records. Skills and domains are bitmasks over the
+# shared vocabularies (vocab.py), so set checks are integer AND/popcount instead
+# of building string sets, and a record is a fraction of the size of the
+# equivalent dict of lists of strings.
+
+class UserRecord:
+    __slots__ = ("user_id", "name", "skills", "domains", "feedback", "projects_completed", "project_ids", "source")
+
+    def __init__(self, user_id, name, skills, domains, feedback, projects_completed, project_ids, source=None):
+        self.user_id = user_id
+        self.name = name
+        self.skills = skills                # Skill ID bitmask
+        self.domains = domains              # Bitmask of domains of completed projects
+        self.feedback = feedback
+        self.projects_completed = projects_completed
+        self.project_ids = project_ids      # Tuple of completed project IDs
+        self.source = source                # The user dict it was interned from, if any
+
+    def __repr__(self):
+        return f"UserRecord(user_id={self.user_id!r}, name={self.name!r})"
+
+
+def to_record(user, skill_vocab, domain_vocab, add=False):
+    # Intern a data.json user dict; records pass through unchanged. Skills and
+    # domains the vocabularies do not know are dropped (as UserStore does)
+    # unless add=True, which gives them new IDs (intern into a copy to keep a
+    # shared vocabulary unchanged).
+    if isinstance(user, UserRecord):
+        return user
+    completed = user.get("completed_projects", [])
+    return UserRecord(
+        user_id=user.get("user_id"),
+        name=user.get("name"),
+        skills=skill_vocab.bits(user.get("skills", []), add=add),
+        domains=domain_vocab.bits((p.get("domain") for p in completed if p.get("domain") is not None), add=add),
+        feedback=user.get("feedback", 0),
+        projects_completed=user.get("projects_completed", 0),
+        project_ids=tuple(p["project_id"] for p in completed),
+        source=user,
+    )
+
+
+def to_records(users, skill_vocab, domain_vocab, add=False):
+    return [to_record(user, skill_vocab, domain_vocab, add) for user in users]
@@ -0,0 +1,372 @@
+import argparse
+import contextlib
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from fetchers import PLATFORMS
+from integration_store import IntegrationWriteBuffer
+from profile_cache import is_error
+
+# Background refresh of integration stats. Jobs (user_id, platform, username)
+# live in a SQLite file so they survive restarts; a pool of worker threads
+# claims them, fetches through the integrations service's profile cache with
+# refresh=True (so the cache is updated too), writes the result and retries
+# failures with exponential backoff. Each platform has its own rate limit shared
+# by all workers. The CLI batches writes through an IntegrationWriteBuffer.
+#
+#   python refresh_worker.py enqueue              # every user with an integration
+#   python refresh_worker.py run --workers 8
+#   python refresh_worker.py status
+
+QUEUE_PATH = os.environ.get("REFRESH_QUEUE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "refresh_jobs.db"))
+MAX_ATTEMPTS = int(os.environ.get("REFRESH_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE = float(os.environ.get("REFRESH_BACKOFF_BASE", "30"))
+BACKOFF_MAX = float(os.environ.get("REFRESH_BACKOFF_MAX", "3600"))
+
+# Requests per second per platform (REFRESH_RATE_GITHUB etc. override)
+DEFAULT_RATES = {"github": 1.0, "leetcode": 2.0, "hackerrank": 1.0, "linkedin": 10.0}
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue. One row per (user_id, platform): enqueueing a job
+    that is already queued just updates it, and a job that is running is left
+    alone. Every call opens its own connection, so a queue can be shared by
+    worker threads and by other processes.
+    """
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    user_id TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    run_after REAL NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, platform)
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, platform, run_after)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # Autocommit connection; multi-statement changes use explicit BEGIN IMMEDIATE
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def enqueue(self, jobs):
+        # jobs: iterable of (user_id, platform, username). Collected before the
+        # write transaction opens, so a slow source (paging through Supabase)
+        # never holds the lock workers need to claim jobs.
+        now = time.time()
+        rows = [(str(user_id), platform, username, now, now) for user_id, platform, username in jobs]
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            cursor = db.executemany("""
+                INSERT INTO jobs (user_id, platform, username, updated_at, run_after)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, platform) DO UPDATE SET
+                    username = excluded.username, status = 'queued', attempts = 0,
+                    run_after = excluded.run_after, last_error = NULL, updated_at = excluded.updated_at
+                WHERE status != 'running'
+            """, rows)
+            db.execute("COMMIT")
+        return cursor.rowcount
+
+    def claim(self, platforms=None):
+        # Atomically mark the oldest ready job as running and return it (or None)
+        now = time.time()
+        platforms = list(platforms or PLATFORMS)
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(f"""
+                SELECT user_id, platform, username, attempts FROM jobs
+                WHERE status = 'queued' AND run_after <= ? AND platform IN ({",".join("?" * len(platforms))})
+                ORDER BY run_after LIMIT 1
+            """, [now] + platforms).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE user_id = ? AND platform = ?",
+                    (now, row["user_id"], row["platform"]),
+                )
+            db.execute("COMMIT")
+        return dict(row) if row is not None else None
+
+    def complete(self, job):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'done', attempts = attempts + 1, last_error = NULL, updated_at = ? "
+                "WHERE user_id = ? AND platform = ?",
+                (time.time(), job["user_id"], job["platform"]),
+            )
+
+    def fail(self, job, error, max_attempts=MAX_ATTEMPTS):
+        # Requeue with exponential backoff plus jitter, or give up after max_attempts
+        attempts = job["attempts"] + 1
+        now = time.time()
+        if attempts >= max_attempts:
+            status, run_after = "failed", now
+        else:
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+            status, run_after = "queued", now + delay * random.uniform(0.5, 1.0)
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, run_after = ?, last_error = ?, updated_at = ? "
+                "WHERE user_id = ? AND platform = ?",
+                (status, attempts, run_after, str(error), now, job["user_id"], job["platform"]),
+            )
+        return status
+
+    def recover(self):
+        # Jobs left 'running' by a worker that died are queued again; run() calls
+        # this on startup, so run one worker process per queue file
+        with self._connect() as db:
+            cursor = db.execute("UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'", (time.time(),))
+            return cursor.rowcount
+
+    def counts(self):
+        with self._connect() as db:
+            rows = db.execute("SELECT platform, status, COUNT(*) AS n FROM jobs GROUP BY platform, status").fetchall()
+        counts = {}
+        for row in rows:
+            counts.setdefault(row["platform"], {})[row["status"]] = row["n"]
+        return counts
+
+    def next_run_after(self, platforms=None):
+        platforms = list(platforms or PLATFORMS)
+        with self._connect() as db:
+            row = db.execute(f"""
+                SELECT MIN(run_after) FROM jobs
+                WHERE status = 'queued' AND platform IN ({",".join("?" * len(platforms))})
+            """, platforms).fetchone()
+        return row[0]
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def platform_rates():
+    return {
+        platform: float(os.environ.get(f"REFRESH_RATE_{platform.upper()}", rate))
+        for platform, rate in DEFAULT_RATES.items()
+    }
+
+
+def default_fetch(platform, user_name):
+    import integrations
+    return integrations.profiles.fetch(platform, user_name, refresh=True)
+
+
+def default_update(user_id, platform, result, user_name):
+    import integrations
+    response = integrations.update_integrations(user_id, platform, result, user_name)
+    if not response.data:
+        raise RuntimeError("Failed to update Supabase")
+
+
+class RefreshWorker:
+    """
+    Pool of threads draining a JobQueue. fetch(platform, username) and
+    update(user_id, platform, result, username) default to the integrations service.
+    With a `buffer` (IntegrationWriteBuffer) results are written through it
+    instead, and a job is only completed once its write has been flushed.
+    """
+
+    def __init__(self, queue, workers=4, fetch=default_fetch, update=default_update, rates=None,
+                 platforms=None, max_attempts=MAX_ATTEMPTS, idle_sleep=1.0, buffer=None):
+        self.queue = queue
+        self.workers = workers
+        self.fetch = fetch
+        self.update = update
+        self.buffer = buffer
+        self.platforms = list(platforms or PLATFORMS)
+        self.limiters = {platform: RateLimiter(rate) for platform, rate in (rates or platform_rates()).items()}
+        self.max_attempts = max_attempts
+        self.idle_sleep = idle_sleep
+        self.counters = {"done": 0, "retried": 0, "failed": 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def process(self, job):
+        limiter = self.limiters.get(job["platform"])
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            result = self.fetch(job["platform"], job["username"])
+            if is_error(result):
+                # Keep the last good stats instead of overwriting them with an error
+                raise RuntimeError(result.get("error", "fetch failed"))
+            if self.buffer is not None:
+                # Stays 'running' until the flush (recover() requeues it if we die first)
+                self.buffer.add(job["user_id"], job["platform"], result, job["username"],
+                                lambda error: self.finish(job, error))
+                return True
+            self.update(job["user_id"], job["platform"], result, job["username"])
+        except Exception as e:
+            self.finish(job, e)
+            return False
+        self.finish(job, None)
+        return True
+
+    def finish(self, job, error):
+        if error is None:
+            self.queue.complete(job)
+            self._count("done")
+            return
+        status = self.queue.fail(job, error, self.max_attempts)
+        self._count("failed" if status == "failed" else "retried")
+        print(f"Error refreshing {job['platform']} for user {job['user_id']}: {str(error)}")
+
+    def _loop(self, drain):
+        while not self._stop.is_set():
+            job = None
+            try:
+                job = self.queue.claim(self.platforms)
+                if job is None:
+                    if drain and self.queue.next_run_after(self.platforms) is None:
+                        return
+                    self._stop.wait(self.idle_sleep)
+                    continue
+                self.process(job)
+            except Exception as e:
+                # e.g. "database is locked": keep the thread alive and put the job back
+                print(f"Error in refresh worker: {str(e)}")
+                if job is not None:
+                    try:
+                        self.queue.fail(job, e, self.max_attempts)
+                    except Exception as error:
+                        print(f"Error requeueing {job['platform']} for user {job['user_id']}: {str(error)}")
+                self._stop.wait(self.idle_sleep)
+
+    def run(self, drain=False):
+        # drain=True returns once nothing is queued (including pending retries)
+        self.queue.recover()
+        threads = [
+            threading.Thread(target=self._loop, args=(drain,), name=f"refresh-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stop()
+        return dict(self.counters)
+
+    def stop(self):
+        self._stop.set()
+
+
+def stored_username(data):
+    # The platform's own "username" field of a stored result (GitHub and
+    # LeetCode results have one)
+    if not isinstance(data, dict):
+        return None
+    user_name = data.get("username")
+    return user_name if user_name and user_name != "Error" else None
+
+
+def connected_jobs(user_id, stored, handles=None, platforms=PLATFORMS):
+    # (user_id, platform, username) for every connected platform of one user,
+    # fetched again for the account in integration_handles. Results stored
+    # before handles were recorded fall back to their own username, or to that
+    # of another platform, as /integrate/all uses one name for all of them.
+    handles = handles or {}
+    fallback = next((name for name in map(stored_username, stored.values()) if name), None)
+    for platform in platforms:
+        if platform in stored:
+            user_name = handles.get(platform) or stored_username(stored[platform]) or fallback
+            if user_name:
+                yield user_id, platform, user_name
+
+
+def integration_jobs(platforms=None, page_size=1000):
+    # (user_id, platform, username) for every user with a connected integration
+    import integrations
+    platforms = list(platforms or PLATFORMS)
+    start = 0
+    while True:
+        response = integrations.supabase.table("users").select("id, integrations, integration_handles") \
+            .range(start, start + page_size - 1).execute()
+        rows = response.data or []
+        for row in rows:
+            yield from connected_jobs(row["id"], row.get("integrations") or {}, row.get("integration_handles"), platforms)
+        if len(rows) < page_size:
+            return
+        start += page_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk integration refresh")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="SQLite job queue file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="Queue a refresh for every user with an integration")
+    enqueue.add_argument("--platforms", nargs="+", choices=PLATFORMS)
+    run = commands.add_parser("run", help="Process queued jobs")
+    run.add_argument("--workers", type=int, default=4)
+    run.add_argument("--platforms", nargs="+", choices=PLATFORMS)
+    run.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    commands.add_parser("status", help="Job counts per platform and status")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue)
+    if args.command == "enqueue":
+        count = queue.enqueue(integration_jobs(args.platforms))
+        print(f"Queued {count} jobs")
+    elif args.command == "run":
+        # Writes are coalesced into bulk merges instead of one RPC per job; jobs
+        # are completed (or retried) as their batches are flushed
+        import integrations
+        buffer = IntegrationWriteBuffer(integrations.supabase)
+        worker = RefreshWorker(queue, workers=args.workers, buffer=buffer, platforms=args.platforms)
+        try:
+            worker.run(drain=args.drain)
+        finally:
+            buffer.close()
+        print(f"Refresh finished: {worker.counters}, writes: {buffer.counters}")
+    else:
+        for platform, statuses in sorted(queue.counts().items()):
+            print(platform, statuses)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+
+import numpy as np
+from scoring import SCORE_DECIMALS, SCORE_FIELDS, USER_FIELDS, build_frame
+
+# Typed recommendation rows, encoded by the app's JSON provider (json_provider.py)
+# straight from the store and score columns, without a DataFrame or a dict per
+# row in between. The fields and their order are those of
+# scoring.build_frame, so the payload reads the same as the to_json output it
+# replaces. Scores are rounded to SCORE_DECIMALS like to_json does.
+
+
+# A plain dataclass: orjson encodes instances with a __dict__ about twice as
+# fast as slotted ones
+@dataclass
+class Recommendation:
+    user_id: int
+    name: str
+    skills: list
+    feedback: float
+    projects_completed: int
+    completed_projects: list
+    content_based: float
+    popularity_score: float
+    pre_requisite_score: float
+    collaborative_score: float
+    ensemble_score: float
+
+
+def recommendation_rows(store, rows, scores, order):
+    # Recommendation structs for rows[order], in that order
+    rows = rows[order]
+    columns = [store.column(rows, name, default) for name, default in USER_FIELDS.items()]
+    columns += [np.round(scores[name][order], SCORE_DECIMALS).tolist() for name in SCORE_FIELDS]
+    return list(map(Recommendation, *columns))
+
+
+def encode_recommendations(provider, recommendations):
+    # JSON array of the rows; keys keep the field order instead of being sorted
+    return provider.dumps(recommendations, sort_keys=False)
+
+
+def recommendation_page(provider, store, rows, scores, order):
+    # What encode_page serializes: structs when the provider encodes them
+    # natively, otherwise the DataFrame, whose C to_json beats json.dumps on
+    # dataclasses
+    if provider.fast_structs:
+        return recommendation_rows(store, rows, scores, order)
+    return build_frame(store, rows, scores, order)
+
+
+def encode_page(provider, page):
+    if isinstance(page, list):
+        return encode_recommendations(provider, page)
+    return page.to_json(orient='records')
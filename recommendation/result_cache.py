@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import threading
+
+from ttl_cache import TTLCache
+
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "300"))
+
+
+def project_key(project, *params):
+    # Canonical hash of what scoring actually reads from a project: skills are
+    # compared as sets, so order and duplicates do not matter, and project_id,
+    # name, etc. are ignored. `params` (dataset version, paging, retrieval
+    # size) are appended.
+    canonical = json.dumps([
+        sorted(set(project.get("required_skills") or [])),
+        sorted(set(project.get("preferred_skills") or [])),
+        project.get("domain"),
+        list(params),
+    ], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU/TTL cache of serialized recommendation results. The dataset version
+    (UserStore.version, weights version) is part of every key (see
+    project_key), so a result is only ever served for the pool it was computed
+    from; entries of replaced pools are never hit again and age out.
+    """
+
+    def __init__(self, max_size=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL):
+        self.entries = TTLCache(max_size=max_size, max_age=ttl)
+        self.counters = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value, _ = self.entries.get(key)
+        with self._lock:
+            self.counters["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key, value):
+        self.entries.set(key, value)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["hits"] + counters["misses"]
+        counters.update({
+            "size": len(self.entries),
+            "evictions": self.entries.evictions,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        })
+        return counters
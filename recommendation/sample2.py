@@ -12,10 +12,14 @@ from sklearn.metrics import precision_score, recall_score, f1_score, accuracy_sc
 # 
 from sklearn.feature_extraction.text import TfidfVectorizer
 import json
+from collab_engine import PearsonEngine
+from ranker import Ranker
 
 with open("data.json", "r") as file:
     users = json.load(file) 
     # all_users = json.load(file) 
+collab_engine = PearsonEngine(users)
+ranker = Ranker("ranker-sample2")
 # users = [
 #     {
 #         "user_id": 1,
@@ -138,52 +142,19 @@ def collaborative_based(users, project):
     """
     Recommends users for a new project based on Pearson correlation similarity,
     returning a single average similarity score for each relevant user and 
-    adding it to the users' data under the 'collaborative_based' key.
+    adding it to the users' data under the 'collaborative_score' key.
+    
+    The user-user similarities are precomputed once by `collab_engine`; each
+    call only looks up the rows of the users passed in.
     
     Parameters:
     - users: List of dictionaries containing user_id, and their completed projects (project_id, domain).
-    - project_id: The new project ID for which recommendations are needed.
-    - domain: The domain of the new project.
+    - project: The new project, providing the project_id and domain.
     
     Returns:
-    - List of users with the 'collaborative_based' score added to each user.
+    - List of users with the 'collaborative_score' score added to each user.
     """
-    # Flatten the data to have user_id, project_id, and domain for each completed project
-    data = []
-    for user in users:
-        for project in user['completed_projects']:
-            data.append({
-                'user_id': user['user_id'],
-                'project_id': project['project_id'],
-                'domain': project['domain']
-            })
-
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
-
-    # Create User-Project Interaction Matrix (Binary)
-    user_project_matrix = df.pivot_table(index='user_id', columns='project_id', aggfunc='size', fill_value=0)
-
-    # Compute Pearson Similarity Matrix
-    user_ids = user_project_matrix.index
-    similarity_matrix = pd.DataFrame(index=user_ids, columns=user_ids)
-
-    for u1 in user_ids:
-        for u2 in user_ids:
-            if u1 == u2:
-                similarity_matrix.loc[u1, u2] = 1  # Self similarity = 1
-            else:
-                corr, _ = pearsonr(user_project_matrix.loc[u1], user_project_matrix.loc[u2])
-                similarity_matrix.loc[u1, u2] = max(0, corr) if not pd.isna(corr) else 0  # Ensure non-negative values
-
-    # Get users who have worked in the same domain
-    relevant_users = df[df['domain'] == domain]['user_id'].unique()
-    
-    user_scores = {}
-    for user in relevant_users:
-        similar_users = similarity_matrix[user].drop(user)  # Exclude self-similarity
-        avg_similarity = similar_users.mean()  # Compute the average similarity score
-        user_scores[user] = round(avg_similarity, 4)
+    user_scores = collab_engine.scores([user['user_id'] for user in users], domain)
 
     # Add collaborative_based score to the users' data
     for user in users:
@@ -243,14 +214,9 @@ def ensemble_scoring(users, project):
 
     return data.sort_values(by="ensemble_score", ascending=False)
 
-# Train XGBoost Model
-def train_xgboost(data):
-    X = data[["content_based", "popularity_score", "collaborative_score"]]
-    y = data["ensemble_score"]
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    model = XGBRegressor(objective="reg:squarederror", n_estimators=50, learning_rate=0.1, max_depth=4)
-    model.fit(X_train, y_train)
-    data["predicted_score"] = model.predict(X)
+# Rank with the pre-trained XGBoost model (see train_ranker.py --pipeline sample2)
+def rank_recommendations(data):
+    data["predicted_score"] = ranker.predict(data)
     return data.sort_values(by="predicted_score", ascending=False)
 
 
@@ -276,29 +242,30 @@ def evaluate_recommendations(name, final_recommendations, relevant_users):
     print(f"F1-score: {f1:.2f}")
     print(f"Accuracy: {accuracy:.2f}")
 
-relevant_users = get_relevant_users(users, project)
-cb_users = pd.DataFrame(content_based(users.copy(), project))
-evaluate_recommendations("Content-Based Filtering", cb_users, relevant_users)
+if __name__ == "__main__":
+    relevant_users = get_relevant_users(users, project)
+    cb_users = pd.DataFrame(content_based(users.copy(), project))
+    evaluate_recommendations("Content-Based Filtering", cb_users, relevant_users)
 
-pop_users = pd.DataFrame(popularity_based(users.copy()))
-evaluate_recommendations("Popularity-Based Filtering", pop_users, relevant_users)
+    pop_users = pd.DataFrame(popularity_based(users.copy()))
+    evaluate_recommendations("Popularity-Based Filtering", pop_users, relevant_users)
 
-pre_req_users = pd.DataFrame(pre_requisite_based(users.copy(), project))
-evaluate_recommendations("Pre-Requisite Filtering", pre_req_users, relevant_users)
+    pre_req_users = pd.DataFrame(pre_requisite_based(users.copy(), project))
+    evaluate_recommendations("Pre-Requisite Filtering", pre_req_users, relevant_users)
 
-ensemble_users = ensemble_scoring(users.copy(), project)
-evaluate_recommendations("Ensemble Method", ensemble_users, relevant_users)
+    ensemble_users = ensemble_scoring(users.copy(), project)
+    evaluate_recommendations("Ensemble Method", ensemble_users, relevant_users)
 
-final_recommendations = train_xgboost(ensemble_users)
-evaluate_recommendations("XGBoost Model", final_recommendations, relevant_users)
-# # Run the System
-# filtered_users = ensemble_scoring(users, project)
-# # print(filtered_users)
-# # print(filtered_users.content_based)
-# final_recommendations = train_xgboost(filtered_users)
+    final_recommendations = rank_recommendations(ensemble_users)
+    evaluate_recommendations("XGBoost Model", final_recommendations, relevant_users)
+    # # Run the System
+    # filtered_users = ensemble_scoring(users, project)
+    # # print(filtered_users)
+    # # print(filtered_users.content_based)
+    # final_recommendations = train_xgboost(filtered_users)
 
 
 
-# Display Results
-print("Recommended Users for Project (Final Rankings):")
-print(final_recommendations)
+    # Display Results
+    print("Recommended Users for Project (Final Rankings):")
+    print(final_recommendations)
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from bitset import overlap, pack_ids
+
+
+# Vectorized versions of the get_recommendations scores. Each takes the UserStore
+# and an array of row positions and returns one score per row, using the exact
+# same arithmetic as the original per-row lambdas so results match bit for bit.
+
+def candidate_rows(store, project, ann=None, retrieve=None):
+    if ann is not None and retrieve:
+        # Retrieval stage: only the users nearest to the preferred skills are
+        # scored, after the exact required-skills check
+        rows = ann.query(project["preferred_skills"], retrieve)
+        if len(rows) > 0:
+            return np.sort(rows[store.has_skills(rows, project["required_skills"])])
+    return store.match_required(project["required_skills"])
+
+
+def content_scores(store, rows, preferred_skills):
+    # fixed_jaccard_similarity: |user & preferred| / |preferred|
+    denominator = len(set(preferred_skills))
+    if denominator == 0:
+        return np.zeros(len(rows))
+    preferred = pack_ids(store.skill_vocab.encode(preferred_skills), len(store.skill_vocab))
+    return overlap(store.skill_bits, preferred, rows) / denominator
+
+
+def popularity_scores(store, rows):
+    # Precomputed per user when the columns are built (snapshot.popularity_column)
+    return store.popularity[rows]
+
+
+def collaborative_scores(store, rows, domain):
+    # Memoized per domain on the store (UserStore.collaborative)
+    return store.collaborative(domain)[rows]
+
+
+# Inputs of the ensemble score, in the order of a learned weight vector
+ENSEMBLE_FEATURES = ('content_based', 'popularity_score', 'pre_requisite_score', 'collaborative_score')
+DEFAULT_WEIGHTS = {'content_based': 0.3, 'popularity_score': 0.2, 'pre_requisite_score': 0.3, 'collaborative_score': 0.2}
+
+
+def ensemble_scores(content, popularity, pre_requisite, collaborative, weights=None):
+    if weights is None:
+        return content * 0.3 + popularity * 0.2 + pre_requisite * 0.3 + collaborative * 0.2
+    # Learned weights (train_weights.py) in ENSEMBLE_FEATURES order: one
+    # matrix-vector product over the candidates
+    return np.column_stack([content, popularity, pre_requisite, collaborative]) @ weights
+
+
+def score_candidates(store, project, ann=None, retrieve=None, weights=None):
+    rows = candidate_rows(store, project, ann, retrieve)
+    return rows, score_rows(store, rows, project, weights)
+
+
+def score_rows(store, rows, project, weights=None):
+    if len(rows) == 0:
+        return {}
+
+    content = content_scores(store, rows, project["preferred_skills"])
+    popularity = popularity_scores(store, rows)
+    pre_requisite = np.ones(len(rows))  # All candidates meet the requirements
+    collaborative = collaborative_scores(store, rows, project["domain"])
+    return {
+        'content_based': content,
+        'popularity_score': popularity,
+        'pre_requisite_score': pre_requisite,
+        'collaborative_score': collaborative,
+        'ensemble_score': ensemble_scores(content, popularity, pre_requisite, collaborative, weights),
+    }
+
+
+def top_k(scores, k):
+    # Positions of the k best scores, best first. Ties keep pool order, matching a
+    # stable descending sort, but only the selected k are ever fully sorted.
+    if k >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    kth = -np.partition(-scores, k - 1)[k - 1]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    selected = np.concatenate([above, ties])
+    return selected[np.argsort(-scores[selected], kind='stable')]
+
+
+def rank(rows, scores, limit=None, offset=0):
+    # Positions into `rows` of the [offset, offset + limit) slice of the ranking
+    k = len(rows) if limit is None else offset + limit
+    return top_k(scores['ensemble_score'], k)[offset:]
+
+
+def build_frame(store, rows, scores, order):
+    # Output DataFrame of rows[order], in that order
+    rows = rows[order]
+    frame = pd.DataFrame({
+        'user_id': store.column(rows, 'user_id'),
+        'name': store.column(rows, 'name'),
+        'skills': store.column(rows, 'skills', []),
+        'feedback': store.column(rows, 'feedback', 0),
+        'projects_completed': store.column(rows, 'projects_completed', 0),
+        'completed_projects': store.column(rows, 'completed_projects', []),
+    })
+    for name, values in scores.items():
+        frame[name] = values[order]
+    return frame
+
+
+# Fields of a result record: user columns decoded from the store (with the
+# defaults build_frame uses) and the score columns. "score" is short for the
+# ensemble score.
+USER_FIELDS = {'user_id': None, 'name': None, 'skills': [], 'feedback': 0, 'projects_completed': 0, 'completed_projects': []}
+SCORE_FIELDS = ('content_based', 'popularity_score', 'pre_requisite_score', 'collaborative_score', 'ensemble_score')
+FIELD_ALIASES = {'score': 'ensemble_score'}
+DEFAULT_FIELDS = list(USER_FIELDS) + list(SCORE_FIELDS)  # The columns of build_frame
+RECORD_FIELDS = DEFAULT_FIELDS + list(FIELD_ALIASES)
+# pandas' to_json writes floats with 10 decimal places; rounding the scores
+# the same way keeps the payload (and anything compared against it) unchanged
+SCORE_DECIMALS = 10
+
+
+def iter_records(store, rows, scores, order, fields=DEFAULT_FIELDS, chunk_size=1000):
+    # Records of rows[order] as dicts of just `fields`, in order, with the
+    # scores rounded like the JSON rows. Only chunk_size rows are decoded at a
+    # time, so memory does not grow with the number of results.
+    for start in range(0, len(order), chunk_size):
+        chunk = order[start:start + chunk_size]
+        chunk_rows = rows[chunk]
+        columns = []
+        for field in fields:
+            name = FIELD_ALIASES.get(field, field)
+            if name in SCORE_FIELDS:
+                columns.append(np.round(scores[name][chunk], SCORE_DECIMALS).tolist())
+            else:
+                columns.append(store.column(chunk_rows, name, USER_FIELDS[name]))
+        for values in zip(*columns):
+            yield dict(zip(fields, values))
+
+
+def ranked_frame(store, rows, scores, limit=None, offset=0):
+    # Result rows in rank order, restricted to [offset, offset + limit)
+    if len(rows) == 0:
+        return pd.DataFrame()
+    return build_frame(store, rows, scores, rank(rows, scores, limit, offset))
+
+
+def recommendations_frame(store, project, limit=None, offset=0, ann=None, retrieve=None):
+    rows, scores = score_candidates(store, project, ann, retrieve)
+    return ranked_frame(store, rows, scores, limit, offset)
+
+
+def score_batch(store, projects, weights=None):
+    # Score many projects against one shared candidate pool. The preferred-skill
+    # vectors are stacked into a skill x project matrix so every content score
+    # comes out of a single sparse matrix multiply.
+    candidates = [candidate_rows(store, project) for project in projects]
+    pool = np.unique(np.concatenate(candidates)) if candidates else np.empty(0, dtype=np.int64)
+
+    preferred = store.skill_matrix([project["preferred_skills"] for project in projects])
+    overlap = (store.skills[pool] @ preferred).tocsc()
+    popularity = popularity_scores(store, pool)
+
+    results = []
+    for j, (project, rows) in enumerate(zip(projects, candidates)):
+        if len(rows) == 0:
+            results.append((rows, {}))
+            continue
+        positions = np.searchsorted(pool, rows)
+
+        denominator = len(set(project["preferred_skills"]))
+        if denominator == 0:
+            content = np.zeros(len(rows))
+        else:
+            content = overlap[:, j].toarray().ravel()[positions] / denominator
+        pre_requisite = np.ones(len(rows))
+        collaborative = collaborative_scores(store, rows, project["domain"])
+        results.append((rows, {
+            'content_based': content,
+            'popularity_score': popularity[positions],
+            'pre_requisite_score': pre_requisite,
+            'collaborative_score': collaborative,
+            'ensemble_score': ensemble_scores(content, popularity[positions], pre_requisite, collaborative, weights),
+        }))
+    return results
@@ -0,0 +1,261 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+from bitset import has_all, overlap, pack_ids
+from scoring import ensemble_scores, ranked_frame, top_k
+
+# Sharded execution of get_recommendations for very large pools. The rows are
+# split into SCORING_SHARDS contiguous ranges; every shard finds its candidates,
+# scores them and keeps its own top offset + limit, and the partial lists are
+# merged by the usual ranked_frame. Shards hand back their picks in row order,
+# so ties are broken exactly as in the single-threaded path and the results are
+# identical.
+#
+#   SCORING_SHARD_MODE=thread   - a thread pool over the store's own arrays
+#                                 (NumPy releases the GIL in the heavy loops)
+#   SCORING_SHARD_MODE=process  - worker processes reading the columns from
+#                                 multiprocessing.shared_memory, republished
+#                                 whenever the pool is replaced
+#
+# Pools smaller than SCORING_SHARD_MIN_USERS are not worth the fan-out and are
+# scored in the request thread as before.
+
+SHARDS = int(os.environ.get("SCORING_SHARDS", "0"))
+SHARD_MODE = os.environ.get("SCORING_SHARD_MODE", "thread")
+SHARD_MIN_USERS = int(os.environ.get("SCORING_SHARD_MIN_USERS", "200000"))
+
+SHARED_COLUMNS = ("skill_bits", "popularity", "domains", "posting_indptr", "posting_rows", "alive")
+
+
+def shard_bounds(n_rows, shards):
+    return np.linspace(0, n_rows, shards + 1).astype(np.int64)
+
+
+def make_query(store, project, weights=None):
+    # Everything a shard needs to know about the project (and the ensemble
+    # weights), as plain picklable values; None when a required skill is
+    # unknown (nobody can match)
+    required = set(project["required_skills"])
+    ids = [store.skill_vocab.get(skill) for skill in required]
+    if None in ids:
+        return None
+    posting = store.columns["posting_indptr"]
+    rarest = min(ids, key=lambda i: posting[i + 1] - posting[i]) if ids else None
+    n_skills = len(store.skill_vocab)
+    return {
+        "required": pack_ids(ids, n_skills) if len(ids) > 1 else None,
+        "rarest": rarest,
+        "preferred": pack_ids(store.skill_vocab.encode(project["preferred_skills"]), n_skills),
+        "denominator": len(set(project["preferred_skills"])),
+        "domain": store.domain_vocab.get(project["domain"]),
+        "weights": weights,
+    }
+
+
+def shard_candidates(arrays, lo, hi, query):
+    # store.match_required restricted to rows [lo, hi): the rarest skill's
+    # posting list is sorted, so the shard's part of it is one slice
+    if query["rarest"] is None:
+        rows = np.arange(lo, hi, dtype=np.int64)
+    else:
+        indptr = arrays["posting_indptr"]
+        posting = arrays["posting_rows"][indptr[query["rarest"]]:indptr[query["rarest"] + 1]]
+        rows = np.asarray(posting[np.searchsorted(posting, lo):np.searchsorted(posting, hi)], dtype=np.int64)
+        if query["required"] is not None and len(rows) > 0:
+            rows = rows[has_all(arrays["skill_bits"], query["required"], rows)]
+    alive = arrays.get("alive")
+    if alive is not None:
+        rows = rows[alive[rows]]
+    return rows
+
+
+def score_shard(arrays, lo, hi, query, k, collaborative=None):
+    # (rows, scores) of the shard's best k candidates (all of them when k is
+    # None), in row order
+    rows = shard_candidates(arrays, lo, hi, query)
+    if len(rows) == 0:
+        return rows, {}
+    if query["denominator"] == 0:
+        content = np.zeros(len(rows))
+    else:
+        content = overlap(arrays["skill_bits"], query["preferred"], rows) / query["denominator"]
+    popularity = arrays["popularity"][rows]
+    pre_requisite = np.ones(len(rows))
+    if collaborative is not None:
+        collaborative = collaborative[rows]
+    elif query["domain"] is None:
+        collaborative = np.full(len(rows), 0.3)
+    else:
+        collaborative = np.where(arrays["domains"][rows, query["domain"]], 0.8, 0.3)
+    scores = {
+        'content_based': content,
+        'popularity_score': popularity,
+        'pre_requisite_score': pre_requisite,
+        'collaborative_score': collaborative,
+        'ensemble_score': ensemble_scores(content, popularity, pre_requisite, collaborative, query["weights"]),
+    }
+    if k is not None and k < len(rows):
+        keep = np.sort(top_k(scores['ensemble_score'], k))
+        rows = rows[keep]
+        scores = {name: values[keep] for name, values in scores.items()}
+    return rows, scores
+
+
+def merge_shards(parts):
+    # Shards cover ascending row ranges, so concatenating them keeps row order
+    parts = [(rows, scores) for rows, scores in parts if len(rows) > 0]
+    if not parts:
+        return np.empty(0, dtype=np.int64), {}
+    rows = np.concatenate([rows for rows, _ in parts])
+    scores = {name: np.concatenate([scores[name] for _, scores in parts]) for name in parts[0][1]}
+    return rows, scores
+
+
+class SharedColumns:
+    """
+    Copies of the scoring columns of one store in named shared memory blocks.
+    `layout` is what a worker process needs to map them: block names, shapes
+    and dtypes. `users` counts the score() calls still reading them.
+    """
+
+    def __init__(self, store):
+        self.version = store.version
+        self.users = 0
+        self.blocks = []
+        self.layout = {"version": store.version, "arrays": {}}
+        for name in SHARED_COLUMNS:
+            value = store.columns.get(name)
+            if value is None:
+                continue
+            value = np.ascontiguousarray(value)
+            block = shared_memory.SharedMemory(create=True, size=max(1, value.nbytes))
+            np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+            self.blocks.append(block)
+            self.layout["arrays"][name] = (block.name, value.shape, value.dtype.str)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+# Worker-process side: mapped columns of the stores seen so far (the current
+# and the previous one, which in-flight requests may still be scoring)
+_mapped = {}
+
+
+def _map_columns(layout):
+    version = layout["version"]
+    if version not in _mapped:
+        blocks, arrays = [], {}
+        for name, (block_name, shape, dtype) in layout["arrays"].items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        _mapped[version] = (blocks, arrays)
+        for old in sorted(_mapped)[:-2]:
+            if old != version:
+                for block in _mapped.pop(old)[0]:
+                    block.close()
+    return _mapped[version][1]
+
+
+def _score_shared_shard(layout, lo, hi, query, k):
+    return score_shard(_map_columns(layout), lo, hi, query, k)
+
+
+class ShardedScorer:
+    """
+    Scores one project across `shards` slices of the pool in parallel.
+
+    Parameters:
+        shards (int): Number of row ranges (and pool workers).
+        mode (str): "thread" or "process" (shared-memory columns).
+    """
+
+    def __init__(self, shards=SHARDS, mode=SHARD_MODE):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown shard mode {mode!r}, expected 'thread' or 'process'")
+        self.shards = max(1, shards)
+        self.mode = mode
+        self._executor = None
+        self._shared = []  # SharedColumns of the latest store (last) and of stores still being scored
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Created on first use, so a scorer built before gunicorn forks gets its
+        # workers in each worker process rather than in the master
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "thread":
+                    self._executor = ThreadPoolExecutor(self.shards, thread_name_prefix="score-shard")
+                else:
+                    # spawn: the request process is multi-threaded, so forking it is
+                    # unsafe. Spawned workers re-import the main module, which is
+                    # cheap under gunicorn but reloads the pool with `python app.py`.
+                    self._executor = ProcessPoolExecutor(self.shards, mp_context=get_context("spawn"))
+            return self._executor
+
+    def _acquire(self, store):
+        # SharedColumns of `store` (published on first use), held until _release
+        with self._lock:
+            shared = next((shared for shared in self._shared if shared.version == store.version), None)
+            if shared is None:
+                if not self._shared:
+                    atexit.register(self.close)  # Unlink the blocks on the way out
+                shared = SharedColumns(store)
+                self._shared.append(shared)
+                self._unlink_unused()
+            shared.users += 1
+            return shared
+
+    def _release(self, shared):
+        with self._lock:
+            shared.users -= 1
+            self._unlink_unused()
+
+    def _unlink_unused(self):
+        # Older stores' blocks go as soon as no call reads them any more
+        for shared in self._shared[:-1]:
+            if shared.users == 0:
+                shared.close()
+        self._shared = [shared for shared in self._shared[:-1] if shared.users > 0] + self._shared[-1:]
+
+    def score(self, store, project, k=None, weights=None):
+        # (rows, scores) holding at least the best k candidates, in row order
+        query = make_query(store, project, weights)
+        if query is None:
+            return np.empty(0, dtype=np.int64), {}
+        bounds = shard_bounds(store.n_users, self.shards)
+        ranges = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        pool = self._pool()
+        if self.mode == "thread":
+            collaborative = store.collaborative(project["domain"])  # Memoized on the store
+            futures = [pool.submit(score_shard, store.columns, lo, hi, query, k, collaborative) for lo, hi in ranges]
+        else:
+            shared = self._acquire(store)
+            futures = []
+            try:
+                futures.extend(pool.submit(_score_shared_shard, shared.layout, lo, hi, query, k) for lo, hi in ranges)
+                wait(futures)  # No shard may still be mapping the blocks when they are unlinked
+            finally:
+                self._release(shared)
+        return merge_shards([future.result() for future in futures])
+
+    def recommendations_frame(self, store, project, limit=None, offset=0):
+        rows, scores = self.score(store, project, None if limit is None else offset + limit)
+        return ranked_frame(store, rows, scores, limit, offset)
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            for shared in self._shared:
+                shared.close()
+            self._shared = []
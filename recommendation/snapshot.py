@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+from bitset import pack_csr
+from vocab import domain_vocabulary, skill_vocabulary
+
+# Binary snapshot of the user pool: one .npy file per column plus meta.json.
+# load_snapshot memory-maps every array, so startup does no parsing and forked
+# workers share one page-cached copy of the pool.
+#
+#   user_id, feedback, projects_completed   scalar columns
+#   name_offsets + names                    UTF-8 names
+#   skills_indptr + skills_ids              raw skill lists as interned skill IDs
+#   skill_set_indptr/ids/data               deduplicated user x skill CSR matrix
+#   posting_indptr + posting_rows           skill -> sorted user rows (inverted index)
+#   projects_indptr + project_ids/domains   completed_projects, domains interned (-1 = none)
+#   skill_bits                              packed uint64 user x skill bitsets
+#   popularity                              per-user popularity score (feedback, projects_completed)
+#   domains                                 user x domain indicator matrix
+#   extras_offsets + extras                 every other field, one JSON object per user
+#   alive (optional)                        False for rows deleted since the last compaction
+
+SNAPSHOT_VERSION = 3
+
+
+def _strings(values):
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _index_dtype(*sizes):
+    # scipy keeps int32 CSR index arrays as-is; mixed or int64 arrays get copied
+    return np.int32 if max(sizes, default=0) < np.iinfo(np.int32).max else np.int64
+
+
+def build_columns(users, skill_vocab=None, domain_vocab=None):
+    # Skill and domain IDs come from the shared vocabularies (seeded from the
+    # client's skills.json/domains.json); unseen names are appended
+    skill_vocab = skill_vocab.copy() if skill_vocab is not None else skill_vocabulary()
+    domain_vocab = domain_vocab.copy() if domain_vocab is not None else domain_vocabulary()
+    skills_indptr = [0]
+    skills_ids = []
+    projects_indptr = [0]
+    project_ids = []
+    project_domains = []
+    extras = []
+    for user in users:
+        for skill in user.get("skills", []):
+            skills_ids.append(skill_vocab.add(skill))
+        skills_indptr.append(len(skills_ids))
+        for project in user.get("completed_projects", []):
+            domain = project.get("domain")
+            project_ids.append(project["project_id"])
+            project_domains.append(-1 if domain is None else domain_vocab.add(domain))
+        projects_indptr.append(len(project_ids))
+        extras.append(json.dumps({
+            key: value for key, value in user.items()
+            if key not in ("user_id", "name", "skills", "feedback", "projects_completed", "completed_projects")
+        }))
+
+    n_users = len(users)
+    n_skills = len(skill_vocab)
+    columns = {
+        "skill_vocab": list(skill_vocab.names),
+        "domain_vocab": list(domain_vocab.names),
+        "user_id": np.array([user["user_id"] for user in users], dtype=np.int64),
+        "feedback": np.array([user.get("feedback", 0) for user in users], dtype=np.float64),
+        "projects_completed": np.array([user.get("projects_completed", 0) for user in users], dtype=np.int64),
+        "skills_indptr": np.array(skills_indptr, dtype=np.int64),
+        "skills_ids": np.array(skills_ids, dtype=np.int32),
+        "projects_indptr": np.array(projects_indptr, dtype=np.int64),
+        "project_ids": np.array(project_ids, dtype=np.int64),
+        "project_domains": np.array(project_domains, dtype=np.int32),
+    }
+    columns["name_offsets"], columns["names"] = _strings(str(user.get("name", "")) for user in users)
+    columns["extras_offsets"], columns["extras"] = _strings(extras)
+    columns.update(derive_columns(columns, n_users, n_skills, len(domain_vocab)))
+    return columns
+
+
+def popularity_column(feedback, projects_completed):
+    # popularity_score of the original pipeline; depends only on the user
+    return feedback * 0.1 + np.where(projects_completed > 10, 0.5, (projects_completed / 2) * 0.1)
+
+
+def derive_columns(columns, n_users, n_skills, n_domains):
+    # Deduplicated skill CSR and its transpose (posting lists), from the raw lists
+    rows = np.repeat(np.arange(n_users, dtype=np.int64), np.diff(columns["skills_indptr"]))
+    pairs = np.unique(rows * max(n_skills, 1) + columns["skills_ids"])
+    set_rows, set_ids = np.divmod(pairs, max(n_skills, 1))
+    dtype = _index_dtype(len(pairs), n_users, n_skills)
+    skill_set_indptr = np.zeros(n_users + 1, dtype=dtype)
+    np.cumsum(np.bincount(set_rows, minlength=n_users), out=skill_set_indptr[1:])
+    by_skill = np.lexsort((set_rows, set_ids))
+    posting_indptr = np.zeros(n_skills + 1, dtype=np.int64)
+    np.cumsum(np.bincount(set_ids, minlength=n_skills), out=posting_indptr[1:])
+
+    domains = np.zeros((n_users, n_domains), dtype=bool)
+    project_rows = np.repeat(np.arange(n_users), np.diff(columns["projects_indptr"]))
+    known = columns["project_domains"] >= 0
+    domains[project_rows[known], columns["project_domains"][known]] = True
+    return {
+        "skill_set_indptr": skill_set_indptr,
+        "skill_set_ids": set_ids.astype(dtype),
+        "skill_set_data": np.ones(len(pairs)),
+        "posting_indptr": posting_indptr,
+        "posting_rows": set_rows[by_skill],
+        "skill_bits": pack_csr(skill_set_indptr, set_ids, n_users, n_skills),
+        "popularity": popularity_column(columns["feedback"], columns["projects_completed"]),
+        "domains": domains,
+    }
+
+
+def _gather(indptr, values, rows):
+    # values[indptr[row]:indptr[row + 1]] for each row, concatenated, with the new indptr
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = np.asarray(indptr, dtype=np.int64)[rows]
+    lengths = np.asarray(indptr, dtype=np.int64)[rows + 1] - starts
+    new_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_indptr[1:])
+    flat = np.repeat(starts - new_indptr[:-1], lengths) + np.arange(new_indptr[-1])
+    return np.asarray(values)[flat], new_indptr
+
+
+def _concat_ragged(indptr_a, values_a, indptr_b, values_b):
+    indptr = np.concatenate([np.asarray(indptr_a, dtype=np.int64), np.asarray(indptr_b[1:], dtype=np.int64) + indptr_a[-1]])
+    return indptr, np.concatenate([values_a, values_b])
+
+
+RAGGED = [
+    ("skills_indptr", "skills_ids"), ("projects_indptr", "project_ids"), ("projects_indptr", "project_domains"),
+    ("name_offsets", "names"), ("extras_offsets", "extras"),
+]
+
+
+def append_columns(base, delta):
+    # Columns with the rows of `delta` after those of `base`. `delta` must have
+    # been built with base's vocabularies (build_columns(users, base vocabs)),
+    # so its vocabularies extend base's. Derived structures are extended in
+    # place of being rebuilt: posting lists get the new rows spliced in at the
+    # end of each skill's run, bitsets and domain indicators are widened for any
+    # new skills/domains.
+    n_base = len(base["user_id"])
+    n_delta = len(delta["user_id"])
+    n_skills = len(delta["skill_vocab"])
+    n_domains = len(delta["domain_vocab"])
+    columns = {"skill_vocab": delta["skill_vocab"], "domain_vocab": delta["domain_vocab"]}
+    for name in ("user_id", "feedback", "projects_completed", "popularity"):
+        columns[name] = np.concatenate([base[name], delta[name]])
+    for indptr, values in RAGGED:
+        columns[indptr], columns[values] = _concat_ragged(base[indptr], base[values], delta[indptr], delta[values])
+
+    # User x skill CSR
+    nnz = len(base["skill_set_ids"]) + len(delta["skill_set_ids"])
+    dtype = _index_dtype(nnz, n_base + n_delta, n_skills)
+    indptr, ids = _concat_ragged(base["skill_set_indptr"], base["skill_set_ids"], delta["skill_set_indptr"], delta["skill_set_ids"])
+    columns["skill_set_indptr"] = indptr.astype(dtype)
+    columns["skill_set_ids"] = ids.astype(dtype)
+    columns["skill_set_data"] = np.ones(nnz)
+
+    # Posting lists: delta rows go after every base row of the same skill
+    base_indptr = np.asarray(base["posting_indptr"], dtype=np.int64)
+    base_counts = np.zeros(n_skills, dtype=np.int64)
+    base_counts[:len(base_indptr) - 1] = np.diff(base_indptr)
+    delta_counts = np.diff(delta["posting_indptr"])
+    delta_skills = np.repeat(np.arange(n_skills), delta_counts)
+    positions = np.where(delta_skills < len(base_indptr) - 1, base_indptr[np.minimum(delta_skills + 1, len(base_indptr) - 1)], base_indptr[-1])
+    columns["posting_rows"] = np.insert(np.asarray(base["posting_rows"]), positions, np.asarray(delta["posting_rows"]) + n_base)
+    columns["posting_indptr"] = np.zeros(n_skills + 1, dtype=np.int64)
+    np.cumsum(base_counts + delta_counts, out=columns["posting_indptr"][1:])
+
+    def widen(matrix, width):
+        matrix = np.asarray(matrix)
+        if matrix.shape[1] == width:
+            return matrix
+        padded = np.zeros((matrix.shape[0], width), dtype=matrix.dtype)
+        padded[:, :matrix.shape[1]] = matrix
+        return padded
+
+    columns["skill_bits"] = np.concatenate([widen(base["skill_bits"], delta["skill_bits"].shape[1]), delta["skill_bits"]])
+    columns["domains"] = np.concatenate([widen(base["domains"], n_domains), delta["domains"]])
+    columns["alive"] = np.concatenate([
+        base["alive"] if "alive" in base else np.ones(n_base, dtype=bool),
+        np.ones(n_delta, dtype=bool),
+    ])
+    return columns
+
+
+def compact_columns(columns, rows):
+    # Columns holding only `rows` (e.g. the live rows once enough are tombstoned),
+    # with the derived structures recomputed from the kept raw lists
+    rows = np.asarray(rows, dtype=np.int64)
+    compacted = {"skill_vocab": columns["skill_vocab"], "domain_vocab": columns["domain_vocab"]}
+    for name in ("user_id", "feedback", "projects_completed"):
+        compacted[name] = np.asarray(columns[name])[rows]
+    for indptr, values in RAGGED:
+        compacted[values], compacted[indptr] = _gather(columns[indptr], columns[values], rows)
+    compacted.update(derive_columns(compacted, len(rows), len(columns["skill_vocab"]), len(columns["domain_vocab"])))
+    return compacted
+
+
+def write_snapshot(columns, path, source=None):
+    # Build in a sibling directory and swap it in, so readers never see a mix of
+    # old and new files (processes that already mapped the old files keep them)
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    meta = {"version": SNAPSHOT_VERSION, "n_users": len(columns["user_id"]), "source": source}
+    for name, value in columns.items():
+        if isinstance(value, np.ndarray):
+            np.save(os.path.join(tmp_path, f"{name}.npy"), value)
+        elif name != "source":
+            meta[name] = value
+    with open(os.path.join(tmp_path, "meta.json"), "w") as file:
+        json.dump(meta, file)
+
+    old_path = path + ".old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def load_snapshot(path):
+    with open(os.path.join(path, "meta.json"), "r") as file:
+        meta = json.load(file)
+    if meta.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {meta.get('version')} in {path}")
+    columns = {"skill_vocab": meta["skill_vocab"], "domain_vocab": meta["domain_vocab"], "source": meta.get("source")}
+    for entry in os.scandir(path):
+        if entry.name.endswith(".npy"):
+            columns[entry.name[:-len(".npy")]] = np.load(entry.path, mmap_mode="r")
+    return columns
+
+
+def source_info(json_path):
+    stat = os.stat(json_path)
+    return {"path": os.path.basename(json_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_columns(json_path="data.json", snapshot_path=None):
+    # Prefer an up-to-date snapshot next to the JSON file; fall back to parsing JSON
+    snapshot_path = snapshot_path or os.path.splitext(json_path)[0] + ".snapshot"
+    if os.path.exists(os.path.join(snapshot_path, "meta.json")):
+        try:
+            columns = load_snapshot(snapshot_path)
+            if not os.path.exists(json_path) or columns["source"] == source_info(json_path):
+                return columns
+            print(f"Snapshot {snapshot_path} is older than {json_path}, loading JSON instead")
+        except Exception as e:
+            print(f"Error loading snapshot {snapshot_path}: {str(e)}")
+    with open(json_path, "r") as file:
+        return build_columns(json.load(file))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a users JSON file into a memory-mappable snapshot")
+    parser.add_argument("source", nargs="?", default="data.json", help="data.json or data2.json")
+    parser.add_argument("destination", nargs="?", help="Snapshot directory (default: <source>.snapshot)")
+    args = parser.parse_args()
+
+    destination = args.destination or os.path.splitext(args.source)[0] + ".snapshot"
+    with open(args.source, "r") as file:
+        users = json.load(file)
+    write_snapshot(build_columns(users), destination, source_info(args.source))
+    print(f"Wrote {len(users)} users to {destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+-- Single-round-trip integration writes for recommendation/integration_store.py.
+-- Run once in the Supabase SQL editor (or psql) against the project database.
+--
+-- `||` on jsonb replaces only the top-level keys present in the patch, so
+-- writing {"github": {...}} leaves every other platform untouched, and the
+-- merge happens inside one UPDATE instead of a client-side read-modify-write.
+--
+-- integration_handles ({"github": "<username>", ...}) records the account each
+-- platform was fetched for, so refresh_worker.py can fetch it again; it is kept
+-- out of `integrations`, which the client renders as is.
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS integration_handles jsonb;
+
+-- The earlier versions (without handles, and a bulk merge returning a count)
+DROP FUNCTION IF EXISTS merge_integrations(uuid, jsonb);
+DROP FUNCTION IF EXISTS merge_integrations_bulk(jsonb);
+
+-- Patch one user's integrations (and handles); returns the merged integrations
+-- (NULL if no such user)
+CREATE OR REPLACE FUNCTION merge_integrations(p_user_id uuid, p_patch jsonb, p_handles jsonb DEFAULT '{}'::jsonb)
+RETURNS jsonb
+LANGUAGE sql
+AS $$
+  UPDATE users
+  SET integrations = COALESCE(integrations, '{}'::jsonb) || p_patch,
+      integration_handles = COALESCE(integration_handles, '{}'::jsonb) || COALESCE(p_handles, '{}'::jsonb)
+  WHERE id = p_user_id
+  RETURNING integrations;
+$$;
+
+-- Patch many users at once:
+-- p_updates is [{"id": "<uuid>", "patch": {...}, "handles": {...}}, ...].
+-- Returns the ids of the users updated (ids without a user are left out).
+CREATE OR REPLACE FUNCTION merge_integrations_bulk(p_updates jsonb)
+RETURNS uuid[]
+LANGUAGE sql
+AS $$
+  WITH updates AS (
+    SELECT (u ->> 'id')::uuid AS id, u -> 'patch' AS patch, COALESCE(u -> 'handles', '{}'::jsonb) AS handles
+    FROM jsonb_array_elements(p_updates) AS u
+  ), merged AS (
+    UPDATE users
+    SET integrations = COALESCE(users.integrations, '{}'::jsonb) || updates.patch,
+        integration_handles = COALESCE(users.integration_handles, '{}'::jsonb) || updates.handles
+    FROM updates
+    WHERE users.id = updates.id
+    RETURNING users.id
+  )
+  SELECT COALESCE(array_agg(id), '{}') FROM merged;
+$$;
@@ -0,0 +1,63 @@
+import copy
+import os
+import sys
+
+import pytest
+
+RECOMMENDATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RECOMMENDATION_DIR)
+os.chdir(RECOMMENDATION_DIR)  # app.py loads data.json from the working directory
+
+import app
+from scoring import DEFAULT_WEIGHTS
+
+# app.ensemble_scoring on users whose skills and domains are not in the seed
+# vocabularies: they must score like any other user, without the shared
+# vocabularies changing.
+
+USERS = [
+    {"user_id": 1, "name": "Ada", "skills": ["Rust", "Zig"], "feedback": 0.5, "projects_completed": 12,
+     "completed_projects": [{"project_id": 3, "domain": "Embedded"}]},
+    {"user_id": 2, "name": "Bo", "skills": ["Zig"], "feedback": 4.0, "projects_completed": 2,
+     "completed_projects": [{"project_id": 4, "domain": "Web"}]},
+    {"user_id": 3, "name": "Cy", "skills": ["Rust"], "feedback": 5.0, "projects_completed": 30, "completed_projects": []},
+]
+
+
+@pytest.fixture(autouse=True)
+def fixed_weights(monkeypatch):
+    monkeypatch.setattr(app.ensemble_weights, "get", lambda: (None, None))
+
+
+def expected_score(content, popularity, collaborative):
+    return (DEFAULT_WEIGHTS["content_based"] * content + DEFAULT_WEIGHTS["popularity_score"] * popularity
+            + DEFAULT_WEIGHTS["pre_requisite_score"] + DEFAULT_WEIGHTS["collaborative_score"] * collaborative)
+
+
+def test_single_unknown_skill_user():
+    project = {"project_id": 9, "required_skills": ["Zig"], "preferred_skills": ["Rust", "Zig"], "domain": "Embedded"}
+    scored = app.ensemble_scoring(copy.deepcopy(USERS[:1]), project)
+    assert scored["user_id"].tolist() == [1]
+    row = scored.iloc[0]
+    assert row["skills"] == ["Rust", "Zig"]
+    assert row["content_based"] == 1.0
+    assert row["collaborative_score"] == 0.5  # A single user keeps the default
+    assert row["ensemble_score"] == pytest.approx(expected_score(1.0, 0.55, 0.5))
+
+
+def test_unknown_skills_and_domains():
+    skills, domains = list(app.skill_vocab), list(app.domain_vocab)
+    project = {"project_id": 9, "required_skills": ["Zig"], "preferred_skills": ["Rust", "Carbon"], "domain": "Embedded"}
+    scored = app.ensemble_scoring(copy.deepcopy(USERS), project).set_index("user_id")
+    assert sorted(scored.index) == [1, 2]
+    assert scored.loc[1, "content_based"] == 0.5
+    assert scored.loc[2, "content_based"] == 0.0
+    assert scored.loc[1, "collaborative_score"] == 0.8
+    assert scored.loc[2, "collaborative_score"] == 0.3
+    assert list(app.skill_vocab) == skills
+    assert list(app.domain_vocab) == domains
+
+
+def test_required_skill_nobody_has():
+    project = {"project_id": 9, "required_skills": ["Zig", "Carbon"], "preferred_skills": [], "domain": "Web"}
+    assert app.ensemble_scoring(copy.deepcopy(USERS), project).empty
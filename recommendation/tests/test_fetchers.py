@@ -0,0 +1,81 @@
+import os
+import sys
+import threading
+
+import pytest
+
+RECOMMENDATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RECOMMENDATION_DIR)
+sys.path.insert(0, os.path.join(RECOMMENDATION_DIR, "bench"))
+
+import stub_upstreams
+from extractors import EXTRACTORS, lxml_html
+from fetchers import GITHUB_ERROR, Fetcher
+
+# The async fetch layer (fetchers.py) against the local stub upstreams
+# (bench/stub_upstreams.py), once per HTML extractor backend.
+
+BACKENDS = [name for name in EXTRACTORS if name != "lxml" or lxml_html is not None]
+
+
+@pytest.fixture(scope="module")
+def base_urls():
+    server = stub_upstreams.serve(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield {platform: f"{base}/{platform}" for platform in ("github", "leetcode", "hackerrank")}
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="module", params=BACKENDS)
+def fetcher(request, base_urls):
+    fetcher = Fetcher(base_urls=base_urls, extractor=EXTRACTORS[request.param]())
+    yield fetcher
+    fetcher.close()
+
+
+def test_github(fetcher):
+    assert fetcher.fetch("github", "alice") == {
+        "username": "alice", "repositories": "15", "stars": "55", "followers": "35", "following": "5",
+    }
+
+
+def test_leetcode(fetcher):
+    assert fetcher.fetch("leetcode", "alice") == {
+        "username": "alice", "total_solved": "85/3300", "acceptance_rate": "61.5",
+        "ranking": "100005", "contribution_points": "25",
+    }
+
+
+def test_hackerrank(fetcher):
+    assert fetcher.fetch("hackerrank", "alice") == {"badges": 5}
+    assert fetcher.fetch("hackerrank", "alexis") == {"badges": "0"}  # No badge cards
+
+
+def test_fetch_all(fetcher):
+    results = fetcher.fetch_all({"github": "carol", "leetcode": "carol", "hackerrank": "carol", "linkedin": "carol"})
+    assert list(results) == ["github", "leetcode", "hackerrank", "linkedin"]
+    assert results["github"]["username"] == "carol"
+    assert results["leetcode"]["total_solved"] == "85/3300"
+    assert results["hackerrank"] == {"badges": 5}
+    assert results["linkedin"] == {"status": "LinkedIn scraping requires authentication"}
+
+
+def test_missing_user(fetcher):
+    assert fetcher.fetch("github", "missing-user") == GITHUB_ERROR
+    assert fetcher.fetch("leetcode", "missing-user") == {"error": "Failed to fetch LeetCode data"}
+    # The HackerRank 404 page is parsed like any other page
+    assert fetcher.fetch("hackerrank", "missing-user") == {"badges": "0"}
+
+
+def test_unreachable_upstream():
+    fetcher = Fetcher(base_urls={platform: "http://127.0.0.1:9" for platform in ("github", "leetcode", "hackerrank")},
+                      connect_timeout=1, read_timeout=1)
+    try:
+        assert fetcher.fetch("github", "alice") == GITHUB_ERROR
+        assert "error" in fetcher.fetch("leetcode", "alice")
+        assert "error" in fetcher.fetch("hackerrank", "alice")
+    finally:
+        fetcher.close()
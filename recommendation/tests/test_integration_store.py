@@ -0,0 +1,221 @@
+import os
+import sys
+
+import pytest
+
+RECOMMENDATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RECOMMENDATION_DIR)
+sys.path.insert(0, os.path.join(RECOMMENDATION_DIR, "bench"))
+
+from fake_supabase import FakeSupabase
+from integration_store import IntegrationWriteBuffer, merge_integrations, merge_integrations_bulk
+from refresh_worker import JobQueue, RefreshWorker, connected_jobs
+
+# The Supabase merge RPCs (integration_store.py) and the write buffer, against
+# the in-memory client of bench/fake_supabase.py.
+
+GITHUB = {"username": "alice", "repositories": "15"}
+LEETCODE = {"username": "alice", "total_solved": "85/3300"}
+
+
+class FailingClient:
+    # Every RPC raises, like Supabase being unreachable
+    def __init__(self):
+        self.calls = 0
+
+    def rpc(self, name, params):
+        self.calls += 1
+        raise ConnectionError("supabase unreachable")
+
+
+def test_merge_patches_only_given_platforms():
+    client = FakeSupabase([1])
+    merge_integrations(client, 1, {"github": GITHUB})
+    response = merge_integrations(client, 1, {"leetcode": LEETCODE})
+    assert response.data == {"github": GITHUB, "leetcode": LEETCODE}
+    response = merge_integrations(client, 1, {"github": {"username": "alice", "repositories": "16"}})
+    assert response.data == {"github": {"username": "alice", "repositories": "16"}, "leetcode": LEETCODE}
+    assert client.round_trips == 3
+
+
+def test_merge_handles():
+    client = FakeSupabase([1])
+    response = merge_integrations(client, 1, {"github": GITHUB}, {"github": "alice"})
+    assert response.data == {"github": GITHUB}  # Handles stay out of the platform payloads
+    merge_integrations(client, 1, {"leetcode": LEETCODE}, {"leetcode": "alice-lc"})
+    merge_integrations(client, 1, {"github": GITHUB})
+    assert client.users[1]["integration_handles"] == {"github": "alice", "leetcode": "alice-lc"}
+
+
+def test_merge_unknown_user():
+    client = FakeSupabase([1])
+    assert merge_integrations(client, 2, {"github": GITHUB}).data is None
+    assert client.users == {1: {"integrations": None, "integration_handles": None}}
+
+
+def test_merge_bulk():
+    client = FakeSupabase([1, 2])
+    response = merge_integrations_bulk(client, {1: {"github": GITHUB}, 2: {"leetcode": LEETCODE}, 3: {"github": GITHUB}},
+                                       {1: {"github": "alice"}})
+    assert response.data == [1, 2]  # User 3 does not exist
+    assert client.users[1]["integration_handles"] == {"github": "alice"}
+    assert client.users[2]["integration_handles"] == {}
+    assert client.users[1]["integrations"] == {"github": GITHUB}
+    assert client.users[2]["integrations"] == {"leetcode": LEETCODE}
+    assert client.round_trips == 1
+
+
+def test_buffer_coalesces_writes():
+    client = FakeSupabase([1, 2])
+    buffer = IntegrationWriteBuffer(client, flush_interval=0)
+    buffer.add(1, "github", {"repositories": "1"})
+    buffer.add(1, "leetcode", LEETCODE)
+    buffer.add(1, "github", GITHUB)  # Replaces the earlier github write
+    buffer.add(2, "github", GITHUB)
+    assert len(buffer) == 2
+    assert client.round_trips == 0
+    assert buffer.flush() == 2
+    assert client.round_trips == 1
+    assert client.users[1]["integrations"] == {"github": GITHUB, "leetcode": LEETCODE}
+    assert buffer.counters == {
+        "writes": 4, "flushes": 1, "users_written": 2, "users_missing": 0, "flush_errors": 0, "dropped": 0,
+    }
+    assert buffer.flush() == 0  # Nothing pending, no round trip
+    assert client.round_trips == 1
+
+
+def test_buffer_flushes_when_full():
+    client = FakeSupabase([1, 2, 3])
+    buffer = IntegrationWriteBuffer(client, max_users=2, flush_interval=0)
+    buffer.add(1, "github", GITHUB)
+    assert client.round_trips == 0
+    buffer.add(2, "github", GITHUB)
+    assert client.round_trips == 1
+    assert len(buffer) == 0
+
+
+def test_buffer_done_after_flush():
+    client = FakeSupabase([1])
+    buffer = IntegrationWriteBuffer(client, flush_interval=0)
+    errors = []
+    buffer.add(1, "github", GITHUB, done=errors.append)
+    buffer.add(1, "leetcode", LEETCODE, done=errors.append)
+    assert errors == []
+    buffer.flush()
+    assert errors == [None, None]
+
+
+def pending(buffer):
+    return {user_id: {platform: (write.data, write.attempts) for platform, write in writes.items()}
+            for user_id, writes in buffer._pending.items()}
+
+
+def test_buffer_retries_then_drops():
+    client = FailingClient()
+    buffer = IntegrationWriteBuffer(client, flush_interval=0, max_retries=1)
+    errors = []
+    buffer.add(1, "github", GITHUB, done=errors.append)
+    buffer.flush()
+    assert errors == []  # Put back for the next flush
+    assert pending(buffer) == {1: {"github": (GITHUB, 1)}}
+    buffer.flush()
+    assert len(errors) == 1 and isinstance(errors[0], ConnectionError)
+    assert len(buffer) == 0
+    assert buffer.counters["flush_errors"] == 2
+    assert buffer.counters["dropped"] == 1
+    assert client.calls == 2
+
+
+def test_buffer_retries_are_per_write():
+    buffer = IntegrationWriteBuffer(FailingClient(), flush_interval=0, max_retries=1)
+    errors = []
+    buffer.add(1, "github", GITHUB, done=errors.append)
+    buffer.flush()
+    buffer.add(1, "leetcode", LEETCODE, done=errors.append)
+    buffer.flush()
+    # Only the write that failed twice is dropped
+    assert len(errors) == 1
+    assert pending(buffer) == {1: {"leetcode": (LEETCODE, 1)}}
+    assert buffer.counters["dropped"] == 1
+
+
+def test_buffer_newer_write_replaces_failed_one():
+    buffer = IntegrationWriteBuffer(FailingClient(), flush_interval=0, max_retries=1)
+    errors = []
+    buffer.add(1, "github", {"repositories": "1"}, done=errors.append)
+    buffer.flush()
+    buffer.add(1, "github", GITHUB, done=errors.append)
+    buffer.flush()
+    assert errors == []
+    assert pending(buffer) == {1: {"github": (GITHUB, 1)}}
+    buffer.client = client = FakeSupabase([1])
+    assert buffer.flush() == 1
+    assert errors == [None, None]
+    assert client.users[1]["integrations"] == {"github": GITHUB}
+
+
+def test_buffer_unknown_users():
+    client = FakeSupabase([1])
+    buffer = IntegrationWriteBuffer(client, flush_interval=0)
+    done = {}
+    buffer.add(1, "github", GITHUB, done=lambda error: done.setdefault(1, error))
+    buffer.add(2, "github", GITHUB, done=lambda error: done.setdefault(2, error))
+    assert buffer.flush() == 1
+    assert done[1] is None
+    assert isinstance(done[2], LookupError)
+    assert buffer.counters["users_written"] == 1
+    assert buffer.counters["users_missing"] == 1
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+def test_refresh_worker_completes_jobs_after_flush(queue):
+    client = FakeSupabase(["1"])
+    buffer = IntegrationWriteBuffer(client, flush_interval=0)
+    worker = RefreshWorker(queue, fetch=lambda platform, name: {"username": name}, rates={"github": 1000.0},
+                           buffer=buffer)
+    queue.enqueue([("1", "github", "alice"), ("1", "leetcode", "alice")])
+    for _ in range(2):
+        assert worker.process(queue.claim())
+    assert queue.counts() == {"github": {"running": 1}, "leetcode": {"running": 1}}
+    buffer.flush()
+    assert queue.counts() == {"github": {"done": 1}, "leetcode": {"done": 1}}
+    assert worker.counters == {"done": 2, "retried": 0, "failed": 0}
+    assert client.users["1"]["integrations"] == {
+        "github": {"username": "alice"},
+        "leetcode": {"username": "alice"},
+    }
+    assert client.users["1"]["integration_handles"] == {"github": "alice", "leetcode": "alice"}
+
+
+def test_refresh_worker_requeues_dropped_writes(queue):
+    buffer = IntegrationWriteBuffer(FailingClient(), flush_interval=0, max_retries=0)
+    worker = RefreshWorker(queue, fetch=lambda platform, name: {"username": name}, rates={"github": 1000.0},
+                           buffer=buffer)
+    queue.enqueue([("1", "github", "alice")])
+    worker.process(queue.claim())
+    buffer.flush()
+    assert queue.counts() == {"github": {"queued": 1}}
+    assert worker.counters == {"done": 0, "retried": 1, "failed": 0}
+
+
+def test_connected_jobs():
+    stored = {"github": {"username": "alice"}, "hackerrank": {"badges": 2}, "linkedin": {"status": "..."}}
+    assert list(connected_jobs("1", stored, {"hackerrank": "alice-hr"})) == [
+        ("1", "github", "alice"), ("1", "hackerrank", "alice-hr"), ("1", "linkedin", "alice"),
+    ]
+
+
+def test_refresh_worker_fails_jobs_of_unknown_users(queue):
+    buffer = IntegrationWriteBuffer(FakeSupabase(["1"]), flush_interval=0)
+    worker = RefreshWorker(queue, fetch=lambda platform, name: {"username": name}, rates={"github": 1000.0},
+                           buffer=buffer)
+    queue.enqueue([("1", "leetcode", "alice"), ("2", "leetcode", "bob")])
+    for _ in range(2):
+        worker.process(queue.claim())
+    buffer.flush()
+    assert queue.counts() == {"leetcode": {"done": 1, "queued": 1}}
+    assert worker.counters == {"done": 1, "retried": 1, "failed": 0}
@@ -0,0 +1,29 @@
+import os
+import sys
+
+RECOMMENDATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RECOMMENDATION_DIR)
+
+from result_cache import ResultCache, project_key
+
+PROJECT = {"project_id": 1, "required_skills": ["Python"], "preferred_skills": ["AWS", "Docker"], "domain": "Web"}
+
+
+def test_project_key_is_canonical():
+    shuffled = {"project_id": 2, "required_skills": ["Python", "Python"], "preferred_skills": ["Docker", "AWS"],
+                "domain": "Web", "project_name": "Other"}
+    assert project_key(PROJECT, 1, None) == project_key(shuffled, 1, None)
+    assert project_key(PROJECT, 1, None) != project_key(PROJECT, 2, None)
+
+
+def test_results_are_per_version():
+    cache = ResultCache()
+    old, new = project_key(PROJECT, 1, None), project_key(PROJECT, 2, None)
+    cache.set(new, "[new]")
+    # A request still scoring the old pool finishes after the swap
+    cache.set(old, "[old]")
+    assert cache.get(new) == "[new]"
+    assert cache.get(old) == "[old]"
+    assert cache.get(project_key(PROJECT, 3, None)) is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,87 @@
+import argparse
+import copy
+import importlib
+import json
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from xgboost import XGBRegressor
+
+from collab_engine import PearsonEngine
+from ranker import MODEL_DIR, save_model
+
+# Feature columns each recommendation pipeline feeds to its ranker
+PIPELINES = {
+    "oldapp": ["content_based", "popularity_score", "collaborative_score", "pre_requisite_score"],
+    "sample2": ["content_based", "popularity_score", "collaborative_score"],
+}
+
+
+def historical_projects(users):
+    # Rebuild past projects from users' completed_projects: the most common skills
+    # among the people who completed a project stand in for its requirements
+    completers = {}
+    for user in users:
+        for project in user.get("completed_projects", []):
+            entry = completers.setdefault(project["project_id"], {"domain": project["domain"], "skills": Counter()})
+            entry["skills"].update(user["skills"])
+    projects = []
+    for project_id, entry in sorted(completers.items()):
+        common = [skill for skill, _ in entry["skills"].most_common(3)]
+        projects.append({
+            "project_id": project_id,
+            "required_skills": common[:1],
+            "preferred_skills": common[1:],
+            "domain": entry["domain"],
+        })
+    return projects
+
+
+def build_training_set(pipeline, users, projects):
+    frames = []
+    for project in projects:
+        frame = pipeline.ensemble_scoring(copy.deepcopy(users), project)
+        if len(frame) > 0:
+            frames.append(frame.assign(project_id=project["project_id"]))
+    return pd.concat(frames, ignore_index=True)
+
+
+def train(data, features):
+    X = data[features]
+    y = data["ensemble_score"]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model = XGBRegressor(objective="reg:squarederror", n_estimators=50, learning_rate=0.1, max_depth=4)
+    model.fit(X_train, y_train)
+    rmse = float(np.sqrt(np.mean((model.predict(X_test) - y_test) ** 2)))
+    return model, rmse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and save a versioned XGBoost ranker")
+    parser.add_argument("--pipeline", choices=sorted(PIPELINES), default="oldapp")
+    parser.add_argument("--data", default="data.json", help="Historical user data")
+    parser.add_argument("--projects", help="JSON list of historical projects (default: rebuilt from --data)")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    with open(args.data, "r") as file:
+        users = json.load(file)
+    if args.projects:
+        with open(args.projects, "r") as file:
+            projects = json.load(file)
+    else:
+        projects = historical_projects(users)
+
+    pipeline = importlib.import_module(args.pipeline)
+    pipeline.collab_engine = PearsonEngine(users)  # Similarities for the training data, not the serving pool
+    data = build_training_set(pipeline, users, projects)
+    model, rmse = train(data, PIPELINES[args.pipeline])
+    path = save_model(model, args.model_dir, f"ranker-{args.pipeline}")
+    print(f"Trained on {len(data)} rows from {len(projects)} projects, test RMSE {rmse:.4f}")
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
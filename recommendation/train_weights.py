@@ -0,0 +1,187 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GroupKFold
+
+from interaction_log import INTERACTIONS_DIR, interaction_labels, read_interactions
+from ranker import MODEL_DIR, save_weights
+from scoring import DEFAULT_WEIGHTS, ENSEMBLE_FEATURES, score_rows
+from snapshot import load_columns
+from user_store import UserStore
+
+# Learns the ensemble weights from the interaction log (POST /interactions):
+#   1. Every logged (project, user) pair becomes one row of a sparse matrix of
+#      the ENSEMBLE_FEATURES scores, recomputed against the current pool, with
+#      the highest event grade as its label.
+#   2. A pairwise logistic ranker is fit on x_i - x_j for pairs within a
+#      project where i is labelled higher than j. The regularization strength
+#      is picked by GroupKFold cross-validation over projects (so no project is
+#      in both train and test), with the (C, fold) fits run in a process pool.
+#   3. The weights are written as "<name>-<version>.json" next to the XGBoost
+#      rankers; app.py reloads them and scores every candidate with one dot
+#      product (scoring.ensemble_scores). Nothing is exported unless they beat
+#      the fixed weights on held-out projects (override with --force).
+
+
+def build_training_set(store, projects):
+    # (features, labels, groups) of the logged users still in the pool. Projects
+    # whose users all share one label carry no ranking signal and are left out.
+    rows_of = {user_id: row for row, user_id in enumerate(np.asarray(store.columns["user_id"]).tolist())}
+    blocks, labels, groups = [], [], []
+    for group, entry in enumerate(projects.values()):
+        pairs = [(rows_of[user_id], grade) for user_id, grade in entry["labels"].items() if user_id in rows_of]
+        if len({grade for _, grade in pairs}) < 2:
+            continue
+        rows = np.array([row for row, _ in pairs], dtype=np.int64)
+        scores = score_rows(store, rows, entry["project"])
+        blocks.append(csr_matrix(np.column_stack([scores[feature] for feature in ENSEMBLE_FEATURES])))
+        labels.append(np.array([grade for _, grade in pairs]))
+        groups.append(np.full(len(rows), group))
+    if not blocks:
+        return csr_matrix((0, len(ENSEMBLE_FEATURES))), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return vstack(blocks, format="csr"), np.concatenate(labels), np.concatenate(groups)
+
+
+def split_groups(groups):
+    # Positions of each group's rows
+    order = np.argsort(groups, kind="stable")
+    bounds = np.flatnonzero(np.diff(groups[order])) + 1
+    return np.split(order, bounds)
+
+
+def pairwise(X, labels, groups, max_pairs, seed=0):
+    # Differences x_i - x_j for pairs within a project where i is labelled
+    # higher than j, at most max_pairs per project. Every other pair is
+    # flipped (target 0) so the classifier sees both classes.
+    rng = np.random.default_rng(seed)
+    first, second = [], []
+    for members in split_groups(groups):
+        i, j = np.meshgrid(members, members, indexing="ij")
+        better = labels[i] > labels[j]
+        i, j = i[better], j[better]
+        if len(i) > max_pairs:
+            pick = rng.choice(len(i), max_pairs, replace=False)
+            i, j = i[pick], j[pick]
+        first.append(i)
+        second.append(j)
+    first = np.concatenate(first) if first else np.empty(0, dtype=np.int64)
+    second = np.concatenate(second) if second else np.empty(0, dtype=np.int64)
+    flip = np.arange(len(first)) % 2 == 1
+    first, second = np.where(flip, second, first), np.where(flip, first, second)
+    return X[first] - X[second], (~flip).astype(np.int64)
+
+
+def fit(X, labels, groups, C, max_pairs):
+    # Weight vector in ENSEMBLE_FEATURES order, or None without enough pairs
+    differences, target = pairwise(X, labels, groups, max_pairs)
+    if len(target) < 2:
+        return None
+    model = LogisticRegression(C=C, fit_intercept=False, solver="liblinear")
+    model.fit(differences, target)
+    return model.coef_.ravel()
+
+
+def ndcg(labels, scores, groups, k):
+    # Mean NDCG@k over the projects (gain 2^label - 1)
+    discounts = 1 / np.log2(np.arange(2, k + 2))
+    values = []
+    for members in split_groups(groups):
+        gains = 2.0 ** labels[members] - 1
+        ranked = gains[np.argsort(-scores[members], kind="stable")][:k]
+        ideal = np.sort(gains)[::-1][:k]
+        if ideal.sum() > 0:
+            values.append((ranked * discounts[:len(ranked)]).sum() / (ideal * discounts[:len(ideal)]).sum())
+    return float(np.mean(values)) if values else 0.0
+
+
+_training = None
+
+
+def _init_worker(X, labels, groups):
+    # The training set is sent once per worker instead of with every task
+    global _training
+    _training = (X, labels, groups)
+
+
+def evaluate(task):
+    C, train, test, max_pairs, k = task
+    X, labels, groups = _training
+    weights = fit(X[train], labels[train], groups[train], C, max_pairs)
+    if weights is None:
+        return C, None
+    return C, ndcg(labels[test], X[test] @ weights, groups[test], k)
+
+
+def export_weights(weights):
+    # Only the relative weights matter for the ranking. pre_requisite_score is
+    # 1 for every candidate, so it keeps its fixed weight, and the others are
+    # rescaled to the fixed weights' L1 norm to keep scores on the same scale.
+    learned = {feature: float(weight) for feature, weight in zip(ENSEMBLE_FEATURES, weights)}
+    constant = "pre_requisite_score"
+    norm = sum(abs(weight) for feature, weight in learned.items() if feature != constant)
+    if norm == 0:
+        raise ValueError("Learned weights are all zero")
+    target = sum(abs(weight) for feature, weight in DEFAULT_WEIGHTS.items() if feature != constant)
+    exported = {feature: weight * target / norm for feature, weight in learned.items()}
+    exported[constant] = DEFAULT_WEIGHTS[constant]
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn the ensemble weights from logged interactions")
+    parser.add_argument("--interactions", default=INTERACTIONS_DIR, help="Directory of interaction logs")
+    parser.add_argument("--data", default="data.json", help="User pool the features are computed against")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--name", default="ensemble-weights")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--C", type=float, nargs="+", default=[0.01, 0.1, 1.0, 10.0], help="Regularization strengths to try")
+    parser.add_argument("--max-pairs", type=int, default=1000, help="Sampled pairs per project")
+    parser.add_argument("--k", type=int, default=10, help="NDCG cutoff")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="Export even if the fixed weights do better")
+    args = parser.parse_args()
+
+    projects = interaction_labels(read_interactions(args.interactions))
+    store = UserStore(load_columns(args.data))
+    X, labels, groups = build_training_set(store, projects)
+    n_projects = len(np.unique(groups))
+    print(f"{X.shape[0]} labelled users from {n_projects} of {len(projects)} logged projects")
+    if n_projects < 2:
+        raise SystemExit("Need interactions on at least 2 projects with more than one label")
+
+    folds = list(GroupKFold(n_splits=min(args.folds, n_projects)).split(X, labels, groups))
+    tasks = [(C, train, test, args.max_pairs, args.k) for C in args.C for train, test in folds]
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(X, labels, groups)) as executor:
+        results = list(executor.map(evaluate, tasks))
+
+    fixed = np.array([DEFAULT_WEIGHTS[feature] for feature in ENSEMBLE_FEATURES])
+    baseline = float(np.mean([ndcg(labels[test], X[test] @ fixed, groups[test], args.k) for _, test in folds]))
+    print(f"fixed weights       NDCG@{args.k} {baseline:.4f}")
+    cv = {}
+    for C, score in results:
+        if score is not None:
+            cv.setdefault(C, []).append(score)
+    for C, scores in cv.items():
+        print(f"C={C:<8g}          NDCG@{args.k} {np.mean(scores):.4f} +/- {np.std(scores):.4f} ({len(scores)} folds)")
+    if not cv:
+        raise SystemExit("No fold had enough pairs to fit")
+    best = max(cv, key=lambda C: np.mean(cv[C]))
+    best_score = float(np.mean(cv[best]))
+    if best_score <= baseline and not args.force:
+        raise SystemExit(f"Learned weights do not beat the fixed weights ({best_score:.4f} <= {baseline:.4f}), nothing exported")
+
+    weights = export_weights(fit(X, labels, groups, best, args.max_pairs))
+    path = save_weights(
+        weights, args.model_dir, args.name,
+        C=best, cv_ndcg=best_score, baseline_ndcg=baseline, k=args.k, projects=n_projects, rows=X.shape[0],
+    )
+    print("Weights: " + ", ".join(f"{feature}={weight:.4f}" for feature, weight in weights.items()))
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe LRU map whose entries also carry the time they were stored.
+    Expiry is left to the caller: get returns the value together with its age,
+    so a caller can serve a slightly stale value while it refreshes it.
+
+    Parameters:
+        max_size (int): Entries kept before the least recently used is evicted.
+        max_age (float): Entries older than this are dropped on lookup.
+    """
+
+    def __init__(self, max_size=10000, max_age=None, clock=time.monotonic):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.clock = clock
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # (value, age in seconds), or (None, None) when missing or past max_age
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            value, stored_at = entry
+            age = self.clock() - stored_at
+            if self.max_age is not None and age >= self.max_age:
+                del self._entries[key]
+                return None, None
+            self._entries.move_to_end(key)
+            return value, age
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
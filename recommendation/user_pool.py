@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+from ann_index import SkillEmbeddingIndex
+from snapshot import append_columns, build_columns, compact_columns
+from user_store import UserStore
+
+# Live user pool for app.py. Readers take `pool.current` once per request and
+# use that (store, ann) pair throughout; writers build a new pair next to it and
+# swap the reference, so a request never sees a half-applied update.
+#
+# Updates never rebuild from scratch: upserted users are appended as new rows
+# (their previous row, if any, is tombstoned), deletes only tombstone. Once
+# COMPACT_RATIO of the rows are tombstones the pool is compacted down to the
+# live rows, and the ANN index re-hashes once ANN_REBUILD_RATIO of its rows
+# were appended after it was built.
+#
+# The ANN index only serves /recommend?retrieve=N, so by default
+# (USER_POOL_ANN=lazy) it is built by the first such request and only kept up
+# to date from then on; "eager" builds it at startup, "off" never.
+
+ANN_MODES = ("eager", "lazy", "off")
+ANN_MODE = os.environ.get("USER_POOL_ANN", "lazy")
+COMPACT_RATIO = float(os.environ.get("USER_POOL_COMPACT_RATIO", "0.25"))
+ANN_REBUILD_RATIO = float(os.environ.get("USER_POOL_ANN_REBUILD_RATIO", "0.05"))
+ANN_REBUILD_MIN = 1000
+
+PoolState = namedtuple("PoolState", ["store", "ann"])
+
+
+# Field -> accepted types of an upserted user; user_id and name are required,
+# the rest default like data.json entries without them
+USER_FIELDS = {
+    "user_id": (int,),
+    "name": (str,),
+    "skills": (list,),
+    "feedback": (int, float),
+    "projects_completed": (int,),
+    "completed_projects": (list,),
+}
+REQUIRED_FIELDS = ("user_id", "name")
+
+
+def validate_user(user):
+    # Raises ValueError for a user build_columns would reject or silently
+    # default, before anything in the pool is touched
+    if not isinstance(user, dict):
+        raise ValueError("Every user must be an object")
+    for field in REQUIRED_FIELDS:
+        if field not in user:
+            raise ValueError(f"Every user needs a {field}")
+    for field, types in USER_FIELDS.items():
+        value = user.get(field)
+        if field in user and (isinstance(value, bool) or not isinstance(value, types)):
+            raise ValueError(f"User {user['user_id']!r}: {field} must be {' or '.join(t.__name__ for t in types)}")
+    if not all(isinstance(skill, str) for skill in user.get("skills", [])):
+        raise ValueError(f"User {user['user_id']!r}: skills must be strings")
+    for project in user.get("completed_projects", []):
+        project_id = project.get("project_id") if isinstance(project, dict) else None
+        if isinstance(project_id, bool) or not isinstance(project_id, int):
+            raise ValueError(f"User {user['user_id']!r}: completed_projects need an integer project_id")
+        if not isinstance(project.get("domain", ""), (str, type(None))):
+            raise ValueError(f"User {user['user_id']!r}: project domain must be a string")
+
+
+def user_hash(user):
+    return hashlib.sha1(json.dumps(user, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class UserPool:
+    def __init__(self, store, ann=ANN_MODE):
+        # ann: one of ANN_MODES (True/None for "eager"/"off") or a built index
+        if ann is True:
+            ann = "eager"
+        elif ann is None:
+            ann = "off"
+        if isinstance(ann, str) and ann not in ANN_MODES:
+            raise ValueError(f"Unknown ANN mode {ann!r}, expected one of {', '.join(ANN_MODES)}")
+        self.lazy_ann = ann == "lazy"
+        if ann == "eager":
+            ann = SkillEmbeddingIndex(store)
+        self.current = PoolState(store, None if isinstance(ann, str) else ann)
+        self.rows = {
+            user_id: row for row, user_id in enumerate(np.asarray(store.columns["user_id"]).tolist())
+            if store.alive is None or store.alive[row]
+        }
+        self.counters = {"upserts": 0, "deletes": 0, "compactions": 0, "ann_rebuilds": 0}
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._watch_args = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def state(self, ann=False):
+        # The current (store, ann) pair; with ann=True a lazy index is built
+        # for that store first (and published with it)
+        current = self.current
+        if ann and self.lazy_ann and current.ann is None:
+            with self._lock:
+                current = self.current
+                if current.ann is None:
+                    current = self.current = PoolState(current.store, SkillEmbeddingIndex(current.store))
+        return current
+
+    def _swap(self, columns, rows, ann):
+        # Build the new store (and index) off to the side, then publish both at once
+        store = UserStore(columns)
+        store.inherit(self.current.store)  # Memoized per-domain scores, extended to new rows
+        if store.n_dead > 0 and store.n_dead >= COMPACT_RATIO * store.n_users:
+            store = UserStore(compact_columns(columns, np.flatnonzero(store.alive)))
+            rows = {user_id: row for row, user_id in enumerate(np.asarray(store.columns["user_id"]).tolist())}
+            ann = ann.rebuild(store) if ann is not None else None
+            self.counters["compactions"] += 1
+        elif ann is not None:
+            ann = ann.extend(store)
+            if store.n_users - ann.n_indexed >= max(ANN_REBUILD_MIN, ANN_REBUILD_RATIO * store.n_users):
+                ann = ann.rebuild(store)
+                self.counters["ann_rebuilds"] += 1
+        self.rows = rows
+        self.current = PoolState(store, ann)
+
+    def _tombstones(self, store, user_ids, rows):
+        # Copy-on-write tombstone mask with the rows of `user_ids` cleared (and
+        # removed from `rows`)
+        alive = np.ones(store.n_users, dtype=bool) if store.alive is None else np.array(store.alive)
+        for user_id in user_ids:
+            row = rows.pop(user_id, None)
+            if row is not None:
+                alive[row] = False
+        return alive
+
+    def upsert(self, users):
+        # Insert new users or replace existing ones (matched on user_id)
+        latest = {}
+        for user in users:
+            validate_user(user)
+            latest[user["user_id"]] = user
+        if not latest:
+            return 0
+        with self._lock:
+            store, ann = self.current
+            rows = dict(self.rows)
+            delta = build_columns(list(latest.values()), store.skill_vocab, store.domain_vocab)
+            columns = append_columns(store.columns, delta)
+            columns["alive"][:store.n_users] = self._tombstones(store, latest, rows)
+            for i, user_id in enumerate(latest):
+                rows[user_id] = store.n_users + i
+            self._swap(columns, rows, ann)
+            self.counters["upserts"] += len(latest)
+        return len(latest)
+
+    def delete(self, user_ids):
+        with self._lock:
+            store, ann = self.current
+            rows = dict(self.rows)
+            present = [user_id for user_id in user_ids if user_id in rows]
+            if not present:
+                return 0
+            columns = dict(store.columns)
+            columns["alive"] = self._tombstones(store, present, rows)
+            self._swap(columns, rows, ann)
+            self.counters["deletes"] += len(present)
+        return len(present)
+
+    def apply_file(self, path, hashes):
+        # Diff a users JSON file against the per-user hashes of the last version
+        # applied and turn it into one upsert + one delete
+        with open(path, "r") as file:
+            users = json.load(file)
+        latest = {user["user_id"]: user for user in users}
+        new_hashes = {user_id: user_hash(user) for user_id, user in latest.items()}
+        changed = [latest[user_id] for user_id, digest in new_hashes.items() if hashes.get(user_id) != digest]
+        removed = [user_id for user_id in hashes if user_id not in new_hashes]
+        self.upsert(changed)
+        self.delete(removed)
+        return new_hashes, len(changed), len(removed)
+
+    def watch(self, path, interval=2.0):
+        # Poll `path` and apply whatever changed since the pool was loaded from it
+        if self._watcher is not None:
+            return self._watcher
+        if self._watch_args is None:
+            # Threads do not survive fork(): a pool preloaded in a gunicorn master
+            # restarts its watcher in every worker
+            os.register_at_fork(after_in_child=self._restart_watcher)
+        self._watch_args = (path, interval)
+        with open(path, "r") as file:
+            hashes = {user["user_id"]: user_hash(user) for user in json.load(file)}
+        stop = threading.Event()
+
+        def run():
+            nonlocal hashes
+            last = os.stat(path)
+            while not stop.wait(interval):
+                try:
+                    stat = os.stat(path)
+                    if (stat.st_mtime, stat.st_size) == (last.st_mtime, last.st_size):
+                        continue
+                    last = stat
+                    hashes, changed, removed = self.apply_file(path, hashes)
+                    print(f"Applied {path}: {changed} users upserted, {removed} deleted")
+                except Exception as e:
+                    # Half-written file etc.: try again on the next change
+                    print(f"Error applying {path}: {str(e)}")
+
+        self._watcher = threading.Thread(target=run, name="user-pool-watch", daemon=True)
+        self._watcher.stop = stop
+        self._watcher.start()
+        return self._watcher
+
+    def _restart_watcher(self):
+        self._lock = threading.Lock()
+        if self._watcher is not None:
+            self._watcher = None
+            self.watch(*self._watch_args)
+
+    def stats(self):
+        store, ann = self.current
+        return dict(self.counters, users=len(self.rows), rows=store.n_users, tombstones=store.n_dead,
+                    version=store.version, unhashed=0 if ann is None else store.n_users - ann.n_indexed)
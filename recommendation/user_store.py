@@ -0,0 +1,178 @@
+import itertools
+import json
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from bitset import has_all, pack_ids
+from snapshot import build_columns
+from vocab import Vocabulary
+
+
+# Columnar copy of the user pool, built once at load time (or memory-mapped from
+# a snapshot, see snapshot.py) so per-request scoring is a handful of
+# matrix/vector ops instead of per-row pandas lambdas.
+#   skills      - sparse user x skill CSR indicator matrix
+#   skill_index - skill -> sorted user rows (inverted index)
+#   skill_bits  - packed uint64 user x skill bitsets (bitset.py)
+#   domains     - dense user x domain indicators (has a completed project in domain)
+#   feedback / projects_completed - NumPy columns
+#   popularity  - per-user popularity score, precomputed with the columns
+#   collaborative(domain) - per-user collaborative score for a domain, memoized
+#   alive       - optional tombstone mask; rows of deleted/replaced users are False
+# Every store gets a new `version`, so anything derived from a store (cached
+# results) can tell when the pool it was computed from has been replaced.
+_versions = itertools.count(1)
+
+
+class UserStore:
+    def __init__(self, columns):
+        self.version = next(_versions)
+        self.columns = columns
+        self.n_users = len(columns["user_id"])
+        self.skill_vocab = Vocabulary(columns["skill_vocab"])
+        self.domain_vocab = Vocabulary(columns["domain_vocab"])
+        self.skill_names = self.skill_vocab.names
+        self.domain_names = self.domain_vocab.names
+
+        self.skills = csr_matrix(
+            (columns["skill_set_data"], columns["skill_set_ids"], columns["skill_set_indptr"]),
+            shape=(self.n_users, len(self.skill_names)), copy=False,
+        )
+        posting_indptr = columns["posting_indptr"]
+        posting_rows = columns["posting_rows"]
+        self.skill_index = {
+            skill: posting_rows[posting_indptr[i]:posting_indptr[i + 1]]
+            for i, skill in enumerate(self.skill_names)
+        }
+        self.skill_bits = columns["skill_bits"]
+        self.domains = columns["domains"]
+        self.feedback = columns["feedback"]
+        self.projects_completed = columns["projects_completed"]
+        self.popularity = columns["popularity"]
+        self._collaborative = {}
+        self.alive = columns.get("alive")
+        self.n_dead = 0 if self.alive is None else int(self.n_users - np.count_nonzero(self.alive))
+
+    @classmethod
+    def from_users(cls, users):
+        return cls(build_columns(users))
+
+    def __len__(self):
+        return self.n_users
+
+    def _collaborative_rows(self, domain, start=0):
+        # 0.8 for users with a completed project in `domain`, 0.3 otherwise
+        column = self.domain_vocab.get(domain)
+        if column is None:
+            return np.full(self.n_users - start, 0.3)
+        return np.where(self.domains[start:, column], 0.8, 0.3)
+
+    def collaborative(self, domain):
+        # Computed once per domain and kept for the lifetime of the store
+        scores = self._collaborative.get(domain)
+        if scores is None:
+            scores = self._collaborative[domain] = self._collaborative_rows(domain)
+        return scores
+
+    def inherit(self, previous):
+        # Carry memoized per-domain scores over from `previous`, whose rows are
+        # the first rows of this store; only the appended rows are computed
+        for domain, scores in list(previous._collaborative.items()):
+            tail = self._collaborative_rows(domain, previous.n_users)
+            self._collaborative[domain] = np.concatenate([scores, tail])
+
+    def live(self, rows):
+        # `rows` without tombstoned ones
+        if self.n_dead == 0:
+            return rows
+        return rows[self.alive[rows]]
+
+    def skill_vector(self, skills):
+        # Indicator vector over the skill vocabulary; unknown skills are dropped
+        vector = np.zeros(len(self.skill_vocab))
+        for skill in set(skills):
+            column = self.skill_vocab.get(skill)
+            if column is not None:
+                vector[column] = 1.0
+        return vector
+
+    def skill_mask(self, skills):
+        # Bitset row for `skills`, or None if one of them is not in the vocabulary
+        ids = []
+        for skill in set(skills):
+            i = self.skill_vocab.get(skill)
+            if i is None:
+                return None
+            ids.append(i)
+        return pack_ids(ids, len(self.skill_vocab))
+
+    def has_skills(self, rows, skills):
+        # Boolean mask of the rows that hold every skill in `skills`
+        required = self.skill_mask(skills)
+        if required is None:
+            return np.zeros(len(rows), dtype=bool)
+        return has_all(self.skill_bits, required, rows)
+
+    def match_required(self, skills):
+        # Rows holding every required skill: start from the rarest skill's posting
+        # list and check the rest against the bitsets of just those rows
+        required = set(skills)
+        if not required:
+            return self.live(np.arange(self.n_users))
+        if any(skill not in self.skill_vocab for skill in required):
+            return np.empty(0, dtype=np.int64)
+        rows = np.asarray(min((self.skill_index[skill] for skill in required), key=len), dtype=np.int64)
+        if len(required) > 1 and len(rows) > 0:
+            rows = rows[self.has_skills(rows, required)]
+        return self.live(rows)
+
+    def skill_matrix(self, skill_lists):
+        # Skill x len(skill_lists) CSR matrix whose columns are indicator vectors
+        rows = []
+        cols = []
+        for col, skills in enumerate(skill_lists):
+            for skill in set(skills):
+                row = self.skill_vocab.get(skill)
+                if row is not None:
+                    rows.append(row)
+                    cols.append(col)
+        return csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(self.skill_vocab), len(skill_lists))
+        )
+
+    def _gather(self, indptr, values, rows):
+        # Concatenated values[indptr[row]:indptr[row + 1]] for all rows, plus per-row offsets
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = np.asarray(indptr[rows], dtype=np.int64)
+        lengths = np.asarray(indptr[rows + 1], dtype=np.int64) - starts
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        flat = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return np.asarray(values)[flat], offsets.tolist()
+
+    def _strings(self, rows, offsets, blob):
+        data, bounds = self._gather(offsets, blob, rows)
+        data = data.tobytes()
+        return [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+    def column(self, rows, field, default=None):
+        # Decode one output field for the given rows from the columnar data
+        c = self.columns
+        if field in ("user_id", "feedback", "projects_completed"):
+            return c[field][rows].tolist()
+        if field == "name":
+            return self._strings(rows, c["name_offsets"], c["names"])
+        if field == "skills":
+            ids, bounds = self._gather(c["skills_indptr"], c["skills_ids"], rows)
+            names = [self.skill_names[i] for i in ids.tolist()]
+            return [names[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+        if field == "completed_projects":
+            ids, bounds = self._gather(c["projects_indptr"], c["project_ids"], rows)
+            domains, _ = self._gather(c["projects_indptr"], c["project_domains"], rows)
+            domain_names = self.domain_names + [None]  # -1 marks a missing domain
+            projects = [
+                {"project_id": project_id, "domain": domain_names[domain]}
+                for project_id, domain in zip(ids.tolist(), domains.tolist())
+            ]
+            return [projects[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+        return [json.loads(extra).get(field, default) for extra in self._strings(rows, c["extras_offsets"], c["extras"])]
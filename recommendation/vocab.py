@@ -0,0 +1,86 @@
+import json
+import os
+
+CLIENT_PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "client", "src", "app", "project"
+)
+SKILLS_PATH = os.path.join(CLIENT_PROJECT_DIR, "skills.json")    # Also what update_skills.js validates against
+DOMAINS_PATH = os.path.join(CLIENT_PROJECT_DIR, "domains.json")
+
+
+class Vocabulary:
+    """
+    Dense integer IDs for skill or domain names. IDs are assigned in insertion
+    order, so a vocabulary seeded from the client's skills.json gives every
+    known skill the same ID in every process and snapshot; names outside the
+    seed list are appended after it.
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+    def get(self, name, default=None):
+        return self.ids.get(name, default)
+
+    def encode(self, names):
+        # Sorted, de-duplicated IDs; unknown names are dropped
+        return sorted({self.ids[name] for name in names if name in self.ids})
+
+    def bits(self, names, add=False):
+        # The same set as a Python int bitmask (bit i set <=> ID i present);
+        # with add=True unknown names get new IDs instead of being dropped
+        mask = 0
+        for name in names:
+            i = self.add(name) if add else self.ids.get(name)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def decode_bits(self, mask):
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def decode(self, ids):
+        return [self.names[i] for i in ids]
+
+    def copy(self):
+        return Vocabulary(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+
+def _load_names(path, key):
+    try:
+        with open(path, "r") as file:
+            return json.load(file)[key]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading {key} vocabulary from {path}: {str(e)}")
+        return []
+
+
+def skill_vocabulary():
+    return Vocabulary(_load_names(SKILLS_PATH, "skills"))
+
+
+def domain_vocabulary():
+    return Vocabulary(_load_names(DOMAINS_PATH, "domains"))